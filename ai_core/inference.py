@@ -0,0 +1,397 @@
+"""
+Inference backends for the AI coach, and a scheduler that micro-batches prompts.
+
+A backend turns a batch of prompts into a batch of completions. Two are built in:
+- stub: deterministic and offline, answering each prompt with a given function
+  (by default the coach's template answers), so everything is testable without a model.
+- llama_cpp: a locally hosted CPU model in GGUF format, via the optional
+  llama-cpp-python package.
+
+The scheduler puts concurrent chat prompts in one queue. A worker thread takes the
+first waiting prompt, then collects more for at most `max_wait` seconds or until
+`max_batch_size` prompts are waiting, and runs them through the backend in one
+call. Callers wait at most the backend's timeout for their answer, or, when
+streaming it, for each piece of it.
+
+A circuit breaker guards the backend. After `failure_threshold` consecutive
+failures (errors, timeouts, or batches slower than the timeout) callers fail fast
+with InferenceUnavailable for `cooldown` seconds instead of queueing behind a hung
+model; then one probe prompt is let through, and its outcome closes or reopens it.
+
+Configuration (environment):
+    FINMATE_INFERENCE_BACKEND      stub (default) or llama_cpp
+    FINMATE_MODEL_PATH             GGUF model file for llama_cpp
+    FINMATE_INFERENCE_MAX_BATCH    prompts per batch (default: the backend's)
+    FINMATE_INFERENCE_MAX_WAIT_MS  how long to hold a batch open for more prompts (default: the backend's)
+    FINMATE_INFERENCE_TIMEOUT      seconds a caller waits for an answer (default: the backend's)
+    FINMATE_INFERENCE_FAILURES     consecutive failures that open the circuit (default 3)
+    FINMATE_INFERENCE_COOLDOWN     seconds the circuit stays open before a probe (default 30)
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterator, List, Optional
+import hashlib
+import os
+import queue
+import threading
+import time
+
+
+class InferenceTimeout(Exception):
+    """The backend didn't answer within its timeout"""
+
+
+class InferenceUnavailable(Exception):
+    """The backend has been failing and is given time to recover; the prompt was not sent"""
+
+
+class InferenceBackend(ABC):
+    """Generates completions for a batch of prompts"""
+
+    name = "base"
+    # Defaults: seconds a caller waits for an answer, prompts per batch, and
+    # seconds to hold a batch open for more prompts
+    timeout = 10.0
+    max_batch_size = 8
+    max_wait = 0.01
+
+    @abstractmethod
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        """One completion per prompt, in order"""
+
+    def generate_batch_stream(self, prompts: List[str], emit: Callable[[int, str], None]) -> List[str]:
+        """
+        Like generate_batch, also calling `emit(index, text)` with each piece of a
+        completion as it is produced. By default each completion is one piece.
+        """
+        completions = self.generate_batch(prompts)
+        for index, completion in enumerate(completions):
+            emit(index, completion)
+        return completions
+
+
+class StubBackend(InferenceBackend):
+    """Deterministic offline backend: each prompt is answered by `respond(prompt)`"""
+
+    name = "stub"
+    timeout = 5.0
+    max_batch_size = 32
+    # Answers are instant, so batch only what is already queued
+    max_wait = 0.0
+
+    def __init__(self, respond: Optional[Callable[[str], str]] = None, latency: float = 0.0):
+        self.respond = respond or self._digest_answer
+        # Simulated seconds per batch, for exercising batching and timeouts
+        self.latency = latency
+        self.batch_sizes: List[int] = []
+
+    @staticmethod
+    def _digest_answer(prompt: str) -> str:
+        return f"Stub answer {hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}"
+
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        self.batch_sizes.append(len(prompts))
+        if self.latency:
+            time.sleep(self.latency)
+        return [self.respond(prompt) for prompt in prompts]
+
+    def generate_batch_stream(self, prompts: List[str], emit: Callable[[int, str], None]) -> List[str]:
+        # Emitted a line at a time, like a model producing text
+        completions = self.generate_batch(prompts)
+        for index, completion in enumerate(completions):
+            for line in completion.splitlines(keepends=True):
+                emit(index, line)
+        return completions
+
+
+class LlamaCppBackend(InferenceBackend):
+    """A local CPU model (GGUF file) run with llama-cpp-python"""
+
+    name = "llama_cpp"
+    timeout = 60.0
+    max_batch_size = 4
+    max_wait = 0.02
+
+    def __init__(self, model_path: str, max_tokens: int = 512, temperature: float = 0.2,
+                 n_threads: Optional[int] = None, n_ctx: int = 2048):
+        try:
+            from llama_cpp import Llama
+        except ImportError:
+            raise RuntimeError("The llama_cpp inference backend needs the 'llama-cpp-python' package")
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._model = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads or os.cpu_count(), verbose=False)
+
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        # The model evaluates one sequence at a time; batching saves the per-request
+        # scheduling and keeps the CPU busy back to back
+        return [
+            self._model(prompt, max_tokens=self.max_tokens, temperature=self.temperature)["choices"][0]["text"].strip()
+            for prompt in prompts
+        ]
+
+    def generate_batch_stream(self, prompts: List[str], emit: Callable[[int, str], None]) -> List[str]:
+        completions = []
+        for index, prompt in enumerate(prompts):
+            pieces: List[str] = []
+            for part in self._model(prompt, max_tokens=self.max_tokens, temperature=self.temperature, stream=True):
+                text = part["choices"][0]["text"]
+                if not pieces:
+                    # Match generate_batch, which strips the completion
+                    text = text.lstrip()
+                if text:
+                    pieces.append(text)
+                    emit(index, text)
+            completions.append("".join(pieces).rstrip())
+        return completions
+
+
+def create_backend(name: Optional[str] = None, respond: Optional[Callable[[str], str]] = None) -> InferenceBackend:
+    """The backend named by `name` or FINMATE_INFERENCE_BACKEND; `respond` drives the stub"""
+    name = name or os.getenv("FINMATE_INFERENCE_BACKEND", "stub")
+    if name == "stub":
+        return StubBackend(respond)
+    if name == "llama_cpp":
+        model_path = os.getenv("FINMATE_MODEL_PATH")
+        if not model_path:
+            raise RuntimeError("FINMATE_MODEL_PATH must point at a GGUF model for the llama_cpp backend")
+        return LlamaCppBackend(model_path)
+    raise ValueError(f"Unknown inference backend: {name}")
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures, then refuses calls for
+    `cooldown` seconds. After that a single probe is allowed (another one if the
+    probe hasn't reported back within the cooldown); a success closes the circuit,
+    a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened = 0.0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened < self.cooldown:
+                return False
+            if self.state == self.HALF_OPEN and now - self._probe_started < self.cooldown:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened = time.monotonic()
+
+
+# Put on a streaming request's queue once its completion is settled
+_END = object()
+
+
+class _Request:
+    __slots__ = ("prompt", "future", "chunks")
+
+    def __init__(self, prompt: str, stream: bool = False):
+        self.prompt = prompt
+        self.future: Future = Future()
+        self.chunks: Optional["queue.Queue"] = queue.Queue() if stream else None
+
+    def settle(self, completion: Optional[str] = None, error: Optional[BaseException] = None):
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(completion)
+        if self.chunks is not None:
+            self.chunks.put(_END)
+
+
+class InferenceScheduler:
+    """Micro-batches concurrent prompts onto one backend"""
+
+    def __init__(self, backend: InferenceBackend, max_batch_size: Optional[int] = None,
+                 max_wait: Optional[float] = None, timeout: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.backend = backend
+        self.max_batch_size = max_batch_size or int(os.getenv("FINMATE_INFERENCE_MAX_BATCH", "0")) or backend.max_batch_size
+        if max_wait is None:
+            max_wait_ms = os.getenv("FINMATE_INFERENCE_MAX_WAIT_MS")
+            max_wait = float(max_wait_ms) / 1000 if max_wait_ms else backend.max_wait
+        self.max_wait = max_wait
+        self.timeout = timeout or float(os.getenv("FINMATE_INFERENCE_TIMEOUT", "0")) or backend.timeout
+        self.breaker = breaker or CircuitBreaker(
+            int(os.getenv("FINMATE_INFERENCE_FAILURES", "3")), float(os.getenv("FINMATE_INFERENCE_COOLDOWN", "30"))
+        )
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0, "batches": 0, "batched_prompts": 0, "largest_batch": 0,
+            "timeouts": 0, "errors": 0, "rejected": 0, "busy_seconds": 0.0
+        }
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"inference-{self.backend.name}", daemon=True)
+                    self._thread.start()
+
+    def _admit(self):
+        """Raise InferenceUnavailable while the circuit breaker is open"""
+        if not self.breaker.allow():
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise InferenceUnavailable(f"{self.backend.name} backend is failing; retrying in up to {self.breaker.cooldown}s")
+
+    def _enqueue(self, request: _Request) -> _Request:
+        self._ensure_worker()
+        with self._lock:
+            self._stats["requests"] += 1
+        self._queue.put(request)
+        return request
+
+    def _timed_out(self, timeout: float) -> InferenceTimeout:
+        self.breaker.record_failure()
+        with self._lock:
+            self._stats["timeouts"] += 1
+        return InferenceTimeout(f"{self.backend.name} backend did not answer within {timeout}s")
+
+    def submit(self, prompt: str) -> Future:
+        """Queue a prompt; the future resolves to its completion"""
+        self._admit()
+        return self._enqueue(_Request(prompt)).future
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Completion for one prompt, raising InferenceTimeout after the backend's timeout"""
+        return self.generate_many([prompt], timeout)[0]
+
+    def generate_many(self, prompts: List[str], timeout: Optional[float] = None) -> List[str]:
+        """Completions for several prompts, which share batches with everyone else's"""
+        self._admit()
+        futures = [self._enqueue(_Request(prompt)).future for prompt in prompts]
+        deadline = time.monotonic() + (timeout or self.timeout)
+        try:
+            return [future.result(max(deadline - time.monotonic(), 0)) for future in futures]
+        except FutureTimeout:
+            for future in futures:
+                future.cancel()
+            raise self._timed_out(timeout or self.timeout)
+
+    def stream(self, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        The completion for one prompt, piece by piece as the backend produces it.
+        Raises InferenceTimeout when a piece takes longer than the timeout, or the
+        backend's error if it fails partway.
+        """
+        self._admit()
+        request = self._enqueue(_Request(prompt, stream=True))
+        timeout = timeout or self.timeout
+        while True:
+            try:
+                piece = request.chunks.get(timeout=timeout)
+            except queue.Empty:
+                request.future.cancel()
+                raise self._timed_out(timeout)
+            if piece is _END:
+                # Raises the backend's error, if it failed
+                request.future.result()
+                return
+            yield piece
+
+    def _next_batch(self, first: _Request) -> List[_Request]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Closing: finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(request)
+        # Callers that timed out while queued have cancelled their futures
+        return [request for request in batch if request.future.set_running_or_notify_cancel()]
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._next_batch(first)
+            if not batch:
+                continue
+
+            def emit(index: int, text: str, batch=batch):
+                if batch[index].chunks is not None:
+                    batch[index].chunks.put(text)
+
+            start = time.perf_counter()
+            try:
+                completions = self.backend.generate_batch_stream([request.prompt for request in batch], emit)
+                if len(completions) != len(batch):
+                    raise RuntimeError(f"{self.backend.name} backend returned {len(completions)} completions for {len(batch)} prompts")
+            except Exception as e:
+                self.breaker.record_failure()
+                with self._lock:
+                    self._stats["errors"] += 1
+                for request in batch:
+                    request.settle(error=e)
+                continue
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._stats["batches"] += 1
+                    self._stats["batched_prompts"] += len(batch)
+                    self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+                    self._stats["busy_seconds"] += elapsed
+            # A batch its callers gave up on counts against the backend, even if it finished
+            if elapsed <= self.timeout:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            for request, completion in zip(batch, completions):
+                request.settle(completion)
+
+    def close(self, wait: bool = True):
+        """Stop the worker once the queued prompts are answered"""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            if wait:
+                thread.join()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+        batches = stats["batches"]
+        stats["busy_seconds"] = round(stats["busy_seconds"], 3)
+        stats["mean_batch_size"] = round(stats["batched_prompts"] / batches, 2) if batches else 0.0
+        stats.update(backend=self.backend.name, max_batch_size=self.max_batch_size, max_wait=self.max_wait,
+                     timeout=self.timeout, queued=self._queue.qsize(), circuit=self.breaker.state)
+        return stats
@@ -0,0 +1,200 @@
+"""
+Multi-intent classifier for routing chat messages.
+
+Every intent keyword is compiled into one regular expression. The alternation is
+factored into a prefix trie, so at each word boundary the engine follows one
+branch per character instead of trying every keyword in turn. Matches must be
+whole words or phrases. Each match adds its weight to its intents, and a
+message gets every intent it mentions, ranked by score. So "budget for
+retirement" is both a budget and a retirement question.
+
+The batch API classifies each distinct message once.
+
+Usage:
+    python -m ai_core.intents [--messages N]
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+import argparse
+import random
+import re
+import sys
+import time
+
+# intent -> {keyword or phrase: weight}; specific phrases weigh more than broad words
+INTENT_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "budget": {
+        "budget": 1.0, "budgets": 1.0, "budgeting": 1.0, "budgeted": 1.0,
+        "spending": 0.8, "spend": 0.6, "expenses": 0.8, "expense": 0.8,
+        "50/30/20": 1.5, "cash flow": 0.8,
+    },
+    "retirement": {
+        "retirement": 1.0, "retire": 1.0, "retired": 0.8, "retiring": 1.0,
+        "pension": 1.2, "pensions": 1.2, "401k": 1.5, "401(k)": 1.5, "ira": 1.5, "roth": 1.5,
+    },
+    "savings": {
+        "save": 0.8, "saving": 0.8, "savings": 1.0, "saved": 0.6,
+        "emergency": 1.0, "emergency fund": 1.5, "rainy day": 1.2, "high-yield": 1.0,
+    },
+    "investment": {
+        "invest": 1.0, "investing": 1.0, "investment": 1.0, "investments": 1.0,
+        "stock": 1.0, "stocks": 1.0, "bond": 0.8, "bonds": 0.8, "portfolio": 1.0,
+        "index fund": 1.5, "index funds": 1.5, "etf": 1.2, "etfs": 1.2, "dividend": 1.0, "dividends": 1.0,
+    },
+    "debt": {
+        "debt": 1.0, "debts": 1.0, "loan": 1.0, "loans": 1.0, "mortgage": 1.0,
+        "credit": 0.6, "credit card": 1.5, "credit cards": 1.5, "pay off": 1.2, "payoff": 1.2, "apr": 1.0,
+    },
+}
+
+
+def _alternation(words: Iterable[str]) -> str:
+    """A regex matching exactly `words`, factored into a prefix trie"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = []
+        optional = "" in node
+        for char in sorted(key for key in node if key):
+            # Any run of whitespace matches the space inside a phrase
+            piece = r"\s+" if char == " " else re.escape(char)
+            branches.append(piece + build(node[char]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            body = ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class IntentClassifier:
+    """Scores a message against every intent in one regex pass"""
+
+    def __init__(self, keywords: Dict[str, Dict[str, float]] = INTENT_KEYWORDS):
+        self.intents: List[str] = list(keywords)
+        # matched keyword -> ((intent, weight), ...); a keyword may serve several intents
+        weights: Dict[str, List[Tuple[str, float]]] = {}
+        for intent, intent_keywords in keywords.items():
+            for keyword, weight in intent_keywords.items():
+                weights.setdefault(keyword.lower(), []).append((intent, weight))
+        self._weights: Dict[str, Tuple[Tuple[str, float], ...]] = {key: tuple(value) for key, value in weights.items()}
+        self._order = {intent: i for i, intent in enumerate(self.intents)}
+        # Word boundaries are checked with lookarounds so keywords like "401(k)" work too
+        self._pattern = re.compile(r"(?<![\w])(?:" + _alternation(self._weights) + r")(?![\w])")
+
+    def _score(self, keywords: Iterable[str]) -> List[Tuple[str, float]]:
+        scores: Dict[str, float] = {}
+        for keyword in keywords:
+            weights = self._weights.get(keyword)
+            if weights is None:
+                # A phrase matched with extra or unusual whitespace
+                weights = self._weights[" ".join(keyword.split())]
+            for intent, weight in weights:
+                scores[intent] = scores.get(intent, 0.0) + weight
+        if len(scores) < 2:
+            return [(intent, round(score, 3)) for intent, score in scores.items()]
+        # Ties keep the intents' declaration order
+        return sorted(((intent, round(score, 3)) for intent, score in scores.items()),
+                      key=lambda entry: (-entry[1], self._order[entry[0]]))
+
+    def classify(self, text: str) -> List[Tuple[str, float]]:
+        """The message's intents with scores, best first; empty when nothing matched"""
+        return self._score(self._pattern.findall(text.lower()))
+
+    def classify_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, float]]]:
+        """
+        classify() for many messages. Repeated messages (greetings, suggested
+        questions) are classified once and share one result list.
+        """
+        ranked: Dict[str, List[Tuple[str, float]]] = {}
+        results = []
+        for text in texts:
+            text = text.lower()
+            intents = ranked.get(text)
+            if intents is None:
+                intents = ranked[text] = self._score(self._pattern.findall(text))
+            results.append(intents)
+        return results
+
+    def top_intents(self, text: str, limit: int = 2, min_share: float = 0.5) -> List[str]:
+        """
+        The intents worth answering: the best one plus any others scoring at least
+        `min_share` of it, at most `limit` in total.
+        """
+        ranked = self.classify(text)
+        if not ranked:
+            return []
+        best = ranked[0][1]
+        return [intent for intent, score in ranked[:limit] if score >= best * min_share]
+
+
+# Global instance
+intent_classifier = IntentClassifier()
+
+
+def _synthetic_messages(count: int, seed: int = 0, amounts: bool = True) -> List[str]:
+    rng = random.Random(seed)
+    openers = ["how do i", "should i", "what is the best way to", "can you help me", "is it smart to", "tips to"]
+    topics = ["budget for retirement", "save for an emergency fund", "invest in index funds", "pay off my credit card",
+              "start a roth ira", "cut my spending", "buy a car", "choose a bank", "plan a wedding", "lower my taxes"]
+    tails = ["", " this year", " on a small salary", " with kids", " before I turn 40?", " quickly"]
+    messages = [f"{rng.choice(openers)} {rng.choice(topics)}{rng.choice(tails)}" for _ in range(count)]
+    if amounts:
+        # Amounts make nearly every message distinct
+        messages = [f"{message} with ${rng.randint(100, 999999)}" for message in messages]
+    return messages
+
+
+def _throughput(run, messages: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    return {"seconds": round(seconds, 3), "per_second": round(messages / seconds)}
+
+
+# Messages per second every mode should sustain
+TARGET_PER_SECOND = 100000
+
+
+def benchmark(messages: int = 1000000, batch_size: int = 10000, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """
+    Classify synthetic chat messages one by one and in batches, in messages/second.
+    'batch_repeated' uses a workload of a few hundred distinct questions.
+    """
+    distinct = _synthetic_messages(messages, seed)
+    repeated = _synthetic_messages(messages, seed, amounts=False)
+    classifier = IntentClassifier()
+
+    def batched(texts: List[str]):
+        for offset in range(0, messages, batch_size):
+            classifier.classify_batch(texts[offset:offset + batch_size])
+
+    return {
+        "single": _throughput(lambda: [classifier.classify(text) for text in distinct], messages),
+        "batch": _throughput(lambda: batched(distinct), messages),
+        "batch_repeated": _throughput(lambda: batched(repeated), messages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chat intent classifier")
+    parser.add_argument("--messages", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{args.messages:,} messages")
+    results = benchmark(args.messages, args.batch_size)
+    for name, result in results.items():
+        print(f"{name:>15}: {result['seconds']}s ({result['per_second']:,}/s)")
+    slow = [name for name, result in results.items() if result["per_second"] < TARGET_PER_SECOND]
+    if slow:
+        sys.exit(f"Under the {TARGET_PER_SECOND:,} messages/s target: {', '.join(slow)}")
+
+if __name__ == "__main__":
+    main()
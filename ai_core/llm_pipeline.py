@@ -1,15 +1,17 @@
+from ai_core.inference import InferenceScheduler, create_backend
+from ai_core.intents import intent_classifier
 from ai_core.prompts.financial_prompts import FINANCIAL_PROMPT_TEMPLATE
+from typing import Dict, Iterator, Optional
+import hashlib
+import json
+import logging
+import threading
 
-def generate_ai_response(user_input: str) -> str:
-    """
-    Process user input and generate AI financial advice.
-    """
-    # Create a more intelligent response based on the user's question
-    user_input_lower = user_input.lower()
-    
-    # Budget-related questions
-    if any(word in user_input_lower for word in ['budget', 'budgeting', 'spending', 'expenses']):
-        return """Here's how to create an effective budget:
+logger = logging.getLogger(__name__)
+
+# Advice for each chat intent
+INTENT_RESPONSES = {
+    "budget": """Here's how to create an effective budget:
 
 1. **Track Your Income**: List all your monthly income sources
 2. **List Your Expenses**: Categorize into fixed (rent, utilities) and variable (food, entertainment)
@@ -20,11 +22,9 @@ def generate_ai_response(user_input: str) -> str:
 4. **Use Budgeting Apps**: Consider apps like Mint, YNAB, or PocketGuard
 5. **Review Monthly**: Adjust your budget based on actual spending
 
-Start by tracking your expenses for one month to understand your spending patterns."""
+Start by tracking your expenses for one month to understand your spending patterns.""",
 
-    # Retirement questions
-    elif any(word in user_input_lower for word in ['retirement', 'retire', 'pension', '401k', 'ira']):
-        return """Here's a comprehensive retirement savings strategy:
+    "retirement": """Here's a comprehensive retirement savings strategy:
 
 **Start Early**: The power of compound interest means starting in your 20s is ideal
 **Contribution Rates**:
@@ -42,11 +42,9 @@ Start by tracking your expenses for one month to understand your spending patter
 - Roth IRA for tax-free withdrawals
 - Traditional IRA for tax deductions
 
-**Rule of Thumb**: Save 10x your salary by age 67 for comfortable retirement."""
+**Rule of Thumb**: Save 10x your salary by age 67 for comfortable retirement.""",
 
-    # Savings questions
-    elif any(word in user_input_lower for word in ['save', 'saving', 'savings', 'emergency']):
-        return """Here's your complete savings strategy:
+    "savings": """Here's your complete savings strategy:
 
 **Emergency Fund First**:
 - Save 3-6 months of expenses
@@ -65,11 +63,9 @@ Start by tracking your expenses for one month to understand your spending patter
 - Consider high-yield savings accounts (2-4% APY)
 - Separate accounts for different goals
 
-**Goal Setting**: Make savings goals SMART (Specific, Measurable, Achievable, Relevant, Time-bound)."""
+**Goal Setting**: Make savings goals SMART (Specific, Measurable, Achievable, Relevant, Time-bound).""",
 
-    # Investment questions
-    elif any(word in user_input_lower for word in ['invest', 'investment', 'stocks', 'bonds', 'portfolio']):
-        return """Here's how to start investing wisely:
+    "investment": """Here's how to start investing wisely:
 
 **Before You Invest**:
 - Build emergency fund first
@@ -87,11 +83,9 @@ Start by tracking your expenses for one month to understand your spending patter
 - Mix of stocks, bonds, and international investments
 - Consider your age: (100 - your age) = % in stocks
 
-**Start Simple**: Begin with a low-cost S&P 500 index fund or target-date fund."""
+**Start Simple**: Begin with a low-cost S&P 500 index fund or target-date fund.""",
 
-    # Debt questions
-    elif any(word in user_input_lower for word in ['debt', 'credit', 'loan', 'pay off']):
-        return """Here's your debt payoff strategy:
+    "debt": """Here's your debt payoff strategy:
 
 **Debt Payoff Methods**:
 1. **Debt Snowball**: Pay minimums, then focus on smallest debt first
@@ -109,11 +103,10 @@ Start by tracking your expenses for one month to understand your spending patter
 - Negotiate with creditors for lower rates
 - Consider debt consolidation loans
 
-**Rule**: If debt interest > investment returns, pay debt first."""
+**Rule**: If debt interest > investment returns, pay debt first.""",
+}
 
-    # General financial advice
-    else:
-        return f"""I'd be happy to help with your financial question: "{user_input}"
+GENERAL_RESPONSE = """I'd be happy to help with your financial question: "{user_input}"
 
 Here are some general financial principles to consider:
 
@@ -130,3 +123,104 @@ Here are some general financial principles to consider:
 - Continue learning about personal finance
 
 Could you be more specific about what financial topic you'd like help with? I can provide detailed advice on budgeting, investing, debt management, retirement planning, or other financial topics."""
+
+_PROMPT_PREFIX, _PROMPT_SUFFIX = FINANCIAL_PROMPT_TEMPLATE.split("{user_input}")
+
+# Fingerprint of the prompt and advice templates; cached answers are keyed by it
+TEMPLATE_VERSION = hashlib.sha1(
+    json.dumps([FINANCIAL_PROMPT_TEMPLATE, INTENT_RESPONSES, GENERAL_RESPONSE], sort_keys=True).encode("utf-8")
+).hexdigest()[:12]
+
+def build_prompt(user_input: str) -> str:
+    """The model prompt for a user's question"""
+    return FINANCIAL_PROMPT_TEMPLATE.format(user_input=user_input)
+
+def template_answer(user_input: str) -> str:
+    """
+    The coach's built-in advice: one section per topic the question is mainly about, strongest first.
+    """
+    intents = intent_classifier.top_intents(user_input)
+    if not intents:
+        return GENERAL_RESPONSE.format(user_input=user_input)
+    return "\n\n".join(INTENT_RESPONSES[intent] for intent in intents)
+
+def _answer_prompt(prompt: str) -> str:
+    """The stub backend's answer: template advice for the question inside the prompt"""
+    if prompt.startswith(_PROMPT_PREFIX) and prompt.endswith(_PROMPT_SUFFIX):
+        prompt = prompt[len(_PROMPT_PREFIX):len(prompt) - len(_PROMPT_SUFFIX)]
+    return template_answer(prompt)
+
+_scheduler: Optional[InferenceScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> InferenceScheduler:
+    """The inference scheduler, created (and its backend loaded) on first use"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = InferenceScheduler(create_backend(respond=_answer_prompt))
+    return _scheduler
+
+def set_backend(backend) -> InferenceScheduler:
+    """Swap the inference backend (tests, or a model loaded at startup)"""
+    global _scheduler
+    with _scheduler_lock:
+        previous, _scheduler = _scheduler, InferenceScheduler(backend)
+    if previous is not None:
+        previous.close(wait=False)
+    return _scheduler
+
+def template_version() -> str:
+    """Identifies what generated an answer: the templates plus the inference backend"""
+    return f"{TEMPLATE_VERSION}-{get_scheduler().backend.name}"
+
+def inference_stats() -> Dict[str, float]:
+    """Scheduler counters, or nothing before the first chat"""
+    return _scheduler.stats() if _scheduler is not None else {}
+
+class AnswerStream:
+    """
+    The chunks of one answer, passed on as the model produces them. `fell_back`
+    is True once any of the answer has come from the built-in templates because
+    inference failed, so callers can avoid caching it.
+    """
+
+    def __init__(self, user_input: str):
+        self.user_input = user_input
+        self.fell_back = False
+        self._chunks = self._generate()
+
+    def _generate(self) -> Iterator[str]:
+        sent = False
+        try:
+            for piece in get_scheduler().stream(build_prompt(self.user_input)):
+                sent = True
+                yield piece
+            return
+        except Exception:
+            # A slow or broken model must not take the coach down: fall back to the built-in advice
+            logger.warning("Inference failed, answering from templates", exc_info=True)
+            self.fell_back = True
+        if sent:
+            # Part of the model's answer has gone out; finish with the advice after it
+            yield "\n\n"
+        yield from template_answer(self.user_input).splitlines(keepends=True)
+
+    def __iter__(self) -> "AnswerStream":
+        return self
+
+    def __next__(self) -> str:
+        return next(self._chunks)
+
+def stream_ai_response(user_input: str) -> AnswerStream:
+    """
+    Generate AI financial advice piece by piece, so callers can send it as the model produces it.
+    """
+    return AnswerStream(user_input)
+
+def generate_ai_response(user_input: str) -> str:
+    """
+    Process user input and generate AI financial advice.
+    """
+    return "".join(stream_ai_response(user_input))
@@ -1,3 +1,4 @@
+from fastapi import Request
 from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -19,7 +20,17 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 # Dependency to get database session
-def get_db():
+def get_db(request: Request):
+    # Sub-requests of a batch borrow a session from the batch's shared pool
+    sessions = getattr(request.state, "batch_sessions", None)
+    if sessions is not None:
+        db = sessions.acquire()
+        try:
+            yield db
+        finally:
+            sessions.release(db)
+        return
+
     db = SessionLocal()
     try:
         yield db
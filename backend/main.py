@@ -1,12 +1,56 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routers import ai_chat, budget_router, savings_router, expense_router, investment_router, ai_smart_router, dashboard_router, mobile_support_router, auth_router
 from backend.database import create_tables
+from backend.services.conversation_store import conversation_store
+from backend.utils.admission import AdmissionLimiter
+from backend.utils.jobs import job_manager
+from backend.utils.logging_setup import RequestLoggingMiddleware, setup_logging, shutdown_logging
+import importlib
+import os
 
-app = FastAPI(title="Financial Coach AI", version="1.0.0")
+# (module, prefix, tag) for every API router, included in this order
+ROUTERS = [
+    ("backend.routers.auth_router", "/api/auth", "Authentication"),
+    ("backend.routers.ai_chat", "/api/ai", "AI Coach"),
+    ("backend.routers.budget_router", "/api/budget", "Budget Planning"),
+    ("backend.routers.savings_router", "/api/savings", "Savings Goals"),
+    ("backend.routers.expense_router", "/api/expenses", "Expense Tracking"),
+    ("backend.routers.investment_router", "/api/investments", "Investment Advice"),
+    ("backend.routers.ai_smart_router", "/api/smart", "AI Smart Features"),
+    ("backend.routers.dashboard_router", "/api/dashboard", "Financial Dashboard"),
+    ("backend.routers.mobile_support_router", "/api/mobile", "Mobile Support Platform"),
+    ("backend.routers.batch_router", "/api/batch", "Batch Requests"),
+    ("backend.routers.jobs_router", "/api/jobs", "Background Jobs"),
+    ("backend.routers.metrics_router", "/api/metrics", "Metrics"),
+]
 
-# Create database tables
-create_tables()
+# Cap on requests in flight per worker; routers add their own tighter limits.
+# Batch sub-requests are covered by the slot their batch already holds.
+global_limiter = AdmissionLimiter(
+    "global",
+    max_concurrent=int(os.getenv("FINMATE_MAX_INFLIGHT", "64")),
+    max_queue=int(os.getenv("FINMATE_MAX_QUEUED", "256")),
+    queue_timeout=5.0,
+    applies_to_batch=False
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Touch the database at startup rather than at import, so importing the app stays cheap
+    setup_logging()
+    create_tables()
+    yield
+    job_manager.shutdown()
+    conversation_store.close()
+    shutdown_logging()
+
+app = FastAPI(
+    title="Financial Coach AI",
+    version="1.0.0",
+    lifespan=lifespan,
+    dependencies=[Depends(global_limiter)]
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -15,18 +59,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "Idempotent-Replayed", "X-Request-ID", "Server-Timing"],
 )
 
+# Outermost, so the request ID and timing cover everything below it
+app.add_middleware(RequestLoggingMiddleware)
+
 # Include API routers
-app.include_router(auth_router.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(ai_chat.router, prefix="/api/ai", tags=["AI Coach"])
-app.include_router(budget_router.router, prefix="/api/budget", tags=["Budget Planning"])
-app.include_router(savings_router.router, prefix="/api/savings", tags=["Savings Goals"])
-app.include_router(expense_router.router, prefix="/api/expenses", tags=["Expense Tracking"])
-app.include_router(investment_router.router, prefix="/api/investments", tags=["Investment Advice"])
-app.include_router(ai_smart_router.router, prefix="/api/smart", tags=["AI Smart Features"])
-app.include_router(dashboard_router.router, prefix="/api/dashboard", tags=["Financial Dashboard"])
-app.include_router(mobile_support_router.router, prefix="/api/mobile", tags=["Mobile Support Platform"])
+for module_name, prefix, tag in ROUTERS:
+    app.include_router(importlib.import_module(module_name).router, prefix=prefix, tags=[tag])
 
 @app.get("/")
 def root():
@@ -1,625 +1,145 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from backend.services.ai_service import get_ai_response
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from backend.auth import get_current_active_user, get_optional_current_user
+from backend.database import get_db
+from backend.models.database_models import User
+from backend.services.ai_service import cite_sources, get_ai_response, stream_ai_response
+from backend.services.conversation_store import ASSISTANT, USER, conversation_store
+from backend.services.financial_snapshot import financial_snapshots
+from backend.utils.admission import AdmissionLimiter
+from backend.utils.streaming import HEARTBEAT, SSE_HEADERS, SSE_HEARTBEAT, sse_event, stream_chunks
+import asyncio
 
 router = APIRouter()
 
+# Streams hold a slot for as long as the answer takes; keep them from starving other routes
+chat_stream_limiter = AdmissionLimiter("chat_stream", max_concurrent=32, max_queue=16, queue_timeout=2.0, max_per_client=4)
+
+# Close a WebSocket whose client has stopped reading for this long
+WEBSOCKET_SEND_TIMEOUT = 30.0
+
+MAX_MESSAGE_LENGTH = 2000
+
 class ChatRequest(BaseModel):
-    message: str
+    message: str = Field(..., min_length=1, max_length=MAX_MESSAGE_LENGTH)
+    # Signed-in users name a conversation to have follow-up questions answered in context
+    conversation_id: Optional[str] = Field(None, min_length=1, max_length=64)
 
 @router.post("/chat")
-def chat_with_ai(request: ChatRequest):
+def chat_with_ai(
+    request: ChatRequest,
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: Session = Depends(get_db)
+):
     """
-    Endpoint to chat with AI financial coach.
+    Endpoint to chat with AI financial coach. `sources` cites the most relevant
+    glossary entries, advice and articles. Signed-in users also get `snapshot`,
+    a summary of their spending, savings rate and goal progress, which the
+    response refers to. When they send a `conversation_id`, the exchange is kept
+    and follow-up questions are answered in the context of the earlier ones.
     """
-    response = get_ai_response(request.message)
-    return {"input": request.message, "response": response}
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    conversation_id = request.conversation_id if current_user is not None else None
+    question = request.message
+    if conversation_id is not None:
+        question = conversation_store.get(current_user.id, conversation_id).contextualize(request.message)
+
+    response = get_ai_response(question)
+    result = {"input": request.message, "response": response, "sources": cite_sources(question)}
+    if current_user is not None:
+        snapshot = financial_snapshots.get_snapshot(current_user.id, db)
+        summary = financial_snapshots.describe(snapshot)
+        if summary:
+            result["response"] = f"{response} {summary}"
+        result["snapshot"] = snapshot
+    if conversation_id is not None:
+        conversation_store.append_many(
+            current_user.id, conversation_id, [(USER, request.message), (ASSISTANT, result["response"])]
+        )
+        result["conversation_id"] = conversation_id
+    return result
+
+@router.get("/chat/history/{conversation_id}")
+def get_chat_history(conversation_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    A conversation's summary of older turns plus its recent turns
+    """
+    return {"conversation_id": conversation_id, **conversation_store.get(current_user.id, conversation_id).to_dict()}
 
+@router.delete("/chat/history/{conversation_id}")
+def delete_chat_history(conversation_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Forget a conversation
+    """
+    conversation_store.delete(current_user.id, conversation_id)
+    return {"message": "Conversation deleted successfully"}
 
+async def _sse_stream(message: str):
+    yield sse_event("start", {"input": message})
+    yield sse_event("sources", await run_in_threadpool(cite_sources, message))
+    async for chunk in stream_chunks(stream_ai_response(message)):
+        yield SSE_HEARTBEAT if chunk is HEARTBEAT else sse_event("chunk", {"text": chunk})
+    yield sse_event("done", {})
 
+def _sse_response(message: str) -> StreamingResponse:
+    return StreamingResponse(_sse_stream(message), media_type="text/event-stream", headers=SSE_HEADERS)
 
+@router.post("/chat/stream", dependencies=[Depends(chat_stream_limiter)])
+def stream_chat(request: ChatRequest):
+    """
+    Chat with the AI financial coach, streaming the answer as server-sent events:
+    'start', 'sources' (cited snippets), one 'chunk' event per piece of text, then 'done'.
+    """
+    return _sse_response(request.message)
 
+@router.get("/chat/stream", dependencies=[Depends(chat_stream_limiter)])
+def stream_chat_get(message: str = Query(..., min_length=1, max_length=MAX_MESSAGE_LENGTH)):
+    """
+    Same as POST /chat/stream, for EventSource clients (which can only send GET)
+    """
+    return _sse_response(message)
+
+async def _websocket_answer(websocket: WebSocket, message: str):
+    await websocket.send_json({"type": "start", "input": message})
+    sources = await run_in_threadpool(cite_sources, message)
+    await websocket.send_json({"type": "sources", "sources": sources})
+    async for chunk in stream_chunks(stream_ai_response(message)):
+        event = {"type": "ping"} if chunk is HEARTBEAT else {"type": "chunk", "text": chunk}
+        # Each send waits for the transport, so a slow reader throttles the producer
+        await asyncio.wait_for(websocket.send_json(event), WEBSOCKET_SEND_TIMEOUT)
+    await websocket.send_json({"type": "done"})
+
+@router.websocket("/chat/ws")
+async def chat_websocket(websocket: WebSocket):
+    """
+    Chat over a WebSocket. Send {"message": "..."}. The server replies with
+    {"type": "start"}, {"type": "sources", "sources": [...]}, {"type": "chunk", "text": ...}
+    messages, then {"type": "done"}, and sends {"type": "ping"} while an answer is slow to arrive.
+    Each answer takes a slot from the chat stream limiter; when none is free the
+    server replies {"type": "error", "retry_after": seconds} and the message can be resent.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                request = ChatRequest.model_validate(await websocket.receive_json())
+            except (ValidationError, ValueError):
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": f'Expected {{"message": "..."}} with 1-{MAX_MESSAGE_LENGTH} characters'
+                })
+                continue
+
+            try:
+                async with chat_stream_limiter.hold(websocket):
+                    await _websocket_answer(websocket, request.message)
+            except HTTPException as e:
+                # No stream slot free; the client may resend the message
+                await websocket.send_json({"type": "error", "detail": e.detail, "retry_after": chat_stream_limiter.retry_after})
+    except WebSocketDisconnect:
+        pass
+    except asyncio.TimeoutError:
+        await websocket.close(code=1008, reason="Client is not reading")
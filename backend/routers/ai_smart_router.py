@@ -1,10 +1,62 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from backend.models.finance_models import UserProfile
 from backend.services.ai_smart_service import ai_smart_service
-from typing import Dict, List, Any
+from backend.services.scenario_sweep import sweep
+from backend.services.terms_store import terms_store
+from backend.utils.http_cache import StaticResource
+from backend.utils.admission import AdmissionLimiter
+from backend.utils.single_flight import SingleFlight, flight_key
+from typing import Dict, List, Any, Optional
 
-router = APIRouter()
+# Simulations and analyses are CPU-bound; keep them from crowding out cheap reads
+smart_limiter = AdmissionLimiter("smart", max_concurrent=16, max_queue=32, queue_timeout=2.0)
+smart_analysis_limiter = AdmissionLimiter(
+    "smart_analysis", max_concurrent=4, max_queue=8, queue_timeout=2.0, max_per_client=2, retry_after=2
+)
+
+smart_analysis_flight = SingleFlight("smart_analysis")
+
+router = APIRouter(dependencies=[Depends(smart_limiter)])
+
+available_scenarios_resource = StaticResource(lambda: {
+    "scenarios": [
+        {
+            "type": "savings_rate",
+            "name": "Savings Rate Simulation",
+            "description": "Simulate what happens if you change your savings rate",
+            "parameters": ["annual_income", "current_savings", "savings_rate", "years", "return_rate"]
+        },
+        {
+            "type": "investment_return",
+            "name": "Investment Return Comparison",
+            "description": "Compare different investment return scenarios",
+            "parameters": ["initial_amount", "monthly_contribution", "years", "return_rates"]
+        },
+        {
+            "type": "retirement",
+            "name": "Retirement Planning",
+            "description": "Simulate retirement savings scenarios",
+            "parameters": ["current_age", "retirement_age", "current_savings", "monthly_contribution", "return_rate"]
+        },
+        {
+            "type": "retirement_monte_carlo",
+            "name": "Retirement Success Probability",
+            "description": "Simulate thousands of random market paths to see how likely your retirement plan is to last",
+            "parameters": [
+                "current_age", "retirement_age", "life_expectancy", "current_savings", "monthly_contribution",
+                "return_distribution", "withdrawal_rate", "annual_withdrawal", "inflation", "paths", "seed"
+            ]
+        }
+    ]
+})
+
+financial_terms_resource = StaticResource(lambda: {
+    "terms": list(ai_smart_service.financial_terms.keys()),
+    "total_count": len(ai_smart_service.financial_terms)
+})
+terms_store.add_reload_listener(financial_terms_resource.invalidate)
 
 class PersonalizedAdviceRequest(BaseModel):
     user_profile: UserProfile
@@ -34,7 +86,7 @@ class ScenarioSimulationRequest(BaseModel):
 def simulate_financial_scenario(request: ScenarioSimulationRequest):
     """
     Simulate financial scenarios like savings rate changes, investment returns, etc.
-    Supported scenarios: 'savings_rate', 'investment_return', 'retirement'
+    Supported scenarios: 'savings_rate', 'investment_return', 'retirement', 'retirement_monte_carlo'
     """
     try:
         result = ai_smart_service.simulate_scenario(request.scenario_type, request.parameters)
@@ -42,17 +94,44 @@ def simulate_financial_scenario(request: ScenarioSimulationRequest):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+class ScenarioSweepRequest(BaseModel):
+    scenario_type: str
+    parameters: Dict[str, Any] = {}
+    ranges: Dict[str, Any]
+
+@router.post("/scenario-sweep")
+def sweep_financial_scenario(request: ScenarioSweepRequest):
+    """
+    Evaluate a scenario over every combination of parameter ranges, e.g.
+    savings_rate 5-40% x return_rate 3-10% x years 5-40, in one pass.
+    Ranges are value lists or {start, stop, step|num}. The response streams as
+    NDJSON: a header line describing the grid, then one line per point.
+    """
+    try:
+        result = sweep(request.scenario_type, request.parameters, request.ranges)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(result.iter_ndjson(), media_type="application/x-ndjson")
+
 @router.get("/explain-term/{term}")
-def explain_financial_term(term: str):
+def explain_financial_term(term: str, lang: Optional[str] = Query(None, min_length=2, max_length=10)):
     """
-    Get explanation for a financial term
+    Get explanation for a financial term, in `lang` when the glossary has a translation
     """
     try:
-        explanation = ai_smart_service.explain_financial_term(term)
+        explanation = ai_smart_service.explain_financial_term(term, lang)
         return explanation
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/terms/autocomplete")
+def autocomplete_financial_terms(q: str = Query(..., min_length=1, max_length=100),
+                                 limit: int = Query(10, ge=1, le=50)):
+    """
+    Suggest financial terms as the user types, tolerating typos
+    """
+    return {"query": q, "suggestions": ai_smart_service.autocomplete_terms(q, limit)}
+
 class GoalPredictionRequest(BaseModel):
     goal_name: str
     target_amount: float
@@ -84,44 +163,21 @@ def predict_goal_achievement(request: GoalPredictionRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/available-scenarios")
-def get_available_scenarios():
+def get_available_scenarios(request: Request):
     """
     Get list of available scenario simulation types
     """
-    return {
-        "scenarios": [
-            {
-                "type": "savings_rate",
-                "name": "Savings Rate Simulation",
-                "description": "Simulate what happens if you change your savings rate",
-                "parameters": ["annual_income", "current_savings", "savings_rate", "years", "return_rate"]
-            },
-            {
-                "type": "investment_return",
-                "name": "Investment Return Comparison",
-                "description": "Compare different investment return scenarios",
-                "parameters": ["initial_amount", "monthly_contribution", "years", "return_rates"]
-            },
-            {
-                "type": "retirement",
-                "name": "Retirement Planning",
-                "description": "Simulate retirement savings scenarios",
-                "parameters": ["current_age", "retirement_age", "current_savings", "monthly_contribution", "return_rate"]
-            }
-        ]
-    }
+    return available_scenarios_resource.respond(request)
 
 @router.get("/financial-terms")
-def get_financial_terms():
+def get_financial_terms(request: Request):
     """
     Get all available financial terms
     """
     try:
-        terms = ai_smart_service.financial_terms
-        return {
-            "terms": list(terms.keys()),
-            "total_count": len(terms)
-        }
+        # Reading the snapshot runs the reload check, whose listener invalidates the resource
+        terms_store.snapshot
+        return financial_terms_resource.respond(request)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -130,70 +186,70 @@ class SmartAnalysisRequest(BaseModel):
     spending_data: List[Dict[str, Any]]
     savings_goals: List[Dict[str, Any]]
 
-@router.post("/smart-analysis")
+def _analyze(request: SmartAnalysisRequest) -> Dict[str, Any]:
+    """Combine personalized advice, goal predictions and spending analysis"""
+    # Calculate spending habits
+    spending_habits = {}
+    for expense in request.spending_data:
+        category = expense.get("category", "other")
+        amount = expense.get("amount", 0)
+        spending_habits[category] = spending_habits.get(category, 0) + amount
+    
+    # Calculate current savings
+    current_savings = sum(goal.get("current_amount", 0) for goal in request.savings_goals)
+    
+    # Get personalized advice
+    advice = ai_smart_service.get_personalized_advice(request.user_profile, spending_habits, current_savings)
+    
+    # Analyze each savings goal
+    from backend.models.finance_models import SavingsGoal
+    from datetime import date
+    
+    goals = [
+        SavingsGoal(
+            name=goal.get("name", "Unknown Goal"),
+            target_amount=goal.get("target_amount", 0),
+            current_amount=goal.get("current_amount", 0),
+            target_date=date.today().replace(year=date.today().year + 10),
+            priority=1
+        )
+        for goal in request.savings_goals
+    ]
+    
+    # Predict goal achievement with different contribution levels, all goals in one solve
+    monthly_contributions = [100, 200, 500, 1000]
+    grid = ai_smart_service.predict_goal_achievement_grid(goals, monthly_contributions, [0.05])
+    
+    goal_analyses = []
+    for goal, predictions in zip(goals, grid):
+        goal_analyses.append({
+            "goal_name": goal.name,
+            "target_amount": goal.target_amount,
+            "current_amount": goal.current_amount,
+            "predictions": [
+                {"monthly_contribution": contribution, "prediction": by_return[0]}
+                for contribution, by_return in zip(monthly_contributions, predictions)
+            ]
+        })
+    
+    return {
+        "personalized_advice": advice,
+        "goal_analyses": goal_analyses,
+        "spending_analysis": {
+            "total_spending": sum(spending_habits.values()),
+            "spending_by_category": spending_habits,
+            "savings_rate": (request.user_profile.income / 12 - sum(spending_habits.values())) / (request.user_profile.income / 12) if request.user_profile.income > 0 else 0
+        }
+    }
+
+@router.post("/smart-analysis", dependencies=[Depends(smart_analysis_limiter)])
 def get_smart_financial_analysis(request: SmartAnalysisRequest):
     """
-    Get comprehensive smart analysis combining all AI features
+    Get comprehensive smart analysis combining all AI features.
+    Identical analyses requested concurrently (e.g. from several tabs) are computed once.
     """
     try:
-        # Calculate spending habits
-        spending_habits = {}
-        for expense in request.spending_data:
-            category = expense.get("category", "other")
-            amount = expense.get("amount", 0)
-            spending_habits[category] = spending_habits.get(category, 0) + amount
-        
-        # Calculate current savings
-        current_savings = sum(goal.get("current_amount", 0) for goal in request.savings_goals)
-        
-        # Get personalized advice
-        advice = ai_smart_service.get_personalized_advice(request.user_profile, spending_habits, current_savings)
-        
-        # Analyze each savings goal
-        from backend.models.finance_models import SavingsGoal
-        from datetime import date
-        
-        goal_analyses = []
-        for goal in request.savings_goals:
-            goal_name = goal.get("name", "Unknown Goal")
-            target_amount = goal.get("target_amount", 0)
-            current_amount = goal.get("current_amount", 0)
-            
-            # Predict goal achievement with different contribution levels
-            monthly_contributions = [100, 200, 500, 1000]
-            predictions = []
-            
-            for monthly_contrib in monthly_contributions:
-                pred = ai_smart_service.predict_goal_achievement(
-                    SavingsGoal(
-                        name=goal_name,
-                        target_amount=target_amount,
-                        current_amount=current_amount,
-                        target_date=date.today().replace(year=date.today().year + 10),
-                        priority=1
-                    ),
-                    monthly_contrib
-                )
-                predictions.append({
-                    "monthly_contribution": monthly_contrib,
-                    "prediction": pred
-                })
-            
-            goal_analyses.append({
-                "goal_name": goal_name,
-                "target_amount": target_amount,
-                "current_amount": current_amount,
-                "predictions": predictions
-            })
-        
-        return {
-            "personalized_advice": advice,
-            "goal_analyses": goal_analyses,
-            "spending_analysis": {
-                "total_spending": sum(spending_habits.values()),
-                "spending_by_category": spending_habits,
-                "savings_rate": (request.user_profile.income / 12 - sum(spending_habits.values())) / (request.user_profile.income / 12) if request.user_profile.income > 0 else 0
-            }
-        }
+        key = flight_key(None, "smart-analysis", request.model_dump())
+        return smart_analysis_flight.do(key, lambda: _analyze(request))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,167 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+from backend.database import SessionLocal, get_db
+from backend.auth import get_optional_current_user
+from backend.models.database_models import User
+from backend.utils.admission import AdmissionLimiter
+from backend.utils.logging_setup import request_id_var
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+import asyncio
+import json
+import threading
+
+router = APIRouter()
+
+MAX_SUB_REQUESTS = 20
+
+# A batch fans out into up to MAX_SUB_REQUESTS handlers, so admit few at a time
+batch_limiter = AdmissionLimiter("batch", max_concurrent=8, max_queue=16, queue_timeout=2.0, max_per_client=2)
+ALLOWED_METHODS = {"GET", "POST", "PUT", "DELETE"}
+
+class SubRequest(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    requests: List[SubRequest]
+
+class SharedSessionPool:
+    """DB sessions shared by the sub-requests of one batch; each is used by one sub-request at a time"""
+
+    def __init__(self, seed: Session):
+        self._idle: List[Session] = [seed]
+        self._created: List[Session] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Session:
+        """Borrow an idle session, opening a new one only if all are in use"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        db = SessionLocal()
+        with self._lock:
+            self._created.append(db)
+        return db
+
+    def release(self, db: Session):
+        """Return a session to the pool, discarding any uncommitted work"""
+        db.rollback()
+        with self._lock:
+            self._idle.append(db)
+
+    def close(self):
+        """Close the sessions opened for the batch; the seed session belongs to the caller"""
+        with self._lock:
+            created, self._created = self._created, []
+            self._idle = []
+        for db in created:
+            db.close()
+
+async def _dispatch(request: Request, sub: SubRequest, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one sub-request through the application in-process and capture its response"""
+    method = sub.method.upper()
+    if method not in ALLOWED_METHODS:
+        return {"id": sub.id, "status": 405, "error": f"Method {sub.method} not allowed in batch"}
+    if not sub.path.startswith("/api/") or sub.path.startswith("/api/batch"):
+        return {"id": sub.id, "status": 400, "error": "Path must be an /api/ route other than /api/batch"}
+
+    body = b"" if sub.body is None else json.dumps(sub.body).encode("utf-8")
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers.append((b"authorization", authorization.encode("latin-1")))
+    # Sub-requests log under the batch's request ID
+    headers.append((b"x-request-id", request_id_var.get().encode("latin-1")))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": request.url.scheme,
+        "path": sub.path,
+        "raw_path": sub.path.encode("utf-8"),
+        "root_path": "",
+        "query_string": urlencode(sub.params, doseq=True).encode("utf-8"),
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "state": state,
+    }
+
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    response: Dict[str, Any] = {"status": 500, "headers": {}, "chunks": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode("latin-1"): v.decode("latin-1") for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["chunks"].append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        return {"id": sub.id, "status": 500, "error": str(e)}
+
+    raw = b"".join(response["chunks"])
+    if response["headers"].get("content-type", "").startswith("application/json") and raw:
+        payload = json.loads(raw)
+    else:
+        payload = raw.decode("utf-8", errors="replace") or None
+
+    result = {"id": sub.id, "status": response["status"]}
+    if response["status"] >= 400:
+        result["error"] = payload.get("detail", payload) if isinstance(payload, dict) else payload
+    else:
+        result["body"] = payload
+    return result
+
+@router.post("", dependencies=[Depends(batch_limiter)])
+async def run_batch(
+    request: Request,
+    batch: BatchRequest,
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Run several API calls in one round trip.
+    Sub-requests run concurrently in-process, share the caller's authentication and
+    a pool of DB sessions, and report their status individually.
+    """
+    if not batch.requests:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one request")
+    if len(batch.requests) > MAX_SUB_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {MAX_SUB_REQUESTS} requests")
+
+    # Detach the user so each sub-request can merge it into its own session
+    if current_user is not None:
+        db.expunge(current_user)
+
+    sessions = SharedSessionPool(db)
+    state = dict(request.scope.get("state") or {})
+    state["batch_sessions"] = sessions
+    state["batch_user"] = current_user
+    try:
+        results = await asyncio.gather(*(_dispatch(request, sub, state) for sub in batch.requests))
+    finally:
+        sessions.close()
+
+    return {
+        "responses": results,
+        "succeeded": sum(1 for r in results if r["status"] < 400),
+        "failed": sum(1 for r in results if r["status"] >= 400)
+    }
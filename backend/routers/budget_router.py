@@ -1,10 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from backend.models.finance_models import BudgetPlan, BudgetItem, BudgetCategory
 from backend.services.budget_service import BudgetService
+from backend.utils.http_cache import StaticResource
 from typing import List, Dict
 
 router = APIRouter()
 
+budget_categories_resource = StaticResource(lambda: {
+    "categories": [
+        {"value": category.value, "name": category.value.replace("_", " ").title()}
+        for category in BudgetCategory
+    ]
+})
+
 @router.post("/generate", response_model=BudgetPlan)
 def generate_budget_plan(monthly_income: float, user_preferences: Dict[str, float] = None):
     """
@@ -28,16 +36,11 @@ def analyze_budget_performance(budget_plan: BudgetPlan, actual_expenses: List[Di
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/categories")
-def get_budget_categories():
+def get_budget_categories(request: Request):
     """
     Get available budget categories
     """
-    return {
-        "categories": [
-            {"value": category.value, "name": category.value.replace("_", " ").title()}
-            for category in BudgetCategory
-        ]
-    }
+    return budget_categories_resource.respond(request)
 
 @router.post("/custom-budget")
 def create_custom_budget(monthly_income: float, budget_items: List[BudgetItem]):
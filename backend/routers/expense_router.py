@@ -1,62 +1,91 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
 from backend.models.finance_models import Expense, ExpenseSummary, BudgetCategory
 from backend.services.expense_service import expense_service
 from backend.database import get_db
 from backend.auth import get_current_active_user
 from backend.models.database_models import User
+from backend.utils.http_cache import StaticResource, data_versions, user_resource_response
+from backend.utils.fieldsets import parse_fields
+from backend.utils.admission import AdmissionLimiter
+from backend.utils.single_flight import SingleFlight, flight_key
+from backend.utils.idempotency import idempotency_store
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 
 router = APIRouter()
 
+# The full breakdown loads every transaction of the user
+breakdown_limiter = AdmissionLimiter(
+    "expense_breakdown", max_concurrent=4, max_queue=8, queue_timeout=2.0, max_per_client=2, retry_after=2
+)
+
+summary_flight = SingleFlight("expense_summary")
+
+expense_categories_resource = StaticResource(lambda: {
+    "categories": [
+        {"value": category.value, "name": category.value.replace("_", " ").title()}
+        for category in BudgetCategory
+    ]
+})
+
 @router.post("/expenses")
 def add_expense(
     expense: Expense,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Add a new expense
+    Add a new expense.
+    Retries carrying the same Idempotency-Key return the original response instead of adding a duplicate.
     """
-    try:
-        created_expense = expense_service.add_expense(expense, current_user.id, db)
-        return {
-            "id": created_expense.id,
-            "description": created_expense.description,
-            "amount": created_expense.amount,
-            "category": created_expense.category,
-            "date": created_expense.date.isoformat(),
-            "created_at": created_expense.created_at.isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    def create():
+        try:
+            created_expense = expense_service.add_expense(expense, current_user.id, db)
+            return {
+                "id": created_expense.id,
+                "description": created_expense.description,
+                "amount": created_expense.amount,
+                "category": created_expense.category,
+                "date": created_expense.date.isoformat(),
+                "created_at": created_expense.created_at.isoformat()
+            }
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return idempotency_store.run(
+        idempotency_key, (current_user.id, "POST /expenses/expenses"), expense, create, response
+    )
 
 @router.get("/expenses")
 def get_expenses(
+    request: Request,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get expenses within a date range
+    Get expenses within a date range.
+    Pass a comma-separated `fields` list to return (and query) only those columns.
     """
-    expenses = expense_service.get_expenses(current_user.id, start_date, end_date, db)
-    return [
-        {
-            "id": expense.id,
-            "description": expense.description,
-            "amount": expense.amount,
-            "category": expense.category,
-            "date": expense.date.isoformat(),
-            "created_at": expense.created_at.isoformat()
-        }
-        for expense in expenses
-    ]
+    try:
+        selected = parse_fields(fields, expense_service.EXPENSE_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return user_resource_response(
+        request, current_user.id, "expenses",
+        {"start_date": start_date, "end_date": end_date, "fields": selected},
+        lambda: expense_service.get_expense_rows(current_user.id, selected, start_date, end_date, db)
+    )
 
 @router.get("/expenses/summary")
 def get_expense_summary(
+    request: Request,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     current_user: User = Depends(get_current_active_user),
@@ -65,17 +94,40 @@ def get_expense_summary(
     """
     Get expense summary and analysis
     """
-    return expense_service.get_expense_summary(current_user.id, start_date, end_date, db)
+    # The monthly trend is relative to today, so the date is part of the ETag
+    params = {"start_date": start_date, "end_date": end_date, "today": date.today()}
+    # Read the version once: a request arriving after a write must not join a flight
+    # that started before it, or it would serve pre-write data under the new ETag
+    version = data_versions.get(current_user.id)
+    key = flight_key(current_user.id, "expenses/summary", {**params, "version": version})
+    return user_resource_response(
+        request, current_user.id, "expenses/summary", params,
+        lambda: summary_flight.do(
+            key, lambda: expense_service.get_expense_summary(current_user.id, start_date, end_date, db)
+        ),
+        version=version
+    )
 
-@router.get("/expenses/breakdown")
+@router.get("/expenses/breakdown", dependencies=[Depends(breakdown_limiter)])
 def get_category_breakdown(
+    request: Request,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get detailed expense breakdown by category
+    Get detailed expense breakdown by category.
+    Omitting `transactions` from `fields` lets the database aggregate the totals.
     """
-    return expense_service.get_category_breakdown(current_user.id, db)
+    try:
+        selected = parse_fields(fields, expense_service.BREAKDOWN_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return user_resource_response(
+        request, current_user.id, "expenses/breakdown", {"fields": selected},
+        lambda: expense_service.get_category_breakdown(current_user.id, db, selected)
+    )
 
 @router.delete("/expenses/{expense_id}")
 def delete_expense(
@@ -92,13 +144,8 @@ def delete_expense(
     return {"message": "Expense deleted successfully"}
 
 @router.get("/categories")
-def get_expense_categories():
+def get_expense_categories(request: Request):
     """
     Get available expense categories
     """
-    return {
-        "categories": [
-            {"value": category.value, "name": category.value.replace("_", " ").title()}
-            for category in BudgetCategory
-        ]
-    }
+    return expense_categories_resource.respond(request)
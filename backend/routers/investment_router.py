@@ -1,10 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from backend.models.finance_models import InvestmentRecommendation, UserProfile, InvestmentRisk
 from backend.services.investment_service import InvestmentService
+from backend.utils.http_cache import StaticResource
 from typing import List, Dict
 
 router = APIRouter()
 
+risk_levels_resource = StaticResource(lambda: {
+    "risk_levels": [
+        {
+            "level": risk.value,
+            "description": InvestmentService.INVESTMENT_OPTIONS[risk]["description"],
+            "expected_return": InvestmentService.INVESTMENT_OPTIONS[risk]["expected_return"]
+        }
+        for risk in InvestmentRisk
+    ]
+})
+
 @router.post("/recommendations", response_model=InvestmentRecommendation)
 def get_investment_recommendation(user_profile: UserProfile):
     """
@@ -56,20 +68,11 @@ def calculate_retirement_savings(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/risk-levels")
-def get_risk_levels():
+def get_risk_levels(request: Request):
     """
     Get available risk levels and their descriptions
     """
-    return {
-        "risk_levels": [
-            {
-                "level": risk.value,
-                "description": InvestmentService.INVESTMENT_OPTIONS[risk]["description"],
-                "expected_return": InvestmentService.INVESTMENT_OPTIONS[risk]["expected_return"]
-            }
-            for risk in InvestmentRisk
-        ]
-    }
+    return risk_levels_resource.respond(request)
 
 @router.get("/investment-options/{risk_level}")
 def get_investment_options(risk_level: InvestmentRisk):
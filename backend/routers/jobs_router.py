@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from backend.auth import get_current_active_user
+from backend.models.database_models import User
+from backend.services.simulation_jobs import register_simulation_jobs
+from backend.utils.jobs import CANCELLED, FAILED, SUCCEEDED, job_manager
+from typing import Any, Dict
+
+router = APIRouter()
+
+register_simulation_jobs(job_manager)
+
+class JobRequest(BaseModel):
+    kind: str
+    spec: Dict[str, Any] = {}
+
+@router.post("", status_code=202)
+def submit_job(request: JobRequest, current_user: User = Depends(get_current_active_user)):
+    """
+    Submit a long-running simulation or report ('scenario', 'sweep', 'retirement_report').
+    Poll the returned status URL, then fetch the result.
+    """
+    job = job_manager.submit(current_user.id, request.kind, request.spec)
+    return {**job.describe(), "status_url": f"/api/jobs/{job.id}", "result_url": f"/api/jobs/{job.id}/result"}
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Get a job's status and progress (0-1)
+    """
+    return job_manager.get(job_id, current_user.id).describe()
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Get a finished job's result; 202 with the status while it is still running
+    """
+    job = job_manager.get(job_id, current_user.id)
+    status = job.describe()
+    if job.status == SUCCEEDED:
+        return {**status, "result": job.result}
+    if job.status in (FAILED, CANCELLED):
+        raise HTTPException(status_code=409, detail=f"Job {job.status}: {job.error or 'no result'}")
+    return JSONResponse(status_code=202, content=status, headers={"Retry-After": "1"})
+
+@router.delete("/{job_id}")
+def cancel_job(job_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Cancel a queued or running job
+    """
+    return job_manager.cancel(job_id, current_user.id).describe()
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from backend.utils.metrics import metrics
+
+router = APIRouter()
+
+@router.get("")
+def get_metrics():
+    """
+    Get operational metrics for this worker process
+    """
+    return metrics.collect()
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
+from backend.auth import get_optional_current_user
+from backend.models.database_models import User
+from backend.utils.idempotency import idempotency_store
 import random
 
 router = APIRouter()
@@ -85,36 +88,49 @@ def get_dashboard_data():
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/support/apply")
-def submit_support_application(application: SupportApplication):
+def submit_support_application(
+    application: SupportApplication,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: Optional[User] = Depends(get_optional_current_user)
+):
     """
-    Submit a new support application
+    Submit a new support application.
+    Retries carrying the same Idempotency-Key return the original application instead of a new one.
     """
-    try:
-        # Generate application ID
-        app_id = f"REQ-{random.randint(1000, 9999)}"
+    def submit():
+        try:
+            # Generate application ID
+            app_id = f"REQ-{random.randint(1000, 9999)}"
         
-        # Simulate processing
-        estimated_processing_time = {
-            "Critical": "2-4 hours",
-            "High": "1-2 days", 
-            "Medium": "3-5 days",
-            "Low": "1-2 weeks"
-        }
+            # Simulate processing
+            estimated_processing_time = {
+                "Critical": "2-4 hours",
+                "High": "1-2 days", 
+                "Medium": "3-5 days",
+                "Low": "1-2 weeks"
+            }
         
-        return {
-            "application_id": app_id,
-            "status": "submitted",
-            "estimated_processing_time": estimated_processing_time.get(application.urgency, "3-5 days"),
-            "confirmation_email_sent": True,
-            "next_steps": [
-                "You will receive a confirmation email within 24 hours",
-                "Our team will review your application",
-                "You may be contacted for additional information",
-                "A decision will be made within the estimated timeframe"
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+            return {
+                "application_id": app_id,
+                "status": "submitted",
+                "estimated_processing_time": estimated_processing_time.get(application.urgency, "3-5 days"),
+                "confirmation_email_sent": True,
+                "next_steps": [
+                    "You will receive a confirmation email within 24 hours",
+                    "Our team will review your application",
+                    "You may be contacted for additional information",
+                    "A decision will be made within the estimated timeframe"
+                ]
+            }
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # Keys belong to the signed-in user, or else to the applicant, so clients can't replay each other's
+    client = current_user.id if current_user is not None else application.email.strip().lower()
+    return idempotency_store.run(
+        idempotency_key, (client, "POST /mobile/support/apply"), application, submit, response
+    )
 
 @router.get("/support/requests")
 def get_support_requests():
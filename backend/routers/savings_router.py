@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
 from backend.models.finance_models import SavingsGoal
 from backend.services.savings_service import savings_service
 from backend.database import get_db
 from backend.auth import get_current_active_user
 from backend.models.database_models import User
+from backend.utils.http_cache import user_resource_response
+from backend.utils.fieldsets import parse_fields
+from backend.utils.idempotency import idempotency_store
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import date
 
 router = APIRouter()
@@ -13,47 +16,54 @@ router = APIRouter()
 @router.post("/goals")
 def create_savings_goal(
     goal: SavingsGoal,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Create a new savings goal
+    Create a new savings goal.
+    Retries carrying the same Idempotency-Key return the original response instead of creating a duplicate.
     """
-    try:
-        created_goal = savings_service.create_savings_goal(goal, current_user.id, db)
-        return {
-            "id": created_goal.id,
-            "name": created_goal.name,
-            "target_amount": created_goal.target_amount,
-            "current_amount": created_goal.current_amount,
-            "target_date": created_goal.target_date.isoformat(),
-            "priority": created_goal.priority,
-            "created_at": created_goal.created_at.isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    def create():
+        try:
+            created_goal = savings_service.create_savings_goal(goal, current_user.id, db)
+            return {
+                "id": created_goal.id,
+                "name": created_goal.name,
+                "target_amount": created_goal.target_amount,
+                "current_amount": created_goal.current_amount,
+                "target_date": created_goal.target_date.isoformat(),
+                "priority": created_goal.priority,
+                "created_at": created_goal.created_at.isoformat()
+            }
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return idempotency_store.run(
+        idempotency_key, (current_user.id, "POST /savings/goals"), goal, create, response
+    )
 
 @router.get("/goals")
 def get_savings_goals(
+    request: Request,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get all savings goals
+    Get all savings goals.
+    Pass a comma-separated `fields` list to return (and query) only those columns.
     """
-    goals = savings_service.get_savings_goals(current_user.id, db)
-    return [
-        {
-            "id": goal.id,
-            "name": goal.name,
-            "target_amount": goal.target_amount,
-            "current_amount": goal.current_amount,
-            "target_date": goal.target_date.isoformat(),
-            "priority": goal.priority,
-            "created_at": goal.created_at.isoformat()
-        }
-        for goal in goals
-    ]
+    try:
+        selected = parse_fields(fields, savings_service.GOAL_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return user_resource_response(
+        request, current_user.id, "savings/goals", {"fields": selected},
+        lambda: savings_service.get_savings_goal_rows(current_user.id, selected, db)
+    )
 
 @router.put("/goals/{goal_id}")
 def update_savings_goal(
@@ -0,0 +1,106 @@
+"""
+Production entry point: runs the API with several worker processes.
+
+With gunicorn installed (Linux/macOS) the app is imported once in the master and
+forked into the workers (preloading). `kill -HUP <master pid>` replaces the workers
+gracefully; since the app is preloaded, picking up new code needs `kill -USR2` (new
+master) followed by `kill -QUIT` of the old one. Elsewhere it falls back to uvicorn's
+own process manager.
+
+Usage:
+    python -m backend.serve --workers 4 --port 8000
+
+State that must agree across workers (per-user data versions, caches, rate limits)
+is kept in the backend named by FINMATE_STATE_URL, e.g. redis://localhost:6379/0.
+"""
+import argparse
+import multiprocessing
+import os
+
+APP = "backend.main:app"
+
+
+def default_workers() -> int:
+    """Worker count from FINMATE_WORKERS, defaulting to one per CPU"""
+    return int(os.getenv("FINMATE_WORKERS", multiprocessing.cpu_count()))
+
+
+def _uvicorn_worker_class() -> str:
+    try:
+        import uvicorn_worker  # noqa: F401
+        return "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        return "uvicorn.workers.UvicornWorker"
+
+
+def _post_fork(server, worker):
+    # Connections must never be shared between processes; start each worker with an empty pool
+    from backend.database import engine
+    engine.dispose()
+
+
+def run_gunicorn(host: str, port: int, workers: int, graceful_timeout: int, max_requests: int):
+    """Serve with gunicorn: preloaded app, forked workers, HUP for graceful reloads"""
+    from gunicorn.app.base import BaseApplication
+
+    class FinmateApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from backend.main import app
+            return app
+
+    FinmateApplication({
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": _uvicorn_worker_class(),
+        "preload_app": True,
+        "graceful_timeout": graceful_timeout,
+        "timeout": graceful_timeout * 2,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests // 10,
+        "post_fork": _post_fork,
+    }).run()
+
+
+def run_uvicorn(host: str, port: int, workers: int, graceful_timeout: int):
+    """Serve with uvicorn's multi-process manager (no preloading)"""
+    import uvicorn
+
+    uvicorn.run(APP, host=host, port=port, workers=workers, timeout_graceful_shutdown=graceful_timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the FinMate API with multiple workers")
+    parser.add_argument("--host", default=os.getenv("FINMATE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("FINMATE_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Seconds a worker may spend finishing requests on reload or shutdown")
+    parser.add_argument("--max-requests", type=int, default=10000,
+                        help="Recycle a worker after this many requests (gunicorn only, 0 disables)")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "uvicorn"], default="auto")
+    args = parser.parse_args()
+
+    server = args.server
+    if server == "auto":
+        try:
+            import gunicorn  # noqa: F401
+            server = "gunicorn"
+        except ImportError:
+            server = "uvicorn"
+
+    if server == "gunicorn":
+        run_gunicorn(args.host, args.port, args.workers, args.graceful_timeout, args.max_requests)
+    else:
+        run_uvicorn(args.host, args.port, args.workers, args.graceful_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,52 @@
-def get_ai_response(user_input: str) -> str:
+from ai_core.intents import intent_classifier
+from ai_core.llm_pipeline import inference_stats, stream_ai_response as stream_pipeline_response, template_version
+from backend.services.chat_cache import chat_cache
+from backend.services.retrieval import DEFAULT_TOP_K, retrieval_store
+from backend.utils.metrics import metrics
+from typing import Any, Dict, Iterator, List, Optional
+import hashlib
+import json
+
+# Short advice for each chat intent
+INTENT_RESPONSES = {
+    "budget": "I recommend creating a 50/30/20 budget: 50% for needs, 30% for wants, and 20% for savings and debt repayment.",
+    "savings": "Start with an emergency fund of 3-6 months of expenses, then focus on retirement savings and other financial goals.",
+    "investment": "Consider diversifying your investments across stocks, bonds, and other assets. Start with low-cost index funds.",
+    "debt": "Focus on paying off high-interest debt first, then work on building an emergency fund.",
+    "retirement": "Aim to save 15-20% of your income for retirement. Take advantage of employer 401(k) matching if available."
+}
+
+GENERAL_RESPONSE = "I'm here to help with your financial questions! Feel free to ask about budgeting, saving, investing, or any other financial topics."
+
+# Fingerprint of the short answers; cached answers are keyed by it
+SHORT_TEMPLATE_VERSION = hashlib.sha1(
+    json.dumps([INTENT_RESPONSES, GENERAL_RESPONSE], sort_keys=True).encode("utf-8")
+).hexdigest()[:12]
+
+def get_ai_response(user_input: str, user_id: Optional[int] = None) -> str:
     """
-    Calls AI pipeline to get financial advice.
+    Calls AI pipeline to get financial advice. Answers are cached; pass `user_id`
+    when the answer is personalized.
     """
-    # Simple AI response based on keywords
-    user_input_lower = user_input.lower()
-    
-    if "budget" in user_input_lower:
-        return "I recommend creating a 50/30/20 budget: 50% for needs, 30% for wants, and 20% for savings and debt repayment."
-    elif "savings" in user_input_lower:
-        return "Start with an emergency fund of 3-6 months of expenses, then focus on retirement savings and other financial goals."
-    elif "investment" in user_input_lower:
-        return "Consider diversifying your investments across stocks, bonds, and other assets. Start with low-cost index funds."
-    elif "debt" in user_input_lower:
-        return "Focus on paying off high-interest debt first, then work on building an emergency fund."
-    elif "retirement" in user_input_lower:
-        return "Aim to save 15-20% of your income for retirement. Take advantage of employer 401(k) matching if available."
-    else:
-        return "I'm here to help with your financial questions! Feel free to ask about budgeting, saving, investing, or any other financial topics."
+    return chat_cache.get_or_generate("short", SHORT_TEMPLATE_VERSION, user_input, _short_answer, user_id)
+
+def _short_answer(user_input: str) -> str:
+    # Answer every topic the question is mainly about, strongest first
+    intents = intent_classifier.top_intents(user_input)
+    if not intents:
+        return GENERAL_RESPONSE
+    return " ".join(INTENT_RESPONSES[intent] for intent in intents)
+
+def stream_ai_response(user_input: str, user_id: Optional[int] = None) -> Iterator[str]:
+    """
+    Streams the AI pipeline's full advice in chunks, as they are produced (or from the cache).
+    """
+    return chat_cache.stream("full", template_version(), user_input, stream_pipeline_response, user_id)
+
+def cite_sources(user_input: str, k: int = DEFAULT_TOP_K) -> List[Dict[str, Any]]:
+    """
+    The glossary entries, advice and articles most relevant to the question, best first.
+    """
+    return retrieval_store.search(user_input, k)
+
+metrics.register("inference", inference_stats)
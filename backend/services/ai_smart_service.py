@@ -1,28 +1,57 @@
 from backend.models.finance_models import UserProfile, SavingsGoal, InvestmentRisk
+from backend.services.monte_carlo import ReturnDistribution, RetirementRun
+from backend.services.projection_engine import check_projection, months_to_target, project
+from backend.services.term_index import TermIndex, normalize_term
+from backend.services.terms_store import TermsSnapshot, terms_store
+from backend.utils.cache import cache, canonical_key, canonicalize
 from typing import Dict, List, Optional
 import json
 import math
+import numpy as np
 from datetime import date, datetime, timedelta
 
+# Upper bound on Monte Carlo paths per API request
+MAX_SCENARIO_PATHS = 100000
+
+def _number(params: Dict[str, any], name: str, default: float) -> float:
+    value = params.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+    return value
+
 class AISmartService:
     """Advanced AI service for personalized financial advice and smart features"""
     
     def __init__(self):
-        self.financial_terms = self._load_financial_terms()
+        # Terms changed on disk: drop cached explanations built from the old glossary
+        terms_store.add_reload_listener(lambda: cache.invalidate_namespace("terms"))
+    
+    @property
+    def financial_terms(self) -> TermsSnapshot:
+        """Financial terms, compiled and loaded on first use and hot-reloaded when the file changes"""
+        return terms_store.snapshot
     
-    def _load_financial_terms(self) -> Dict[str, str]:
-        """Load financial terms from JSON file"""
-        try:
-            with open('data/financial_terms.json', 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+    @property
+    def term_index(self) -> TermIndex:
+        """Prefix and typo-tolerant index over the current financial term keys"""
+        return terms_store.snapshot.index
     
     def get_personalized_advice(self, user_profile: UserProfile, 
                                spending_habits: Dict[str, float],
                                current_savings: float) -> Dict[str, any]:
         """Generate personalized financial advice based on user profile and habits"""
-        
+        key = json.dumps(
+            [user_profile.model_dump(mode="json"), spending_habits, current_savings],
+            sort_keys=True
+        )
+        return cache.get_or_compute(
+            "advice", key,
+            lambda: self._build_personalized_advice(user_profile, spending_habits, current_savings)
+        )
+    
+    def _build_personalized_advice(self, user_profile: UserProfile,
+                                   spending_habits: Dict[str, float],
+                                   current_savings: float) -> Dict[str, any]:
         advice = {
             "personalized_recommendations": [],
             "risk_assessment": self._assess_financial_risk(user_profile, spending_habits),
@@ -88,14 +117,48 @@ class AISmartService:
         return advice
     
     def simulate_scenario(self, scenario_type: str, parameters: Dict[str, any]) -> Dict[str, any]:
-        """Simulate financial scenarios like 'What if I save 20% of salary?'"""
-        
+        """
+        Simulate financial scenarios like 'What if I save 20% of salary?'
+        Results are memoized on the canonicalized parameters, since UI sliders repeat them constantly.
+        """
+        self.check_scenario(scenario_type, parameters)
+        if scenario_type == "retirement_monte_carlo" and parameters.get("seed") is None:
+            # Unseeded runs are meant to differ
+            return self._run_scenario(scenario_type, parameters)
+        # Compute from the canonical parameters too, so a cached result never depends on float noise
+        return cache.get_or_compute(
+            "scenarios", canonical_key([scenario_type, parameters]),
+            lambda: self._run_scenario(scenario_type, canonicalize(parameters)),
+            ttl=None
+        )
+    
+    def check_scenario(self, scenario_type: str, parameters: Dict[str, any]):
+        """Raise ValueError if a scenario's horizon or number of return rates is over the projection bounds"""
+        if scenario_type in ("savings_rate", "investment_return"):
+            years = _number(parameters, "years", 10)
+        elif scenario_type == "retirement":
+            years = _number(parameters, "retirement_age", 65) - _number(parameters, "current_age", 30)
+        elif scenario_type == "retirement_monte_carlo":
+            years = _number(parameters, "life_expectancy", 95) - _number(parameters, "current_age", 30)
+        else:
+            return
+        scenarios = 1
+        if scenario_type == "investment_return":
+            return_rates = parameters.get("return_rates", [0.05, 0.07, 0.10])
+            if not isinstance(return_rates, list) or not return_rates:
+                raise ValueError("return_rates must be a non-empty list of rates")
+            scenarios = len(return_rates)
+        check_projection(years * 12, scenarios)
+    
+    def _run_scenario(self, scenario_type: str, parameters: Dict[str, any]) -> Dict[str, any]:
         if scenario_type == "savings_rate":
             return self._simulate_savings_rate_scenario(parameters)
         elif scenario_type == "investment_return":
             return self._simulate_investment_scenario(parameters)
         elif scenario_type == "retirement":
             return self._simulate_retirement_scenario(parameters)
+        elif scenario_type == "retirement_monte_carlo":
+            return self._simulate_retirement_monte_carlo_scenario(parameters)
         else:
             return {"error": "Unknown scenario type"}
     
@@ -109,21 +172,10 @@ class AISmartService:
         
         monthly_income = current_income / 12
         monthly_savings = monthly_income * new_savings_rate
-        
-        # Calculate future value
-        monthly_return = return_rate / 12
         months = years * 12
         
-        # Future value of current savings
-        fv_current = current_savings * (1 + return_rate) ** years
-        
-        # Future value of monthly contributions
-        if monthly_return > 0:
-            fv_contributions = monthly_savings * (((1 + monthly_return) ** months - 1) / monthly_return)
-        else:
-            fv_contributions = monthly_savings * months
-        
-        total_future_value = fv_current + fv_contributions
+        projection = project(current_savings, monthly_savings, return_rate, months)
+        total_future_value = float(projection.final_values[0])
         
         return {
             "scenario": f"Save {new_savings_rate*100:.1f}% of income",
@@ -133,7 +185,8 @@ class AISmartService:
             "future_value": round(total_future_value, 2),
             "growth_amount": round(total_future_value - current_savings - (monthly_savings * months), 2),
             "years": years,
-            "return_rate": return_rate
+            "return_rate": return_rate,
+            "yearly_balances": projection.yearly_balances(0)
         }
     
     def _simulate_investment_scenario(self, params: Dict[str, any]) -> Dict[str, any]:
@@ -142,26 +195,20 @@ class AISmartService:
         monthly_contribution = params.get("monthly_contribution", 500)
         years = params.get("years", 10)
         return_rates = params.get("return_rates", [0.05, 0.07, 0.10])
+        months = years * 12
+        
+        # One vectorized pass over every return rate
+        projection = project(initial_amount, monthly_contribution, return_rates, months)
         
         scenarios = []
-        for rate in return_rates:
-            monthly_return = rate / 12
-            months = years * 12
-            
-            # Future value calculation
-            fv_initial = initial_amount * (1 + rate) ** years
-            if monthly_return > 0:
-                fv_contributions = monthly_contribution * (((1 + monthly_return) ** months - 1) / monthly_return)
-            else:
-                fv_contributions = monthly_contribution * months
-            
-            total_value = fv_initial + fv_contributions
-            
+        for i, rate in enumerate(return_rates):
+            total_value = float(projection.final_values[i])
             scenarios.append({
                 "return_rate": rate,
                 "future_value": round(total_value, 2),
                 "total_contributions": initial_amount + (monthly_contribution * months),
-                "growth": round(total_value - initial_amount - (monthly_contribution * months), 2)
+                "growth": round(total_value - initial_amount - (monthly_contribution * months), 2),
+                "yearly_balances": projection.yearly_balances(i)
             })
         
         return {
@@ -183,19 +230,8 @@ class AISmartService:
         years_to_retirement = retirement_age - current_age
         months_to_retirement = years_to_retirement * 12
         
-        # Calculate retirement savings
-        monthly_return = return_rate / 12
-        
-        # Future value of current savings
-        fv_current = current_savings * (1 + return_rate) ** years_to_retirement
-        
-        # Future value of monthly contributions
-        if monthly_return > 0:
-            fv_contributions = monthly_contribution * (((1 + monthly_return) ** months_to_retirement - 1) / monthly_return)
-        else:
-            fv_contributions = monthly_contribution * months_to_retirement
-        
-        total_retirement_savings = fv_current + fv_contributions
+        projection = project(current_savings, monthly_contribution, return_rate, months_to_retirement)
+        total_retirement_savings = float(projection.final_values[0])
         
         # Calculate monthly retirement income (4% rule)
         monthly_retirement_income = total_retirement_savings * 0.04 / 12
@@ -208,41 +244,105 @@ class AISmartService:
             "total_retirement_savings": round(total_retirement_savings, 2),
             "monthly_retirement_income": round(monthly_retirement_income, 2),
             "annual_retirement_income": round(monthly_retirement_income * 12, 2),
-            "return_rate": return_rate
+            "return_rate": return_rate,
+            "yearly_balances": projection.yearly_balances(0)
         }
     
-    def explain_financial_term(self, term: str) -> Dict[str, str]:
-        """Explain a financial term using the terms database"""
-        term_lower = term.lower().replace(" ", "_").replace("-", "_")
+    def _simulate_retirement_monte_carlo_scenario(self, params: Dict[str, any]) -> Dict[str, any]:
+        """Simulate retirement with random returns: how likely is the plan to last?"""
+        return self.monte_carlo_response(params, self.monte_carlo_run(params).run())
+    
+    def monte_carlo_run(self, params: Dict[str, any], max_paths: int = MAX_SCENARIO_PATHS) -> RetirementRun:
+        """Validate Monte Carlo scenario parameters and split the simulation into chunks"""
+        current_age = params.get("current_age", 30)
+        retirement_age = params.get("retirement_age", 65)
+        life_expectancy = params.get("life_expectancy", 95)
+        paths = params.get("paths", 10000)
+        
+        if not current_age <= retirement_age <= life_expectancy:
+            raise ValueError("Ages must satisfy current_age <= retirement_age <= life_expectancy")
+        if not 1 <= paths <= max_paths:
+            raise ValueError(f"paths must be between 1 and {max_paths}")
+        
+        distribution = ReturnDistribution.from_dict(params.get("return_distribution") or {
+            "type": "normal",
+            "mean": params.get("return_rate", 0.07),
+            "stdev": params.get("return_stdev", 0.15)
+        })
+        return RetirementRun(
+            current_savings=params.get("current_savings", 0),
+            monthly_contribution=params.get("monthly_contribution", 500),
+            years_to_retirement=retirement_age - current_age,
+            years_in_retirement=life_expectancy - retirement_age,
+            distribution=distribution,
+            paths=paths,
+            withdrawal_rate=params.get("withdrawal_rate", 0.04),
+            annual_withdrawal=params.get("annual_withdrawal"),
+            inflation=params.get("inflation", 0.0),
+            seed=params.get("seed")
+        )
+    
+    def monte_carlo_response(self, params: Dict[str, any], result: Dict[str, any]) -> Dict[str, any]:
+        """Scenario response for a finished Monte Carlo run"""
+        current_age = params.get("current_age", 30)
+        life_expectancy = params.get("life_expectancy", 95)
+        return {
+            "scenario": "Retirement Monte Carlo",
+            "current_age": current_age,
+            "retirement_age": params.get("retirement_age", 65),
+            "life_expectancy": life_expectancy,
+            "ages": list(range(current_age, life_expectancy + 1)),
+            **result
+        }
+    
+    def explain_financial_term(self, term: str, language: Optional[str] = None) -> Dict[str, str]:
+        """Explain a financial term using the terms database, in `language` when the glossary has it"""
+        return cache.get_or_compute(
+            "terms", canonical_key([term, language]), lambda: self._lookup_financial_term(term, language)
+        )
+    
+    def _lookup_financial_term(self, term: str, language: Optional[str] = None) -> Dict[str, str]:
+        term_lower = normalize_term(term)
+        definition = self.financial_terms.definition(term_lower, language)
         
-        if term_lower in self.financial_terms:
+        if definition is not None:
             return {
                 "term": term,
-                "definition": self.financial_terms[term_lower],
+                "definition": definition,
                 "found": True
             }
         else:
-            # Try to find similar terms
-            similar_terms = [t for t in self.financial_terms.keys() if term_lower in t or t in term_lower]
+            # Closest terms: containing the query first, then by edit distance
             return {
                 "term": term,
                 "definition": f"Term '{term}' not found in database.",
                 "found": False,
-                "similar_terms": similar_terms[:5] if similar_terms else []
+                "similar_terms": self.term_index.similar(term_lower, limit=5)
             }
     
+    def autocomplete_terms(self, text: str, limit: int = 10) -> List[str]:
+        """Terms starting with `text`, topped up with close matches for typos"""
+        return self.term_index.autocomplete(text, limit)
+    
     def predict_goal_achievement(self, goal: SavingsGoal, 
                                 monthly_contribution: float,
                                 expected_return: float = 0.05) -> Dict[str, any]:
         """Predict how long it will take to achieve a savings goal"""
-        
+        key = canonical_key([goal.target_amount, goal.current_amount, monthly_contribution, expected_return])
+        return cache.get_or_compute(
+            "goal_predictions", key,
+            lambda: self._predict_goal_achievement(goal, monthly_contribution, expected_return),
+            ttl=None
+        )
+    
+    def _predict_goal_achievement(self, goal: SavingsGoal, monthly_contribution: float,
+                                  expected_return: float) -> Dict[str, any]:
         if monthly_contribution <= 0:
             return {
                 "achievable": False,
                 "message": "Monthly contribution must be greater than 0"
             }
         
-        # Calculate months needed using compound interest formula
         remaining_amount = goal.target_amount - goal.current_amount
         
         if remaining_amount <= 0:
@@ -253,25 +353,56 @@ class AISmartService:
                 "message": "Goal already achieved!"
             }
         
-        monthly_return = expected_return / 12
+        months_needed = float(months_to_target(goal.target_amount, goal.current_amount,
+                                               monthly_contribution, expected_return))
+        return self._describe_goal_prediction(months_needed, monthly_contribution, expected_return)
+    
+    def predict_goal_achievement_grid(self, goals: List[SavingsGoal],
+                                      monthly_contributions: List[float],
+                                      expected_returns: List[float]) -> List[List[List[Dict[str, any]]]]:
+        """
+        Predict every goal x contribution x return combination in one vectorized solve.
+        Returns predictions indexed as [goal][contribution][return].
+        """
+        targets = np.array([goal.target_amount for goal in goals], dtype=float)
+        currents = np.array([goal.current_amount for goal in goals], dtype=float)
+        months = months_to_target(
+            targets[:, None, None],
+            currents[:, None, None],
+            np.asarray(monthly_contributions, dtype=float)[None, :, None],
+            np.asarray(expected_returns, dtype=float)[None, None, :]
+        )
+        
+        grid = []
+        for g, goal in enumerate(goals):
+            grid.append([
+                [
+                    self.predict_goal_achievement(goal, contribution, rate)
+                    if contribution <= 0 or goal.target_amount <= goal.current_amount
+                    else self._describe_goal_prediction(float(months[g, c, r]), contribution, rate)
+                    for r, rate in enumerate(expected_returns)
+                ]
+                for c, contribution in enumerate(monthly_contributions)
+            ])
+        return grid
+    
+    def _describe_goal_prediction(self, months_needed: float, monthly_contribution: float,
+                                  expected_return: float) -> Dict[str, any]:
+        """Turn a solved months-to-goal into the prediction response"""
+        # Check if goal is achievable within reasonable time
+        achievable = months_needed <= 50 * 12  # Reasonable upper limit
         
-        if monthly_return > 0:
-            # Use compound interest formula to solve for time
-            # FV = PV(1+r)^n + PMT[((1+r)^n - 1)/r]
-            # Solving for n (months)
-            try:
-                # This is a simplified calculation - in practice, you'd use numerical methods
-                months_needed = math.ceil(remaining_amount / monthly_contribution)
-            except:
-                months_needed = remaining_amount / monthly_contribution
-        else:
-            months_needed = remaining_amount / monthly_contribution
+        if math.isinf(months_needed):
+            return {
+                "achievable": False,
+                "months_to_goal": None,
+                "years_to_goal": None,
+                "monthly_contribution": monthly_contribution,
+                "expected_return": expected_return,
+                "message": "Goal is never reached at this contribution and return"
+            }
         
         years_needed = months_needed / 12
-        
-        # Check if goal is achievable within reasonable time
-        achievable = years_needed <= 50  # Reasonable upper limit
-        
         return {
             "achievable": achievable,
             "months_to_goal": round(months_needed, 1),
@@ -0,0 +1,117 @@
+"""
+Response cache for the AI coach chat.
+
+Most chat traffic is the same few questions, so answers are cached in the shared
+service cache (LRU by size, plus a TTL). The key is the detected intents plus the
+normalized message, so "How do I budget?" and "how do i budget" share an entry.
+Messages with no detected intent are keyed by their exact text, because the
+general answer quotes the question. Keys also carry the version of the templates
+and backend that produced the answer, so changed templates never serve stale
+text. Personalized answers are cached in the user's namespace, which every
+write to their data invalidates.
+"""
+from ai_core.intents import intent_classifier
+from backend.utils.cache import cache
+from backend.utils.metrics import metrics
+from typing import Callable, Dict, Iterator, List, Optional
+import os
+import re
+import threading
+import time
+
+CHAT_CACHE_TTL = float(os.getenv("FINMATE_CHAT_CACHE_TTL", "3600"))
+
+_NOISE = re.compile(r"[^\w$%/()'.-]+|[.?!]+(?=\s|$)")
+
+
+def normalize_message(message: str) -> str:
+    """Lower case, punctuation at the end of sentences dropped, whitespace collapsed"""
+    return " ".join(_NOISE.sub(" ", message.lower()).split())
+
+
+class ChatResponseCache:
+    """Caches chat answers and reports how much generation time the hits saved"""
+
+    def __init__(self, ttl: float = CHAT_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "hit_seconds": 0.0, "miss_seconds": 0.0}
+
+    def _location(self, kind: str, version: str, message: str, user_id: Optional[int]):
+        intents = intent_classifier.top_intents(message)
+        text = normalize_message(message) if intents else message
+        namespace = f"{cache.user_namespace(user_id)}:chat" if user_id is not None else "chat"
+        return namespace, f"{kind}:{version}:{','.join(intents)}:{text}"
+
+    def _record(self, hit: bool, seconds: float):
+        with self._lock:
+            self._stats["hits" if hit else "misses"] += 1
+            self._stats["hit_seconds" if hit else "miss_seconds"] += seconds
+
+    def get_or_generate(self, kind: str, version: str, message: str, generate: Callable[[str], str],
+                        user_id: Optional[int] = None) -> str:
+        """
+        The cached answer for `message`, generating and storing it on a miss. Pass
+        `user_id` for answers personalized to that user.
+        """
+        start = time.perf_counter()
+        namespace, key = self._location(kind, version, message, user_id)
+        answer = cache.get(namespace, key)
+        hit = answer is not None
+        if not hit:
+            answer = generate(message)
+            cache.set(namespace, key, answer, self.ttl)
+        self._record(hit, time.perf_counter() - start)
+        return answer
+
+    def stream(self, kind: str, version: str, message: str, generate: Callable[[str], Iterator[str]],
+               user_id: Optional[int] = None) -> Iterator[str]:
+        """
+        Like get_or_generate for streamed answers. A miss is stored once it has
+        streamed completely, unless the stream reports that it `fell_back`.
+        """
+        start = time.perf_counter()
+        namespace, key = self._location(kind, version, message, user_id)
+        answer = cache.get(namespace, key)
+        if answer is not None:
+            self._record(True, time.perf_counter() - start)
+            yield from answer.splitlines(keepends=True)
+            return
+
+        chunks: List[str] = []
+        # Only time spent producing chunks counts, not time waiting on the client
+        elapsed = time.perf_counter() - start
+        iterator = iter(generate(message))
+        while True:
+            step = time.perf_counter()
+            chunk = next(iterator, None)
+            elapsed += time.perf_counter() - step
+            if chunk is None:
+                break
+            chunks.append(chunk)
+            yield chunk
+        # A fallback given while the backend was failing would outlive the outage
+        if not getattr(iterator, "fell_back", False):
+            cache.set(namespace, key, "".join(chunks), self.ttl)
+        self._record(False, elapsed)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Hit rate, mean latency of hits and misses, and the generation time saved by hits"""
+        with self._lock:
+            stats = dict(self._stats)
+        hits, misses = stats["hits"], stats["misses"]
+        mean_hit = stats["hit_seconds"] / hits if hits else 0.0
+        mean_miss = stats["miss_seconds"] / misses if misses else 0.0
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "mean_hit_ms": round(mean_hit * 1000, 3),
+            "mean_miss_ms": round(mean_miss * 1000, 3),
+            "saved_seconds": round(max(mean_miss - mean_hit, 0.0) * hits, 3),
+        }
+
+
+# Global instance
+chat_cache = ChatResponseCache()
+metrics.register("chat_cache", chat_cache.snapshot)
@@ -0,0 +1,482 @@
+"""
+Per-user conversation history for the AI coach, so follow-up questions keep their context.
+
+Conversations live in two tiers:
+- hot: an in-process LRU of recently used conversations, capped at
+  FINMATE_CONVERSATION_HOT_LIMIT conversations
+- cold: an SQLite database shared by every worker process, which holds each
+  conversation's summary and its turns as appended rows
+
+Each conversation keeps its newest turns verbatim. Once their text exceeds the
+conversation's size budget, the oldest turns are folded into a short summary (the
+topics and questions they covered). The summary has its own cap, so a
+conversation's footprint is bounded however long it runs.
+
+Appending a turn only updates memory and queues the turn. A writer thread
+inserts the queue in one transaction every flush interval, and compacts the
+conversations it touched in the same transaction. Turns are only ever inserted,
+never replaced, so workers appending to the same conversation don't overwrite
+each other. Before a hot copy is used, it picks up the turns other workers have
+added since it was loaded. That read happens outside the store's lock, and WAL
+mode keeps it from waiting on a flush.
+
+Configuration (environment):
+    FINMATE_CONVERSATIONS_DB            SQLite file for the cold tier (default: data/conversations.db)
+    FINMATE_CONVERSATION_HOT_LIMIT      conversations kept in memory (default 1000)
+    FINMATE_CONVERSATION_MAX_CHARS      verbatim turn text per conversation before compaction (default 4000)
+    FINMATE_CONVERSATION_FLUSH_SECONDS  how often queued writes are saved (default 0.5)
+"""
+from ai_core.intents import intent_classifier
+from backend.utils.metrics import metrics
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CONVERSATIONS_PATH = PROJECT_ROOT / "data" / "conversations.db"
+
+HOT_LIMIT = int(os.getenv("FINMATE_CONVERSATION_HOT_LIMIT", "1000"))
+MAX_CHARS = int(os.getenv("FINMATE_CONVERSATION_MAX_CHARS", "4000"))
+FLUSH_SECONDS = float(os.getenv("FINMATE_CONVERSATION_FLUSH_SECONDS", "0.5"))
+
+# Turns kept verbatim even when they alone exceed the budget
+KEEP_RECENT_TURNS = 2
+# Longest stored turn and summary; longer text is cut
+MAX_TURN_CHARS = 2000
+MAX_SUMMARY_CHARS = 1000
+# Longest question quoted in a summary line
+SUMMARY_QUESTION_CHARS = 80
+# Queued conversations that wake the writer before its interval is up
+MAX_PENDING = 500
+
+USER = "user"
+ASSISTANT = "assistant"
+
+_SENTENCE_END = re.compile(r"(?<=[.?!])\s")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversation_turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    conversation_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversation_turns_by_conversation
+    ON conversation_turns (user_id, conversation_id, id);
+CREATE TABLE IF NOT EXISTS conversation_summaries (
+    user_id INTEGER NOT NULL,
+    conversation_id TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (user_id, conversation_id)
+);
+"""
+
+# Queued operations, applied in order by the writer
+APPEND = "append"
+DELETE = "delete"
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+class Conversation:
+    """The summary plus the recent turns of one conversation"""
+
+    __slots__ = ("summary", "turns", "chars", "updated_at")
+
+    def __init__(self, summary: str = "", turns: Optional[List[Tuple[str, str]]] = None,
+                 updated_at: float = 0.0):
+        self.summary = summary
+        self.turns: Deque[Tuple[str, str]] = deque(turns or ())
+        self.chars = sum(len(text) for _, text in self.turns)
+        self.updated_at = updated_at
+
+    def append(self, role: str, text: str, max_chars: int, created_at: Optional[float] = None):
+        self.turns.append((role, text))
+        self.chars += len(text)
+        self.updated_at = created_at or time.time()
+        if self.chars > max_chars:
+            self._compact(max_chars)
+
+    def _compact(self, max_chars: int) -> int:
+        """Fold the oldest turns into the summary until the rest fit; returns how many were folded"""
+        folded = 0
+        lines = self.summary.splitlines()
+        while self.chars > max_chars and len(self.turns) > KEEP_RECENT_TURNS:
+            role, text = self.turns.popleft()
+            self.chars -= len(text)
+            folded += 1
+            # Answers are regenerated from the questions, so only questions are summarized
+            if role == USER:
+                lines.append(self._summary_line(text))
+        # Oldest summary lines go first
+        while lines and sum(len(line) + 1 for line in lines) > MAX_SUMMARY_CHARS:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+        return folded
+
+    @staticmethod
+    def _summary_line(question: str) -> str:
+        first_sentence = _SENTENCE_END.split(question.strip(), 1)[0]
+        intents = intent_classifier.top_intents(question)
+        topics = f"[{', '.join(intents)}] " if intents else ""
+        return f"{topics}{_truncate(first_sentence, SUMMARY_QUESTION_CHARS)}"
+
+    def last_question(self) -> Optional[str]:
+        for role, text in reversed(self.turns):
+            if role == USER:
+                return text
+        return None
+
+    def contextualize(self, message: str) -> str:
+        """
+        The text to answer for `message`: a follow-up with no topic of its own
+        ("and how much should that be?") is answered together with the previous question.
+        """
+        previous = self.last_question()
+        if previous is None or intent_classifier.top_intents(message) or not intent_classifier.top_intents(previous):
+            return message
+        return f"{previous} {message}"
+
+    def to_dict(self) -> dict:
+        return {
+            "summary": self.summary,
+            "turns": [{"role": role, "text": text} for role, text in self.turns],
+            "updated_at": self.updated_at
+        }
+
+
+class _HotEntry:
+    """A hot conversation, the newest cold turn it reflects, and its own turns the cold tier may not have yet"""
+
+    __slots__ = ("conversation", "last_id", "unsynced")
+
+    def __init__(self, conversation: Conversation, last_id: int, unsynced: List[Tuple[str, str]]):
+        self.conversation = conversation
+        self.last_id = last_id
+        self.unsynced: Deque[Tuple[str, str]] = deque(unsynced)
+
+
+class ConversationStore:
+    """Two-tier store of chat conversations, keyed by (user_id, conversation_id)"""
+
+    def __init__(self, path: Optional[Path] = None, hot_limit: int = HOT_LIMIT,
+                 max_chars: int = MAX_CHARS, flush_interval: float = FLUSH_SECONDS):
+        self.path = Path(path or os.getenv("FINMATE_CONVERSATIONS_DB") or DEFAULT_CONVERSATIONS_PATH)
+        self.hot_limit = hot_limit
+        self.max_chars = max_chars
+        self.flush_interval = flush_interval
+        self._hot: "OrderedDict[Tuple[int, str], _HotEntry]" = OrderedDict()
+        # Operations waiting for the writer, and the batch it is writing
+        self._pending: List[tuple] = []
+        self._flushing: List[tuple] = []
+        # Odd while a batch is being committed, so loads can tell whether they raced it
+        self._flush_generation = 0
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._schema_ready = False
+        self._readers = threading.local()
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._stop: Optional[threading.Event] = None
+        self._stats = {
+            "hot_hits": 0, "refreshes": 0, "cold_loads": 0, "evictions": 0,
+            "flushes": 0, "rows_written": 0, "compactions": 0, "write_errors": 0
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _connection(self) -> sqlite3.Connection:
+        """The writer's connection; call with the database lock held"""
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = self._connect()
+            db.executescript(SCHEMA)
+            # Transactions are opened explicitly, with BEGIN IMMEDIATE
+            db.isolation_level = None
+            self._db = db
+            self._schema_ready = True
+        return self._db
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection; WAL lets it read while a flush is writing"""
+        db = getattr(self._readers, "db", None)
+        if db is None:
+            if not self._schema_ready:
+                with self._db_lock:
+                    self._connection()
+            db = self._readers.db = self._connect()
+            with self._lock:
+                self._reader_connections.append(db)
+        return db
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            self._stop = threading.Event()
+            self._writer = threading.Thread(target=self._run, args=(self._stop,), name="conversation-writer", daemon=True)
+            self._writer.start()
+
+    def _queued(self, key: Tuple[int, str]) -> Tuple[bool, List[Tuple[str, str]]]:
+        """
+        Whether a queued delete hides the cold copy, and the turns queued after it;
+        called with the lock held
+        """
+        deleted, turns = False, []
+        for op in self._flushing + self._pending:
+            if op[1] != key:
+                continue
+            if op[0] == DELETE:
+                deleted, turns = True, []
+            else:
+                turns.append((op[2], op[3]))
+        return deleted, turns
+
+    def _load(self, key: Tuple[int, str]) -> _HotEntry:
+        """Build a hot entry from the cold tier plus this worker's queued turns"""
+        while True:
+            with self._lock:
+                generation = self._flush_generation
+            reader = self._reader()
+            row = reader.execute(
+                "SELECT summary FROM conversation_summaries WHERE user_id = ? AND conversation_id = ?", key
+            ).fetchone()
+            turns = reader.execute(
+                "SELECT id, role, text, created_at FROM conversation_turns "
+                "WHERE user_id = ? AND conversation_id = ? ORDER BY id", key
+            ).fetchall()
+            with self._lock:
+                # A batch committed during the reads may be in both the rows and the queue
+                if generation % 2 == 0 and generation == self._flush_generation:
+                    self._stats["cold_loads"] += 1
+                    deleted, queued = self._queued(key)
+                    break
+            time.sleep(0.001)
+
+        conversation = Conversation()
+        last_id = 0
+        if not deleted:
+            conversation.summary = row[0] if row else ""
+            for turn_id, role, text, created_at in turns:
+                conversation.append(role, text, self.max_chars, created_at)
+                last_id = turn_id
+        for role, text in queued:
+            conversation.append(role, text, self.max_chars)
+        # With a delete queued, everything in the cold tier is stale: don't track it
+        return _HotEntry(conversation, -1 if deleted else last_id, queued)
+
+    def _refresh(self, key: Tuple[int, str]) -> _HotEntry:
+        """The hot entry for `key`, brought up to date with turns other workers added"""
+        with self._lock:
+            entry = self._hot.get(key)
+            last_id = entry.last_id if entry is not None else None
+        if entry is None or last_id < 0:
+            # Not hot, or a delete was queued: rebuild (the delete may have been written since)
+            entry = self._load(key)
+        else:
+            # Rows from this one on: if it is gone, the conversation was compacted or deleted elsewhere
+            rows = self._reader().execute(
+                "SELECT id, role, text, created_at FROM conversation_turns "
+                "WHERE user_id = ? AND conversation_id = ? AND id >= ? ORDER BY id", (*key, last_id)
+            ).fetchall()
+            if last_id and (not rows or rows[0][0] != last_id):
+                entry = self._load(key)
+            else:
+                new_rows = [row for row in rows if row[0] != last_id]
+                with self._lock:
+                    if new_rows and self._hot.get(key) is entry and entry.last_id == last_id:
+                        self._stats["refreshes"] += 1
+                        for turn_id, role, text, created_at in new_rows:
+                            # This worker's own turns, now written, are already in the hot copy
+                            if entry.unsynced and entry.unsynced[0] == (role, text):
+                                entry.unsynced.popleft()
+                            else:
+                                entry.conversation.append(role, text, self.max_chars, created_at)
+                            entry.last_id = turn_id
+                    elif not new_rows:
+                        self._stats["hot_hits"] += 1
+
+        with self._lock:
+            current = self._hot.get(key)
+            if current is not None and current is not entry and current.last_id >= entry.last_id:
+                # Another thread installed a copy at least as new meanwhile
+                entry = current
+            self._hot[key] = entry
+            self._hot.move_to_end(key)
+            # Evicted conversations are already saved or queued, so nothing is lost
+            while len(self._hot) > self.hot_limit:
+                self._hot.popitem(last=False)
+                self._stats["evictions"] += 1
+        return entry
+
+    def get(self, user_id: int, conversation_id: str) -> Conversation:
+        """A copy of the conversation (empty if it doesn't exist)"""
+        entry = self._refresh((user_id, conversation_id))
+        with self._lock:
+            conversation = entry.conversation
+            return Conversation(conversation.summary, list(conversation.turns), conversation.updated_at)
+
+    def append(self, user_id: int, conversation_id: str, role: str, text: str):
+        """Add a turn, compacting older turns if the conversation is over its budget"""
+        self.append_many(user_id, conversation_id, [(role, text)])
+
+    def append_many(self, user_id: int, conversation_id: str, turns: List[Tuple[str, str]]):
+        """Add several turns at once, e.g. a question and its answer"""
+        key = (user_id, conversation_id)
+        entry = self._refresh(key)
+        now = time.time()
+        with self._lock:
+            for role, text in turns:
+                text = _truncate(text, MAX_TURN_CHARS)
+                entry.conversation.append(role, text, self.max_chars, now)
+                entry.unsynced.append((role, text))
+                self._pending.append((APPEND, key, role, text, now))
+            self._ensure_writer()
+            if len(self._pending) >= MAX_PENDING:
+                self._wake.set()
+
+    def delete(self, user_id: int, conversation_id: str):
+        """Forget a conversation"""
+        key = (user_id, conversation_id)
+        with self._lock:
+            self._hot.pop(key, None)
+            self._pending.append((DELETE, key))
+            self._ensure_writer()
+
+    def flush(self):
+        """Save every queued change now"""
+        with self._db_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                ops, self._pending = self._pending, []
+                self._flushing = ops
+            try:
+                written = self._write(ops)
+            except sqlite3.Error:
+                logger.exception("Saving %d conversation changes failed; will retry", len(ops))
+                with self._lock:
+                    self._pending = ops + self._pending
+                    self._flushing = []
+                    self._stats["write_errors"] += 1
+                return
+            with self._lock:
+                self._stats["flushes"] += 1
+                self._stats["rows_written"] += written
+
+    def _write(self, ops: List[tuple]) -> int:
+        """Apply a batch in one transaction, then compact what it touched; call with the database lock held"""
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            touched = set()
+            for op in ops:
+                key = op[1]
+                if op[0] == DELETE:
+                    db.execute("DELETE FROM conversation_turns WHERE user_id = ? AND conversation_id = ?", key)
+                    db.execute("DELETE FROM conversation_summaries WHERE user_id = ? AND conversation_id = ?", key)
+                    touched.discard(key)
+                else:
+                    db.execute(
+                        "INSERT INTO conversation_turns (user_id, conversation_id, role, text, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)", (*key, *op[2:])
+                    )
+                    touched.add(key)
+            compactions = sum(self._compact_cold(db, key) for key in touched)
+            with self._lock:
+                self._flush_generation += 1
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            with self._lock:
+                if self._flush_generation % 2:
+                    self._flush_generation += 1
+                    self._flushing = []
+        with self._lock:
+            self._stats["compactions"] += compactions
+        return len(ops)
+
+    def _compact_cold(self, db: sqlite3.Connection, key: Tuple[int, str]) -> int:
+        """Fold a cold conversation's oldest turns into its summary if it is over budget"""
+        rows = db.execute(
+            "SELECT id, role, text FROM conversation_turns WHERE user_id = ? AND conversation_id = ? ORDER BY id", key
+        ).fetchall()
+        if sum(len(text) for _, _, text in rows) <= self.max_chars:
+            return 0
+        row = db.execute(
+            "SELECT summary FROM conversation_summaries WHERE user_id = ? AND conversation_id = ?", key
+        ).fetchone()
+        conversation = Conversation(row[0] if row else "", [(role, text) for _, role, text in rows])
+        folded = conversation._compact(self.max_chars)
+        if not folded:
+            return 0
+        db.execute(
+            "DELETE FROM conversation_turns WHERE user_id = ? AND conversation_id = ? AND id <= ?",
+            (*key, rows[folded - 1][0])
+        )
+        db.execute(
+            "INSERT OR REPLACE INTO conversation_summaries (user_id, conversation_id, summary) VALUES (?, ?, ?)",
+            (*key, conversation.summary)
+        )
+        return 1
+
+    def _run(self, stop: threading.Event):
+        while not stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stop the writer after saving what is queued; the next write starts it again"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._stop.set()
+        self._wake.set()
+        if writer is not None:
+            writer.join()
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+        with self._lock:
+            readers, self._reader_connections = self._reader_connections, []
+            self._readers = threading.local()
+        for reader in readers:
+            reader.close()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                hot_conversations=len(self._hot),
+                hot_chars=sum(
+                    entry.conversation.chars + len(entry.conversation.summary) for entry in self._hot.values()
+                ),
+                pending_writes=len(self._pending)
+            )
+        return stats
+
+
+# Global instance; nothing is opened until the first conversation is used
+conversation_store = ConversationStore()
+metrics.register("conversations", conversation_store.stats)
@@ -3,12 +3,20 @@ from backend.models.database_models import Expense as DBExpense, User
 from typing import List
 from datetime import date, datetime, timedelta
 from collections import defaultdict
+from backend.utils.cache import cache
+from backend.utils.fieldsets import serialize_row
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 import uuid
 
 class ExpenseService:
     """Service for expense tracking and analysis"""
     
+    # Columns that can be requested through sparse fieldsets
+    EXPENSE_FIELDS = ("id", "description", "amount", "category", "date", "created_at")
+    BREAKDOWN_FIELDS = ("total_amount", "transaction_count", "average_transaction", "transactions")
+    TRANSACTION_FIELDS = ("description", "amount", "date")
+    
     def __init__(self):
         pass
     
@@ -24,6 +32,7 @@ class ExpenseService:
         db.add(db_expense)
         db.commit()
         db.refresh(db_expense)
+        cache.invalidate_user(user_id)
         return db_expense
     
     def get_expenses(self, user_id: int, start_date: date = None, end_date: date = None, db: Session = None) -> List[DBExpense]:
@@ -37,8 +46,37 @@ class ExpenseService:
         
         return query.all()
     
+    def get_expense_rows(self, user_id: int, fields: List[str], start_date: date = None,
+                         end_date: date = None, db: Session = None) -> List[dict]:
+        """Get expenses as plain dicts, selecting only the requested columns"""
+        return cache.get_or_compute(
+            cache.user_namespace(user_id),
+            f"rows:{','.join(fields)}:{start_date}:{end_date}",
+            lambda: self._query_expense_rows(user_id, fields, start_date, end_date, db)
+        )
+    
+    def _query_expense_rows(self, user_id: int, fields: List[str], start_date: date,
+                            end_date: date, db: Session) -> List[dict]:
+        table = DBExpense.__table__
+        stmt = select(*[table.c[field] for field in fields]).where(table.c.user_id == user_id)
+        
+        if start_date:
+            stmt = stmt.where(table.c.date >= start_date)
+        if end_date:
+            stmt = stmt.where(table.c.date <= end_date)
+        
+        return [serialize_row(row) for row in db.execute(stmt).mappings()]
+    
     def get_expense_summary(self, user_id: int, start_date: date = None, end_date: date = None, db: Session = None) -> ExpenseSummary:
         """Get expense summary and analysis"""
+        # The monthly trend is relative to today, so the date is part of the key
+        return cache.get_or_compute(
+            cache.user_namespace(user_id),
+            f"summary:{start_date}:{end_date}:{date.today()}",
+            lambda: self._compute_expense_summary(user_id, start_date, end_date, db)
+        )
+    
+    def _compute_expense_summary(self, user_id: int, start_date: date, end_date: date, db: Session) -> ExpenseSummary:
         expenses = self.get_expenses(user_id, start_date, end_date, db)
         
         # Calculate total expenses
@@ -66,29 +104,51 @@ class ExpenseService:
             top_categories=[{"category": cat, "amount": amount} for cat, amount in top_categories]
         )
     
-    def get_category_breakdown(self, user_id: int, db: Session) -> dict:
+    def get_category_breakdown(self, user_id: int, db: Session, fields: List[str] = None) -> dict:
         """Get detailed breakdown by category"""
-        expenses = self.get_expenses(user_id, db=db)
+        fields = fields or list(self.BREAKDOWN_FIELDS)
+        return cache.get_or_compute(
+            cache.user_namespace(user_id),
+            f"breakdown:{','.join(fields)}",
+            lambda: self._compute_category_breakdown(user_id, db, fields)
+        )
+    
+    def _compute_category_breakdown(self, user_id: int, db: Session, fields: List[str]) -> dict:
+        table = DBExpense.__table__
+        
+        if "transactions" not in fields:
+            # Totals only: let the database aggregate instead of loading every row
+            stmt = select(
+                table.c.category,
+                func.sum(table.c.amount).label("total_amount"),
+                func.count(table.c.id).label("transaction_count")
+            ).where(table.c.user_id == user_id).group_by(table.c.category)
+            
+            breakdown = {}
+            for row in db.execute(stmt):
+                entry = {
+                    "total_amount": round(row.total_amount, 2),
+                    "transaction_count": row.transaction_count,
+                    "average_transaction": round(row.total_amount / row.transaction_count, 2) if row.transaction_count else 0
+                }
+                breakdown[row.category] = {field: entry[field] for field in fields}
+            return breakdown
+        
+        rows = self._query_expense_rows(user_id, ["category", *self.TRANSACTION_FIELDS], None, None, db)
         expenses_by_category = defaultdict(list)
-        for expense in expenses:
-            expenses_by_category[expense.category].append(expense)
+        for row in rows:
+            expenses_by_category[row.pop("category")].append(row)
         
         breakdown = {}
         for category, expense_list in expenses_by_category.items():
-            total_amount = sum(expense.amount for expense in expense_list)
-            breakdown[category] = {
+            total_amount = sum(expense["amount"] for expense in expense_list)
+            entry = {
                 "total_amount": round(total_amount, 2),
                 "transaction_count": len(expense_list),
                 "average_transaction": round(total_amount / len(expense_list), 2) if expense_list else 0,
-                "transactions": [
-                    {
-                        "description": expense.description,
-                        "amount": expense.amount,
-                        "date": expense.date.isoformat()
-                    }
-                    for expense in expense_list
-                ]
+                "transactions": expense_list
             }
+            breakdown[category] = {field: entry[field] for field in fields}
         
         return breakdown
     
@@ -131,6 +191,7 @@ class ExpenseService:
         if expense:
             db.delete(expense)
             db.commit()
+            cache.invalidate_user(user_id)
             return True
         return False
 
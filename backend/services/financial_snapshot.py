@@ -0,0 +1,129 @@
+"""
+Compact per-user financial snapshot used to personalize the AI coach.
+
+The snapshot holds a user's aggregates: spend per category, spend this month and
+the saved/target amounts of each savings goal. It is built from a few SQL
+aggregates and cached in the user's namespace of the service cache. That
+namespace is versioned by the user's data version, which every expense and
+savings write bumps on the shared state backend. The first chat after a write,
+on any worker, rebuilds the snapshot; later chats cost one cache lookup.
+"""
+from backend.models.database_models import Expense as DBExpense, SavingsGoal as DBSavingsGoal
+from backend.utils.cache import cache
+from datetime import date
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
+import os
+
+SNAPSHOT_TTL = float(os.getenv("FINMATE_SNAPSHOT_TTL", "3600"))
+
+# Categories and goals listed in the compact view
+TOP_CATEGORIES = 3
+TOP_GOALS = 3
+
+
+def _month(day: date) -> str:
+    return day.strftime("%Y-%m")
+
+
+class FinancialSnapshotService:
+    """Builds and caches each user's financial snapshot"""
+
+    def __init__(self, ttl: float = SNAPSHOT_TTL):
+        self.ttl = ttl
+
+    def _build(self, user_id: int, db: Session) -> Dict[str, Any]:
+        expenses = DBExpense.__table__
+        goals = DBSavingsGoal.__table__
+        today = date.today()
+
+        categories = {
+            row.category: [row.total, row.count]
+            for row in db.execute(
+                select(expenses.c.category, func.sum(expenses.c.amount).label("total"), func.count(expenses.c.id).label("count"))
+                .where(expenses.c.user_id == user_id)
+                .group_by(expenses.c.category)
+            )
+        }
+        month_spend = db.execute(
+            select(func.coalesce(func.sum(expenses.c.amount), 0.0))
+            .where(expenses.c.user_id == user_id, expenses.c.date >= today.replace(day=1))
+        ).scalar()
+        goal_rows = [
+            [row.name, row.target_amount, row.current_amount]
+            for row in db.execute(
+                select(goals.c.name, goals.c.target_amount, goals.c.current_amount)
+                .where(goals.c.user_id == user_id)
+                .order_by(goals.c.id)
+            )
+        ]
+        return {"month": _month(today), "month_spend": month_spend, "categories": categories, "goals": goal_rows}
+
+    def _aggregates(self, user_id: int, db: Session) -> Dict[str, Any]:
+        # The namespace is resolved before the queries run, so a write that lands
+        # meanwhile moves readers to a new version instead of this build
+        return cache.get_or_compute(
+            cache.user_namespace(user_id),
+            f"snapshot:{_month(date.today())}",
+            lambda: self._build(user_id, db),
+            self.ttl
+        )
+
+    def get_snapshot(self, user_id: int, db: Session) -> Dict[str, Any]:
+        """
+        Spend by category (largest first), spend this month, savings rate and goal
+        progress. No income is recorded, so the savings rate is the share of the
+        money the user tracks (spending plus amounts saved toward goals) that was saved.
+        """
+        return self._view(self._aggregates(user_id, db))
+
+    @staticmethod
+    def _view(aggregates: Dict[str, Any]) -> Dict[str, Any]:
+        categories = sorted(aggregates["categories"].items(), key=lambda item: item[1][0], reverse=True)
+        total_spend = sum(total for total, _ in aggregates["categories"].values())
+        saved = sum(current for _, _, current in aggregates["goals"])
+        target = sum(target for _, target, _ in aggregates["goals"])
+        goals = sorted(aggregates["goals"], key=lambda goal: goal[2] / goal[1] if goal[1] else 0.0)
+
+        return {
+            "spend_by_category": {category: round(total, 2) for category, (total, _) in categories},
+            "total_spend": round(total_spend, 2),
+            "month_spend": round(aggregates["month_spend"], 2),
+            "savings_rate": round(saved / (saved + total_spend), 4) if saved + total_spend else 0.0,
+            "goal_progress": {
+                "saved": round(saved, 2),
+                "target": round(target, 2),
+                "progress": round(saved / target, 4) if target else 0.0,
+                "goals": [
+                    {"name": name, "progress": round(current / target_amount, 4) if target_amount else 0.0}
+                    for name, target_amount, current in goals[:TOP_GOALS]
+                ]
+            }
+        }
+
+    @staticmethod
+    def describe(snapshot: Dict[str, Any]) -> Optional[str]:
+        """One or two sentences summarizing the snapshot for a chat answer, or None when it is empty"""
+        sentences = []
+        if snapshot["spend_by_category"]:
+            top = ", ".join(
+                f"{category} (${amount:,.2f})"
+                for category, amount in list(snapshot["spend_by_category"].items())[:TOP_CATEGORIES]
+            )
+            sentences.append(
+                f"You've spent ${snapshot['month_spend']:,.2f} this month; your largest categories are {top}."
+            )
+        progress = snapshot["goal_progress"]
+        if progress["target"]:
+            # Goals are listed least funded first
+            behind = progress["goals"][0]
+            sentences.append(
+                f"You're saving {snapshot['savings_rate']:.0%} of the money you track, and your goals are "
+                f"{progress['progress']:.0%} funded ({behind['name']} is furthest behind at {behind['progress']:.0%})."
+            )
+        return " ".join(sentences) or None
+
+
+# Global instance
+financial_snapshots = FinancialSnapshotService()
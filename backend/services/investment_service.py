@@ -1,4 +1,6 @@
 from backend.models.finance_models import InvestmentRecommendation, InvestmentRisk, UserProfile
+from backend.services.projection_engine import check_projection, project
+from backend.utils.cache import cache, canonical_key
 from typing import List, Dict
 
 class InvestmentService:
@@ -115,25 +117,27 @@ class InvestmentService:
     def calculate_retirement_savings(current_age: int, retirement_age: int, 
                                    current_savings: float, monthly_contribution: float,
                                    expected_return: float) -> Dict:
-        """Calculate retirement savings projection"""
+        """Calculate retirement savings projection (memoized on the rounded inputs)"""
+        check_projection((retirement_age - current_age) * 12)
+        key = canonical_key([current_age, retirement_age, current_savings, monthly_contribution, expected_return])
+        return cache.get_or_compute(
+            "retirement_projections", key,
+            lambda: InvestmentService._project_retirement_savings(
+                current_age, retirement_age, current_savings, monthly_contribution, expected_return
+            ),
+            ttl=None
+        )
+    
+    @staticmethod
+    def _project_retirement_savings(current_age: int, retirement_age: int,
+                                    current_savings: float, monthly_contribution: float,
+                                    expected_return: float) -> Dict:
         years_to_retirement = retirement_age - current_age
         months_to_retirement = years_to_retirement * 12
         
-        # Calculate future value with monthly contributions
-        monthly_return = expected_return / 12 / 100
-        
-        # Future value of current savings
-        future_value_current = current_savings * (1 + expected_return / 100) ** years_to_retirement
-        
-        # Future value of monthly contributions (annuity)
-        if monthly_return > 0:
-            future_value_contributions = monthly_contribution * (
-                ((1 + monthly_return) ** months_to_retirement - 1) / monthly_return
-            )
-        else:
-            future_value_contributions = monthly_contribution * months_to_retirement
-        
-        total_retirement_savings = future_value_current + future_value_contributions
+        # expected_return is a percentage here; the engine takes a fraction
+        projection = project(current_savings, monthly_contribution, expected_return / 100, months_to_retirement)
+        total_retirement_savings = float(projection.final_values[0])
         
         return {
             "current_savings": current_savings,
@@ -142,7 +146,8 @@ class InvestmentService:
             "expected_return": expected_return,
             "projected_savings": round(total_retirement_savings, 2),
             "total_contributions": round(monthly_contribution * months_to_retirement, 2),
-            "growth_amount": round(total_retirement_savings - current_savings - (monthly_contribution * months_to_retirement), 2)
+            "growth_amount": round(total_retirement_savings - current_savings - (monthly_contribution * months_to_retirement), 2),
+            "yearly_balances": projection.yearly_balances(0)
         }
     
     @staticmethod
@@ -0,0 +1,239 @@
+"""
+Vectorized savings projections.
+
+Projects month-by-month balances for many parameter sets at once: each row is one
+scenario (starting balance, monthly contribution, annual return, horizon), and all
+rows are computed in a single NumPy pass. The growth model matches the formulas the
+services used before: the starting balance compounds annually at the annual rate,
+and contributions are made at the end of each month and compound monthly at
+`annual_return / 12`.
+
+future_values() computes only the final balances, for grids too large to keep
+trajectories. months_to_target() solves the inverse problem (how long until a
+balance reaches a target) in closed form for whole grids of goals, contributions
+and returns.
+
+Usage:
+    python -m backend.services.projection_engine [--scenarios N] [--years Y]
+"""
+from typing import List, Sequence, Union
+import argparse
+import sys
+import time
+
+import numpy as np
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+# Bounds for a projection requested through the API. Trajectories take
+# (scenarios, months + 1) floats, so these cap what one request can allocate.
+MAX_PROJECTION_YEARS = 100
+MAX_PROJECTION_MONTHS = MAX_PROJECTION_YEARS * 12
+MAX_PROJECTION_SCENARIOS = 50
+
+
+def check_projection(months: ArrayLike, scenarios: int = 1) -> None:
+    """Raise ValueError unless the horizon and number of scenarios are within the API bounds"""
+    try:
+        horizon = np.asarray(months, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("The projection horizon must be a number")
+    if not np.all(np.isfinite(horizon)) or np.any(horizon > MAX_PROJECTION_MONTHS):
+        raise ValueError(f"The projection horizon must be at most {MAX_PROJECTION_YEARS} years")
+    if scenarios > MAX_PROJECTION_SCENARIOS:
+        raise ValueError(f"At most {MAX_PROJECTION_SCENARIOS} scenarios can be projected at once")
+
+
+class Projection:
+    """Balance trajectories for a batch of scenarios"""
+
+    __slots__ = ("initial", "monthly_contribution", "annual_return", "months", "balances")
+
+    def __init__(self, initial: np.ndarray, monthly_contribution: np.ndarray,
+                 annual_return: np.ndarray, months: np.ndarray, balances: np.ndarray):
+        self.initial = initial
+        self.monthly_contribution = monthly_contribution
+        self.annual_return = annual_return
+        self.months = months
+        # (scenarios, max_months + 1); column m is the balance after m months.
+        # Columns past a scenario's own horizon hold the balance at its horizon.
+        self.balances = balances
+
+    def __len__(self) -> int:
+        return len(self.months)
+
+    @property
+    def final_values(self) -> np.ndarray:
+        """Balance at each scenario's own horizon"""
+        return self.balances[np.arange(len(self.months)), self.months]
+
+    @property
+    def total_contributions(self) -> np.ndarray:
+        """Sum of monthly contributions over each scenario's horizon"""
+        return self.monthly_contribution * self.months
+
+    @property
+    def growth(self) -> np.ndarray:
+        """Investment growth: final value minus everything paid in"""
+        return self.final_values - self.initial - self.total_contributions
+
+    def yearly_balances(self, index: int) -> List[float]:
+        """Balance at the start and at the end of every year of one scenario, in currency units"""
+        months = int(self.months[index])
+        columns = list(range(0, months + 1, 12))
+        if columns[-1] != months:
+            columns.append(months)
+        return [round(float(value), 2) for value in self.balances[index, columns]]
+
+
+def project(initial: ArrayLike, monthly_contribution: ArrayLike, annual_return: ArrayLike,
+            months: ArrayLike) -> Projection:
+    """
+    Project balances for every combination row of the (broadcast) inputs.
+
+    `annual_return` is a fraction (0.07 for 7%). Negative horizons are treated as zero;
+    horizons over MAX_PROJECTION_MONTHS raise ValueError.
+    """
+    check_projection(months)
+    initial, monthly_contribution, annual_return, months = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(initial, dtype=np.float64)),
+        np.atleast_1d(np.asarray(monthly_contribution, dtype=np.float64)),
+        np.atleast_1d(np.asarray(annual_return, dtype=np.float64)),
+        np.atleast_1d(np.maximum(np.asarray(months), 0).astype(np.int64))
+    )
+    max_months = int(months.max()) if months.size else 0
+
+    # Elapsed months per column, capped at each scenario's horizon: (scenarios, columns)
+    elapsed = np.minimum(np.arange(max_months + 1), months[:, None]).astype(np.float64)
+
+    # Starting balance compounds annually, i.e. (1 + r) ** (m / 12)
+    balances = np.exp(elapsed * (np.log1p(annual_return)[:, None] / 12))
+    balances *= initial[:, None]
+
+    # Ordinary annuity factor ((1 + i) ** m - 1) / i with i = r / 12, and m when i == 0
+    monthly_rate = annual_return / 12
+    zero_rate = monthly_rate == 0
+    safe_rate = np.where(zero_rate, 1.0, monthly_rate)[:, None]
+    annuity = np.expm1(elapsed * np.log1p(safe_rate))
+    annuity /= safe_rate
+    annuity[zero_rate] = elapsed[zero_rate]
+    annuity *= monthly_contribution[:, None]
+    balances += annuity
+
+    return Projection(initial.copy(), monthly_contribution.copy(), annual_return.copy(), months.copy(), balances)
+
+
+def future_values(initial: ArrayLike, monthly_contribution: ArrayLike, annual_return: ArrayLike,
+                  months: ArrayLike) -> np.ndarray:
+    """
+    Final balances only, for the broadcast inputs. Same growth model as project(),
+    but without materializing trajectories, so it scales to very large grids.
+    """
+    initial, monthly_contribution, annual_return, months = np.broadcast_arrays(
+        np.asarray(initial, dtype=np.float64),
+        np.asarray(monthly_contribution, dtype=np.float64),
+        np.asarray(annual_return, dtype=np.float64),
+        np.maximum(np.asarray(months), 0).astype(np.float64)
+    )
+    monthly_rate = annual_return / 12
+    zero_rate = monthly_rate == 0
+    safe_rate = np.where(zero_rate, 1.0, monthly_rate)
+    annuity = np.where(zero_rate, months, np.expm1(months * np.log1p(safe_rate)) / safe_rate)
+    return initial * np.exp(months * np.log1p(annual_return) / 12) + monthly_contribution * annuity
+
+
+def months_to_target(target: ArrayLike, current: ArrayLike, monthly_contribution: ArrayLike,
+                     annual_return: ArrayLike) -> np.ndarray:
+    """
+    Whole months until a balance reaches `target`, for the broadcast inputs.
+
+    The balance and contributions compound monthly at i = annual_return / 12, so
+    current * (1 + i) ** n + contribution * ((1 + i) ** n - 1) / i = target gives
+    n = log1p((target - current) * i / (current * i + contribution)) / log1p(i).
+    The log1p form stays accurate as i approaches zero, where it falls back to the
+    linear (target - current) / contribution. Targets that are never reached
+    (no growth, or a negative return that caps the balance below the target) are inf.
+
+    No iterative fallback is needed: the monthly growth current * i + contribution
+    is monotonic in the balance, so when it is positive both at the starting balance
+    and at the target, the log argument is positive and the closed form is finite;
+    otherwise the balance stalls or turns back before the target, and inf is the
+    exact answer. Goals already reached take 0 months.
+    """
+    target, current, monthly_contribution, annual_return = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (target, current, monthly_contribution, annual_return))
+    )
+    remaining = target - current
+    monthly_rate = annual_return / 12
+    # How much the balance grows in its first month; growth has to be positive at the target too
+    first_month_growth = current * monthly_rate + monthly_contribution
+    last_month_growth = target * monthly_rate + monthly_contribution
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        compound = np.log1p(remaining * monthly_rate / first_month_growth) / np.log1p(monthly_rate)
+        linear = remaining / monthly_contribution
+    months = np.where(monthly_rate == 0, linear, compound)
+
+    reachable = (first_month_growth > 0) & (last_month_growth > 0) & (monthly_rate > -1) & np.isfinite(months)
+    months = np.where(reachable, months, np.inf)
+    months = np.where(remaining <= 0, 0.0, months)
+    # Contributions are monthly, so round up to whole months (tolerating float noise);
+    # the tolerance must not turn a reached goal into -0.0
+    return np.maximum(np.ceil(months - 1e-9), 0.0) + 0.0
+
+
+# Seconds the default run (one project() call over 10k scenarios x 40 years) should take at most
+TARGET_SECONDS = 2.0
+
+
+def benchmark(scenarios: int = 10000, years: int = 40, seed: int = 0) -> dict:
+    """Time one projection call over random scenarios"""
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    projection = project(
+        rng.uniform(0, 100000, scenarios),
+        rng.uniform(0, 2000, scenarios),
+        rng.uniform(0.0, 0.12, scenarios),
+        rng.integers(12, years * 12 + 1, scenarios)
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "scenarios": scenarios,
+        "months": int(projection.balances.shape[1] - 1),
+        "seconds": round(elapsed, 4),
+        "scenarios_per_second": round(scenarios / elapsed)
+    }
+
+
+def benchmark_goal_grid(goals: int = 1000, contributions: int = 100, returns: int = 50, seed: int = 0) -> dict:
+    """Time one months_to_target call over a goals x contributions x returns grid"""
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    months = months_to_target(
+        rng.uniform(1000, 100000, goals)[:, None, None],
+        rng.uniform(0, 1000, goals)[:, None, None],
+        np.linspace(50, 2000, contributions)[None, :, None],
+        np.linspace(0.0, 0.12, returns)[None, None, :]
+    )
+    return {"cells": int(months.size), "seconds": round(time.perf_counter() - start, 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized projection engine")
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--years", type=int, default=40)
+    args = parser.parse_args()
+
+    result = benchmark(args.scenarios, args.years)
+    print(f"{result['scenarios']} scenarios x {result['months']} months: "
+          f"{result['seconds'] * 1000:.1f} ms ({result['scenarios_per_second']:,} scenarios/s)")
+    projection_seconds = result["seconds"]
+
+    result = benchmark_goal_grid()
+    print(f"{result['cells']:,} goal x contribution x return cells: {result['seconds'] * 1000:.1f} ms")
+    if projection_seconds > TARGET_SECONDS:
+        sys.exit(f"Projection took over the {TARGET_SECONDS}s target")
+
+
+if __name__ == "__main__":
+    main()
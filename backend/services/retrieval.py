@@ -0,0 +1,370 @@
+"""
+BM25 retrieval over the coach's own content, for grounding chat answers.
+
+The corpus has three kinds of snippet: glossary definitions from the terms store,
+the paragraphs of the advice templates in llm_pipeline, and the paragraphs of any
+articles dropped into data/articles (*.md or *.txt; the first line is the title).
+
+The index is compiled once into a single file holding:
+- the sorted vocabulary,
+- per-term postings (document ids and term frequencies),
+- document lengths,
+- the snippets themselves.
+At query time that file is memory-mapped and searched in place: vocabulary lookups
+are binary searches and scoring is vectorized over postings slices. The file
+carries a fingerprint of its sources and is rebuilt when they change; a terms
+hot reload rebuilds it in the background.
+
+Usage:
+    python -m backend.services.retrieval [--docs N] [--queries Q]
+"""
+from collections import Counter
+from pathlib import Path
+from ai_core import llm_pipeline
+from backend.services.terms_store import PROJECT_ROOT, terms_store
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import argparse
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ARTICLES_DIR = Path(os.getenv("FINMATE_ARTICLES_DIR") or PROJECT_ROOT / "data" / "articles")
+INDEX_PATH = PROJECT_ROOT / "data" / "retrieval.idx"
+
+MAGIC = b"FMBM25v1"
+# magic, header JSON length
+PREAMBLE = struct.Struct("<8sQ")
+
+K1 = 1.2
+B = 0.75
+DEFAULT_TOP_K = 3
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\([a-z]\))?")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in into is it its my of on or "
+    "should so than that the their them then there these they this to was what when where which who why "
+    "will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens without stopwords; plurals folded onto the singular"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower().replace("_", " ")):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
+
+
+def corpus_documents(articles_dir: Path = ARTICLES_DIR) -> List[Tuple[str, str, str]]:
+    """(source, title, text) for every snippet in the corpus"""
+    documents = []
+    terms = terms_store.snapshot
+    for term in terms:
+        documents.append(("term", term.replace("_", " "), terms[term]))
+    for response in llm_pipeline.INTENT_RESPONSES.values():
+        sections = _paragraphs(response)
+        heading = sections[0].rstrip(":")
+        documents.extend(("advice", heading, section) for section in sections[1:])
+    if articles_dir.is_dir():
+        for path in sorted([*articles_dir.glob("*.md"), *articles_dir.glob("*.txt")]):
+            title, _, body = path.read_text(encoding="utf-8").partition("\n")
+            title = title.lstrip("# ").strip() or path.stem
+            documents.extend((f"article:{path.name}", title, paragraph) for paragraph in _paragraphs(body))
+    return documents
+
+
+def corpus_fingerprint(articles_dir: Path = ARTICLES_DIR) -> str:
+    """Changes whenever the glossary, the advice templates or an article changes"""
+    parts: List[Any] = [llm_pipeline.TEMPLATE_VERSION]
+    snapshot = terms_store.snapshot
+    parts.append([str(terms_store.source), snapshot.source_mtime_ns, snapshot.source_size])
+    if articles_dir.is_dir():
+        for path in sorted([*articles_dir.glob("*.md"), *articles_dir.glob("*.txt")]):
+            stat = path.stat()
+            parts.append([path.name, stat.st_mtime_ns, stat.st_size])
+    return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def build_index(documents: Sequence[Tuple[str, str, str]], target: Path, fingerprint: str = ""):
+    """Compile documents into the index file format, replacing `target` atomically"""
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    lengths = np.zeros(len(documents), dtype="<u4")
+    for doc_id, (_, title, text) in enumerate(documents):
+        counts = Counter(tokenize(f"{title} {text}"))
+        lengths[doc_id] = sum(counts.values())
+        for token, count in counts.items():
+            postings.setdefault(token, []).append((doc_id, count))
+
+    vocabulary = sorted(postings, key=lambda token: token.encode("utf-8"))
+    vocab_blob = bytearray()
+    vocab_offsets = np.zeros(len(vocabulary) + 1, dtype="<u8")
+    post_offsets = np.zeros(len(vocabulary) + 1, dtype="<u8")
+    for i, token in enumerate(vocabulary):
+        vocab_blob += token.encode("utf-8")
+        vocab_offsets[i + 1] = len(vocab_blob)
+        post_offsets[i + 1] = post_offsets[i] + len(postings[token])
+    total = int(post_offsets[-1])
+    post_docs = np.empty(total, dtype="<u4")
+    post_tfs = np.empty(total, dtype="<u2")
+    for i, token in enumerate(vocabulary):
+        entries = np.asarray(postings[token], dtype=np.int64)
+        start, end = int(post_offsets[i]), int(post_offsets[i + 1])
+        post_docs[start:end] = entries[:, 0]
+        post_tfs[start:end] = np.minimum(entries[:, 1], 65535)
+
+    doc_blob = bytearray()
+    doc_offsets = np.zeros(len(documents) + 1, dtype="<u8")
+    for doc_id, document in enumerate(documents):
+        doc_blob += json.dumps(list(document), ensure_ascii=False).encode("utf-8")
+        doc_offsets[doc_id + 1] = len(doc_blob)
+
+    arrays = {
+        "vocab_offsets": vocab_offsets, "vocab_blob": np.frombuffer(bytes(vocab_blob), dtype=np.uint8),
+        "post_offsets": post_offsets, "post_docs": post_docs, "post_tfs": post_tfs,
+        "doc_lengths": lengths, "doc_offsets": doc_offsets,
+        "doc_blob": np.frombuffer(bytes(doc_blob), dtype=np.uint8),
+    }
+    # Lay the arrays out after the header, each 8-byte aligned
+    sections, offset = {}, 0
+    for name, array in arrays.items():
+        sections[name] = [offset, array.dtype.str, len(array)]
+        offset += -(-array.nbytes // 8) * 8
+    header = json.dumps({
+        "fingerprint": fingerprint,
+        "documents": len(documents),
+        "average_length": float(lengths.mean()) if len(documents) else 0.0,
+        "sections": sections,
+    }).encode("utf-8")
+    header += b" " * (-(PREAMBLE.size + len(header)) % 8)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, len(header)))
+            f.write(header)
+            for array in arrays.values():
+                f.write(array.tobytes())
+                f.write(b"\0" * (-array.nbytes % 8))
+        os.replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class RetrievalIndex:
+    """A compiled BM25 index, memory-mapped and searched in place"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = PREAMBLE.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a retrieval index")
+        header = json.loads(self._buffer[PREAMBLE.size:PREAMBLE.size + header_length])
+        self.fingerprint: str = header["fingerprint"]
+        self.documents: int = header["documents"]
+        self.average_length: float = header["average_length"] or 1.0
+        base = PREAMBLE.size + header_length
+        arrays = {
+            name: np.frombuffer(self._buffer, dtype=dtype, count=count, offset=base + offset)
+            for name, (offset, dtype, count) in header["sections"].items()
+        }
+        self._vocab_offsets = arrays["vocab_offsets"]
+        self._vocab_blob = arrays["vocab_blob"]
+        self._post_offsets = arrays["post_offsets"]
+        self._post_docs = arrays["post_docs"]
+        self._post_tfs = arrays["post_tfs"]
+        self._doc_offsets = arrays["doc_offsets"]
+        self._doc_blob = arrays["doc_blob"]
+        # Per-document BM25 length normalization, computed once
+        self._norms = (K1 * (1 - B + B * arrays["doc_lengths"] / self.average_length)).astype(np.float32)
+        self._vocabulary_size = len(self._vocab_offsets) - 1
+
+    def _token(self, i: int) -> bytes:
+        return self._vocab_blob[int(self._vocab_offsets[i]):int(self._vocab_offsets[i + 1])].tobytes()
+
+    def _postings(self, token: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        key = token.encode("utf-8")
+        low, high = 0, self._vocabulary_size
+        while low < high:
+            middle = (low + high) // 2
+            if self._token(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._vocabulary_size or self._token(low) != key:
+            return None
+        start, end = int(self._post_offsets[low]), int(self._post_offsets[low + 1])
+        return self._post_docs[start:end], self._post_tfs[start:end]
+
+    def document(self, doc_id: int) -> Tuple[str, str, str]:
+        start, end = int(self._doc_offsets[doc_id]), int(self._doc_offsets[doc_id + 1])
+        source, title, text = json.loads(self._doc_blob[start:end].tobytes())
+        return source, title, text
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K) -> List[Dict[str, Any]]:
+        """The k best snippets for `query` by BM25, best first"""
+        scores: Optional[np.ndarray] = None
+        for token, repeats in Counter(tokenize(query)).items():
+            postings = self._postings(token)
+            if postings is None:
+                continue
+            docs, tfs = postings
+            idf = math.log(1 + (self.documents - len(docs) + 0.5) / (len(docs) + 0.5))
+            tfs = tfs.astype(np.float32)
+            if scores is None:
+                scores = np.zeros(self.documents, dtype=np.float32)
+            # Doc ids are unique within a posting list, so fancy-index += is safe
+            scores[docs] += repeats * idf * tfs * (K1 + 1) / (tfs + self._norms[docs])
+        if scores is None:
+            return []
+        k = min(k, self.documents)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results = []
+        for doc_id in top.tolist():
+            if scores[doc_id] <= 0:
+                break
+            source, title, text = self.document(doc_id)
+            results.append({"source": source, "title": title, "snippet": text, "score": round(float(scores[doc_id]), 4)})
+        return results
+
+
+class RetrievalStore:
+    """The current index, built on first use and rebuilt when its sources change"""
+
+    def __init__(self, path: Path = INDEX_PATH, articles_dir: Path = ARTICLES_DIR):
+        self.path = path
+        self.articles_dir = articles_dir
+        self._index: Optional[RetrievalIndex] = None
+        self._lock = threading.Lock()
+
+    def _build(self) -> RetrievalIndex:
+        fingerprint = corpus_fingerprint(self.articles_dir)
+        path = self.path if os.access(self.path.parent, os.W_OK) else Path(tempfile.gettempdir()) / "finmate-retrieval.idx"
+        if path.exists():
+            try:
+                index = RetrievalIndex(path)
+                if index.fingerprint == fingerprint:
+                    return index
+            except (OSError, ValueError, KeyError, struct.error):
+                pass
+        build_index(corpus_documents(self.articles_dir), path, fingerprint)
+        return RetrievalIndex(path)
+
+    @property
+    def index(self) -> RetrievalIndex:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build()
+        return self._index
+
+    def rebuild(self):
+        """Rebuild from the current sources and swap the new index in"""
+        index = self._build()
+        with self._lock:
+            self._index = index
+
+    def rebuild_in_background(self):
+        threading.Thread(target=self._rebuild_logged, name="retrieval-rebuild", daemon=True).start()
+
+    def _rebuild_logged(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Failed to rebuild the retrieval index; keeping the previous one")
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K) -> List[Dict[str, Any]]:
+        return self.index.search(query, k)
+
+
+# Global instance
+retrieval_store = RetrievalStore()
+terms_store.add_reload_listener(retrieval_store.rebuild_in_background)
+
+
+def _synthetic_corpus(count: int, seed: int = 0) -> List[Tuple[str, str, str]]:
+    rng = np.random.default_rng(seed)
+    # Zipf-like vocabulary: a few very common words and a long tail
+    words = np.array(["budget", "retirement", "savings", "index", "fund", "debt", "credit"] + [f"w{i}" for i in range(50000)])
+    probabilities = 1 / np.arange(1, len(words) + 1)
+    cumulative = np.cumsum(probabilities / probabilities.sum())
+    lengths = rng.integers(20, 80, count)
+    tokens = words[np.minimum(np.searchsorted(cumulative, rng.random(int(lengths.sum()))), len(words) - 1)]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return [
+        ("article:synthetic", f"Document {doc_id}", " ".join(tokens[bounds[doc_id]:bounds[doc_id + 1]]))
+        for doc_id in range(count)
+    ]
+
+
+# p95 latency of a top-3 query on the benchmark corpus
+TARGET_P95_MS = 5.0
+
+
+def benchmark(docs: int = 100000, queries: int = 500, seed: int = 0) -> Dict[str, float]:
+    """Build an index over a synthetic corpus, then time BM25 top-3 queries"""
+    documents = _synthetic_corpus(docs, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "bench.idx"
+        start = time.perf_counter()
+        build_index(documents, path)
+        build_seconds = time.perf_counter() - start
+        index = RetrievalIndex(path)
+        rng = random.Random(seed + 1)
+        sample = [" ".join(rng.sample(documents[rng.randrange(docs)][2].split(), 3)) for _ in range(queries)]
+        timings = []
+        for query in sample:
+            start = time.perf_counter()
+            index.search(query)
+            timings.append(time.perf_counter() - start)
+        index_bytes = path.stat().st_size
+        del index
+    timings.sort()
+    return {
+        "build_seconds": round(build_seconds, 2),
+        "index_mb": round(index_bytes / 2 ** 20, 1),
+        "mean_ms": round(sum(timings) / queries * 1000, 3),
+        "p95_ms": round(timings[int(queries * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 retrieval")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    result = benchmark(args.docs, args.queries)
+    print(f"{args.docs:,} documents: built in {result['build_seconds']}s, {result['index_mb']} MB")
+    print(f"top-3 query: mean {result['mean_ms']} ms, p95 {result['p95_ms']} ms")
+    if result["p95_ms"] >= TARGET_P95_MS:
+        sys.exit(f"p95 is over the {TARGET_P95_MS} ms target")
+
+
+if __name__ == "__main__":
+    main()
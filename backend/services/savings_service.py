@@ -2,12 +2,18 @@ from backend.models.finance_models import SavingsGoal, InvestmentRisk
 from backend.models.database_models import SavingsGoal as DBSavingsGoal, User
 from typing import List
 from datetime import date, datetime
+from backend.utils.cache import cache
+from backend.utils.fieldsets import serialize_row
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 import uuid
 
 class SavingsService:
     """Service for savings goals management"""
     
+    # Columns that can be requested through sparse fieldsets
+    GOAL_FIELDS = ("id", "name", "target_amount", "current_amount", "target_date", "priority", "created_at")
+    
     def __init__(self):
         pass
     
@@ -24,12 +30,22 @@ class SavingsService:
         db.add(db_goal)
         db.commit()
         db.refresh(db_goal)
+        cache.invalidate_user(user_id)
         return db_goal
     
     def get_savings_goals(self, user_id: int, db: Session) -> List[DBSavingsGoal]:
         """Get all savings goals for a user"""
         return db.query(DBSavingsGoal).filter(DBSavingsGoal.user_id == user_id).all()
     
+    def get_savings_goal_rows(self, user_id: int, fields: List[str], db: Session) -> List[dict]:
+        """Get a user's savings goals as plain dicts, selecting only the requested columns"""
+        def query():
+            table = DBSavingsGoal.__table__
+            stmt = select(*[table.c[field] for field in fields]).where(table.c.user_id == user_id)
+            return [serialize_row(row) for row in db.execute(stmt).mappings()]
+        
+        return cache.get_or_compute(cache.user_namespace(user_id), f"goals:{','.join(fields)}", query)
+    
     def update_savings_goal(self, goal_id: int, amount: float, user_id: int, db: Session) -> DBSavingsGoal:
         """Update the current amount for a savings goal"""
         goal = db.query(DBSavingsGoal).filter(
@@ -41,6 +57,7 @@ class SavingsService:
             goal.current_amount = amount
             db.commit()
             db.refresh(goal)
+            cache.invalidate_user(user_id)
             return goal
         raise ValueError("Savings goal not found")
     
@@ -54,6 +71,7 @@ class SavingsService:
         if goal:
             db.delete(goal)
             db.commit()
+            cache.invalidate_user(user_id)
             return True
         return False
     
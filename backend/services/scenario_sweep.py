@@ -0,0 +1,193 @@
+"""
+Parameter sweeps over the deterministic scenarios.
+
+A sweep fixes some scenario parameters and gives ranges for others. The full
+Cartesian grid of the ranges is evaluated in one vectorized pass using the closed-form
+projection, and the points can be written out incrementally as NDJSON.
+"""
+from backend.services.projection_engine import future_values
+from typing import Any, Dict, Iterator, List, Union
+import json
+import os
+
+import numpy as np
+
+# Largest grid a single sweep may evaluate
+MAX_GRID_POINTS = int(os.getenv("FINMATE_SWEEP_MAX_POINTS", "200000"))
+# Largest number of values in one range
+MAX_AXIS_VALUES = 1000
+# Grid points per NDJSON chunk
+STREAM_CHUNK_POINTS = 2000
+
+# Defaults match AISmartService's single-scenario simulations
+SCENARIO_DEFAULTS = {
+    "savings_rate": {
+        "annual_income": 60000, "current_savings": 0, "savings_rate": 0.20, "years": 10, "return_rate": 0.07
+    },
+    "investment_return": {
+        "initial_amount": 10000, "monthly_contribution": 500, "years": 10, "return_rate": 0.07
+    },
+    "retirement": {
+        "current_age": 30, "retirement_age": 65, "current_savings": 0, "monthly_contribution": 500, "return_rate": 0.07
+    },
+}
+
+# Parameters that count whole years or ages
+INTEGER_PARAMETERS = {"years", "current_age", "retirement_age"}
+
+RangeSpec = Union[List[float], Dict[str, float]]
+
+
+def _number(value: Any, error: str) -> float:
+    """`value` as a float, raising ValueError(error) unless it is a finite number"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+        raise ValueError(error)
+    return float(value)
+
+
+def _finite(name: str, spec: Dict[str, float], key: str) -> float:
+    return _number(spec[key], f"Range '{name}' needs a finite number for '{key}'")
+
+
+def expand_range(name: str, spec: RangeSpec) -> np.ndarray:
+    """
+    Turn a range spec into its values: an explicit list, {"start", "stop", "step"}
+    (stop included) or {"start", "stop", "num"} (evenly spaced).
+    """
+    if isinstance(spec, list):
+        if len(spec) > MAX_AXIS_VALUES:
+            raise ValueError(f"Range '{name}' has more than {MAX_AXIS_VALUES} values")
+        error = f"Range '{name}' must be a list of finite numbers"
+        values = np.array([_number(value, error) for value in spec], dtype=np.float64)
+    elif isinstance(spec, dict) and {"start", "stop"} <= spec.keys():
+        start, stop = _finite(name, spec, "start"), _finite(name, spec, "stop")
+        if "num" in spec:
+            # Checked before linspace allocates anything
+            num = _finite(name, spec, "num")
+            if not 1 <= num <= MAX_AXIS_VALUES:
+                raise ValueError(f"Range '{name}' needs a 'num' between 1 and {MAX_AXIS_VALUES}")
+            values = np.linspace(start, stop, int(num))
+        elif "step" in spec and _finite(name, spec, "step") > 0:
+            step = _finite(name, spec, "step")
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            if count > MAX_AXIS_VALUES:
+                raise ValueError(f"Range '{name}' has more than {MAX_AXIS_VALUES} values")
+            values = start + step * np.arange(max(count, 0))
+        else:
+            raise ValueError(f"Range '{name}' needs a positive 'step' or a 'num'")
+    else:
+        raise ValueError(f"Range '{name}' must be a list of values or {{start, stop, step|num}}")
+
+    if values.size == 0:
+        raise ValueError(f"Range '{name}' is empty")
+    if values.size > MAX_AXIS_VALUES:
+        raise ValueError(f"Range '{name}' has more than {MAX_AXIS_VALUES} values")
+    if name in INTEGER_PARAMETERS:
+        values = np.unique(np.round(values))
+    return values
+
+
+def _evaluate(scenario_type: str, p: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Vectorized versions of the single-scenario simulations' headline numbers"""
+    if scenario_type == "savings_rate":
+        monthly_savings = p["annual_income"] / 12 * p["savings_rate"]
+        months = p["years"] * 12
+        value = future_values(p["current_savings"], monthly_savings, p["return_rate"], months)
+        return {
+            "monthly_savings": monthly_savings,
+            "future_value": value,
+            "growth_amount": value - p["current_savings"] - monthly_savings * months,
+        }
+    if scenario_type == "investment_return":
+        months = p["years"] * 12
+        value = future_values(p["initial_amount"], p["monthly_contribution"], p["return_rate"], months)
+        return {
+            "future_value": value,
+            "growth": value - p["initial_amount"] - p["monthly_contribution"] * months,
+        }
+    months = np.maximum(p["retirement_age"] - p["current_age"], 0) * 12
+    value = future_values(p["current_savings"], p["monthly_contribution"], p["return_rate"], months)
+    return {
+        "total_retirement_savings": value,
+        # 4% rule, as in the single retirement scenario
+        "monthly_retirement_income": value * 0.04 / 12,
+    }
+
+
+class SweepResult:
+    """An evaluated grid: the swept axes, and one row of inputs and outputs per point"""
+
+    def __init__(self, scenario_type: str, axes: Dict[str, np.ndarray], fixed: Dict[str, float],
+                 inputs: Dict[str, np.ndarray], outputs: Dict[str, np.ndarray]):
+        self.scenario_type = scenario_type
+        self.axes = axes
+        self.fixed = fixed
+        self.inputs = inputs
+        self.outputs = outputs
+
+    @property
+    def points(self) -> int:
+        return int(next(iter(self.inputs.values())).size) if self.inputs else 1
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            "scenario_type": self.scenario_type,
+            "axes": {name: values.tolist() for name, values in self.axes.items()},
+            "fixed": self.fixed,
+            "points": self.points,
+            "outputs": list(self.outputs),
+        }
+
+    def iter_ndjson(self, chunk_points: int = STREAM_CHUNK_POINTS) -> Iterator[bytes]:
+        """The header line, then one line per grid point, in chunks of `chunk_points` lines"""
+        yield (json.dumps(self.header()) + "\n").encode("utf-8")
+        columns = {
+            name: (values.astype(np.int64) if name in INTEGER_PARAMETERS else values).tolist()
+            for name, values in self.inputs.items()
+        }
+        results = {name: np.round(values, 2).tolist() for name, values in self.outputs.items()}
+        for start in range(0, self.points, chunk_points):
+            lines = []
+            for i in range(start, min(start + chunk_points, self.points)):
+                row = {name: values[i] for name, values in columns.items()}
+                row.update({name: values[i] for name, values in results.items()})
+                lines.append(json.dumps(row))
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def sweep_axes(scenario_type: str, parameters: Dict[str, Any], ranges: Dict[str, RangeSpec],
+               max_points: int = MAX_GRID_POINTS) -> Dict[str, np.ndarray]:
+    """Validate a sweep request and expand its ranges, without evaluating the grid"""
+    if scenario_type not in SCENARIO_DEFAULTS:
+        raise ValueError(
+            f"Scenario type '{scenario_type}' cannot be swept; supported: {', '.join(SCENARIO_DEFAULTS)}"
+        )
+    defaults = SCENARIO_DEFAULTS[scenario_type]
+    unknown = (set(parameters) | set(ranges)) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {scenario_type}: {', '.join(sorted(unknown))}")
+    if not ranges:
+        raise ValueError("At least one parameter range is required")
+    for name, value in parameters.items():
+        _number(value, f"Parameter '{name}' must be a single finite number")
+
+    axes = {name: expand_range(name, spec) for name, spec in ranges.items()}
+    points = int(np.prod([values.size for values in axes.values()], dtype=np.int64))
+    if points > max_points:
+        raise ValueError(f"Grid has {points} points; the limit is {max_points}")
+    return axes
+
+
+def sweep(scenario_type: str, parameters: Dict[str, Any], ranges: Dict[str, RangeSpec],
+          max_points: int = MAX_GRID_POINTS) -> SweepResult:
+    """Evaluate a scenario over the Cartesian product of `ranges`, with the rest of the parameters fixed"""
+    axes = sweep_axes(scenario_type, parameters, ranges, max_points)
+    points = int(np.prod([values.size for values in axes.values()], dtype=np.int64))
+    defaults = SCENARIO_DEFAULTS[scenario_type]
+    fixed = {name: float(parameters.get(name, default)) for name, default in defaults.items() if name not in axes}
+    mesh = np.meshgrid(*axes.values(), indexing="ij")
+    inputs = {name: grid.ravel() for name, grid in zip(axes, mesh)}
+    outputs = _evaluate(scenario_type, {**fixed, **inputs})
+    # Fixed parameters can make an output a scalar; give every output one value per point
+    outputs = {name: np.broadcast_to(values, (points,)) for name, values in outputs.items()}
+    return SweepResult(scenario_type, axes, fixed, inputs, outputs)
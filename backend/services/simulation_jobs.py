@@ -0,0 +1,96 @@
+"""
+Job kinds for long-running simulations and reports, run by the job manager's process pool.
+
+- scenario: any scenario simulation; Monte Carlo runs are split into chunks of
+  paths so the job reports progress and may use more paths than a direct request.
+- sweep: a scenario sweep, returned as the grid header plus every point.
+- retirement_report: a year-by-year retirement report combining the deterministic
+  projection with Monte Carlo percentile bands.
+"""
+from backend.services.ai_smart_service import ai_smart_service
+from backend.services.monte_carlo import _simulate_chunk
+from backend.services.scenario_sweep import sweep, sweep_axes
+from backend.utils.cache import canonicalize
+from backend.utils.jobs import JobManager, JobPlan
+from typing import Any, Dict, List
+import json
+
+# Monte Carlo paths allowed in a background job (direct requests allow MAX_SCENARIO_PATHS)
+MAX_JOB_PATHS = 250000
+
+
+def _run_scenario(scenario_type: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    return ai_smart_service.simulate_scenario(scenario_type, parameters)
+
+
+def _run_sweep(scenario_type: str, parameters: Dict[str, Any], ranges: Dict[str, Any]) -> Dict[str, Any]:
+    result = sweep(scenario_type, parameters, ranges)
+    lines = b"".join(result.iter_ndjson()).splitlines()
+    return {**json.loads(lines[0]), "rows": [json.loads(line) for line in lines[1:]]}
+
+
+def _monte_carlo_plan(parameters: Dict[str, Any], combine) -> JobPlan:
+    run = ai_smart_service.monte_carlo_run(parameters, max_paths=MAX_JOB_PATHS)
+    return JobPlan(
+        [(_simulate_chunk, (chunk,)) for chunk in run.chunks],
+        lambda results: combine(run.summarize(results))
+    )
+
+
+def plan_scenario(spec: Dict[str, Any]) -> JobPlan:
+    scenario_type = spec.get("scenario_type")
+    parameters = canonicalize(spec.get("parameters") or {})
+    ai_smart_service.check_scenario(scenario_type, parameters)
+    if scenario_type == "retirement_monte_carlo":
+        return _monte_carlo_plan(parameters, lambda result: ai_smart_service.monte_carlo_response(parameters, result))
+    if not isinstance(scenario_type, str):
+        raise ValueError("scenario_type is required")
+    return JobPlan([(_run_scenario, (scenario_type, parameters))])
+
+
+def plan_sweep(spec: Dict[str, Any]) -> JobPlan:
+    scenario_type = spec.get("scenario_type")
+    parameters = spec.get("parameters") or {}
+    ranges = spec.get("ranges") or {}
+    # Validate the ranges and grid size now, so a bad sweep fails at submission;
+    # the grid itself is evaluated by the pool
+    sweep_axes(scenario_type, parameters, ranges)
+    return JobPlan([(_run_sweep, (scenario_type, parameters, ranges))])
+
+
+def plan_retirement_report(spec: Dict[str, Any]) -> JobPlan:
+    parameters = canonicalize(spec)
+    ai_smart_service.check_scenario("retirement_monte_carlo", parameters)
+    deterministic = ai_smart_service.simulate_scenario("retirement", {
+        name: parameters[name]
+        for name in ("current_age", "retirement_age", "current_savings", "monthly_contribution", "return_rate")
+        if name in parameters
+    })
+
+    def combine(result: Dict[str, Any]) -> Dict[str, Any]:
+        response = ai_smart_service.monte_carlo_response(parameters, result)
+        yearly: List[Dict[str, Any]] = []
+        for year, age in enumerate(response["ages"]):
+            row = {"age": age, "phase": "saving" if year <= result["years_to_retirement"] else "retired"}
+            row.update({band: values[year] for band, values in result["bands"].items()})
+            yearly.append(row)
+        return {
+            "report": "Retirement Report",
+            "summary": {
+                "success_probability": result["success_probability"],
+                "projected_savings_at_retirement": deterministic["total_retirement_savings"],
+                "monthly_retirement_income": deterministic["monthly_retirement_income"],
+                "balance_at_retirement": result["balance_at_retirement"],
+                "paths": result["paths"],
+                "seed": result["seed"]
+            },
+            "yearly": yearly
+        }
+
+    return _monte_carlo_plan(parameters, combine)
+
+
+def register_simulation_jobs(manager: JobManager):
+    manager.register_kind("scenario", plan_scenario)
+    manager.register_kind("sweep", plan_sweep)
+    manager.register_kind("retirement_report", plan_retirement_report)
@@ -0,0 +1,199 @@
+"""
+Typo-tolerant index over financial term keys.
+
+Prefix lookups binary-search a sorted array of the normalized keys. That array is
+a flattened prefix trie: all keys sharing a prefix are contiguous, so a prefix
+query is two bisections. Fuzzy lookups use an inverted index of character
+trigrams to pick the few candidates that share the most trigrams with the query,
+then rank them by bounded edit distance. Common trigrams are skipped once enough
+rarer ones have been scanned, which keeps fuzzy lookups fast on large glossaries.
+
+Usage:
+    python -m backend.services.term_index [--terms N] [--queries Q]
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+NGRAM = 3
+# Trigram-overlap candidates that get an exact edit-distance check
+FUZZY_CANDIDATES = 12
+# Posting entries scanned per fuzzy query; the rarest (most telling) trigrams go first
+MAX_SCANNED_POSTINGS = 20000
+MAX_EDIT_DISTANCE = 3
+
+
+def normalize_term(term: str) -> str:
+    """Normalize a term the way the glossary keys are written: lower case, words joined by underscores"""
+    return "_".join(term.lower().replace("-", " ").replace("_", " ").split())
+
+
+def ngrams(text: str, n: int = NGRAM) -> List[str]:
+    """Character n-grams, with boundary markers so prefixes and suffixes weigh in"""
+    padded = f"^{text}$"
+    return [padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))]
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance if it is at most `limit`, otherwise limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        # Only cells within `limit` of the diagonal can stay under the limit
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [limit + 1] * (len(b) + 1)
+        current[0] = i if i <= limit else limit + 1
+        row_min = current[0]
+        for j in range(low, high + 1):
+            cost = 0 if char_a == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return min(previous[len(b)], limit + 1)
+
+
+class TermIndex:
+    """Exact, prefix and fuzzy lookup over a fixed set of terms"""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = sorted({normalize_term(term) for term in terms if term.strip()})
+        self._ids = {term: i for i, term in enumerate(self.terms)}
+        postings: Dict[str, List[int]] = {}
+        for i, term in enumerate(self.terms):
+            for gram in set(ngrams(term)):
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return normalize_term(term) in self._ids
+
+    def with_prefix(self, prefix: str, limit: int = 10) -> List[str]:
+        """Terms starting with `prefix`, alphabetically"""
+        prefix = normalize_term(prefix)
+        start = bisect_left(self.terms, prefix)
+        matches = []
+        for term in self.terms[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def similar(self, query: str, limit: int = 5, max_distance: int = MAX_EDIT_DISTANCE,
+                exclude: Sequence[str] = ()) -> List[str]:
+        """
+        Terms close to `query`: terms containing it (or contained in it) first, then
+        by edit distance (to the whole term or one of its words), then by shared trigrams.
+        """
+        query = normalize_term(query)
+        postings = sorted((self._postings[gram] for gram in set(ngrams(query)) if gram in self._postings), key=len)
+        if not postings:
+            return []
+        grams, scanned = [], 0
+        for posting in postings:
+            if grams and scanned + len(posting) > MAX_SCANNED_POSTINGS:
+                break
+            grams.append(posting)
+            scanned += len(posting)
+        ids, counts = np.unique(np.concatenate(grams), return_counts=True)
+        if ids.size > FUZZY_CANDIDATES:
+            top = np.argpartition(-counts, FUZZY_CANDIDATES - 1)[:FUZZY_CANDIDATES]
+            ids, counts = ids[top], counts[top]
+
+        ranked = []
+        for term_id, shared in zip(ids.tolist(), counts.tolist()):
+            term = self.terms[term_id]
+            if term in exclude or term == query:
+                continue
+            contained = query in term or term in query
+            distance = bounded_edit_distance(query, term, max_distance)
+            if "_" in term and "_" not in query:
+                # A misspelled single word should still find phrases containing it
+                distance = min([distance] + [bounded_edit_distance(query, word, max_distance) for word in term.split("_")])
+            if contained or distance <= max_distance:
+                ranked.append((not contained, distance, -shared, term))
+        ranked.sort()
+        return [entry[3] for entry in ranked[:limit]]
+
+    def autocomplete(self, text: str, limit: int = 10) -> List[str]:
+        """Prefix matches, topped up with typo-tolerant matches when there are too few"""
+        matches = self.with_prefix(text, limit)
+        if len(matches) < limit and len(normalize_term(text)) >= NGRAM:
+            matches += self.similar(text, limit - len(matches), exclude=matches)
+        return matches
+
+
+def _synthetic_terms(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    syllables = ["fi", "nan", "cial", "in", "vest", "ment", "bond", "yield", "cap", "ital", "tax", "de",
+                 "ferred", "re", "tire", "asset", "al", "lo", "ca", "tion", "div", "i", "dend", "ra", "tio"]
+    terms = set()
+    while len(terms) < count:
+        words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        terms.add("_".join(words))
+    return sorted(terms)
+
+
+def _typo(term: str, rng: random.Random) -> str:
+    i = rng.randrange(len(term))
+    return term[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + term[i + 1:]
+
+
+# Every kind of lookup should stay under this at 100k terms
+TARGET_MS = 1.0
+
+
+def benchmark(terms: int = 100000, queries: int = 2000, seed: int = 0) -> Dict[str, float]:
+    """Build an index over synthetic terms and time each kind of lookup, in ms per query"""
+    vocabulary = _synthetic_terms(terms, seed)
+    start = time.perf_counter()
+    index = TermIndex(vocabulary)
+    build_seconds = time.perf_counter() - start
+
+    rng = random.Random(seed + 1)
+    sample = [rng.choice(vocabulary) for _ in range(queries)]
+    timings = {"build_seconds": round(build_seconds, 3)}
+    for name, run in (
+        ("exact_ms", lambda term: term in index),
+        ("prefix_ms", lambda term: index.with_prefix(term[:4])),
+        ("autocomplete_ms", lambda term: index.autocomplete(term[:6])),
+        ("typo_ms", lambda term: index.similar(_typo(term, rng))),
+    ):
+        start = time.perf_counter()
+        for term in sample:
+            run(term)
+        timings[name] = round((time.perf_counter() - start) * 1000 / queries, 4)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the financial term index")
+    parser.add_argument("--terms", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    result = benchmark(args.terms, args.queries)
+    print(f"{args.terms:,} terms, index built in {result.pop('build_seconds')}s")
+    for name, value in result.items():
+        print(f"{name[:-3]:>14}: {value:.4f} ms/query")
+    slow = [name[:-3] for name, value in result.items() if value >= TARGET_MS]
+    if slow:
+        sys.exit(f"Over the {TARGET_MS} ms/query target: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Compiled, hot-reloadable store for the financial terms glossary.
+
+The glossary JSON maps term -> definition, or term -> {language: definition} for
+multilingual glossaries. It is compiled once into a compact binary file next to it
+(or in the temp directory if that isn't writable). The file holds a table of
+sorted keys plus one blob of UTF-8 text. The compiled file is memory-mapped and
+searched in place, so a large glossary costs page cache rather than Python objects.
+
+The store loads lazily on first use. Afterwards it checks the source's mtime every
+few seconds, and when it has changed it recompiles and builds the new snapshot on a
+background thread. Readers keep using the old snapshot until the new one is swapped
+in, so they never wait for a reload.
+"""
+from collections.abc import Mapping
+from pathlib import Path
+from backend.services.term_index import TermIndex, normalize_term
+from typing import Callable, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_TERMS_PATH = PROJECT_ROOT / "data" / "financial_terms.json"
+
+MAGIC = b"FMTERMS1"
+# magic, source mtime (ns), source size, entry count
+HEADER = struct.Struct("<8sqqI")
+# key offset, key length, definition offset, definition length, flags (per entry, in the blob)
+ENTRY_FIELDS = 5
+FLAG_LANGUAGES = 1
+
+DEFAULT_LANGUAGE = "en"
+RELOAD_CHECK_INTERVAL = float(os.getenv("FINMATE_TERMS_RELOAD_INTERVAL", "2.0"))
+
+
+def compile_terms(source: Path, target: Path):
+    """Compile a glossary JSON file into the binary format, replacing `target` atomically"""
+    stat = source.stat()
+    with open(source, "r", encoding="utf-8") as f:
+        glossary = json.load(f)
+    if not isinstance(glossary, dict):
+        raise ValueError(f"{source} must contain a JSON object of term -> definition")
+
+    entries = {}
+    for term, definition in glossary.items():
+        key = normalize_term(term)
+        if isinstance(definition, dict):
+            entries[key.encode("utf-8")] = (json.dumps(definition, ensure_ascii=False).encode("utf-8"), FLAG_LANGUAGES)
+        else:
+            entries[key.encode("utf-8")] = (str(definition).encode("utf-8"), 0)
+
+    table = np.zeros((len(entries), ENTRY_FIELDS), dtype="<u4")
+    blob = bytearray()
+    # Sorted by UTF-8 bytes, the order the reader binary-searches in
+    for i, key in enumerate(sorted(entries)):
+        text, flags = entries[key]
+        table[i] = (len(blob), len(key), len(blob) + len(key), len(text), flags)
+        blob += key
+        blob += text
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size, len(entries)))
+            f.write(table.tobytes())
+            f.write(blob)
+        os.replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class TermsSnapshot(Mapping):
+    """One immutable, memory-mapped version of the glossary; reads like a dict of term -> definition"""
+
+    def __init__(self, path: Optional[Path] = None, source_mtime_ns: int = 0, source_size: int = 0):
+        self.source_mtime_ns = source_mtime_ns
+        self.source_size = source_size
+        self._keys: Optional[List[str]] = None
+        self._index: Optional[TermIndex] = None
+        if path is None:
+            self._buffer = b""
+            self._table = np.zeros((0, ENTRY_FIELDS), dtype="<u4")
+            self._blob_start = 0
+            return
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.source_mtime_ns, self.source_size, count = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled terms file")
+        self._table = np.frombuffer(self._buffer, dtype="<u4", count=count * ENTRY_FIELDS,
+                                    offset=HEADER.size).reshape(count, ENTRY_FIELDS)
+        self._blob_start = HEADER.size + self._table.nbytes
+
+    def _key_bytes(self, i: int) -> bytes:
+        offset, length = int(self._table[i, 0]), int(self._table[i, 1])
+        start = self._blob_start + offset
+        return self._buffer[start:start + length]
+
+    def _find(self, term: str) -> int:
+        key = normalize_term(term).encode("utf-8")
+        low, high = 0, len(self._table)
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self._table) and self._key_bytes(low) == key else -1
+
+    def definition(self, term: str, language: Optional[str] = None) -> Optional[str]:
+        """A term's definition, in `language` when the glossary has it (default English)"""
+        i = self._find(term)
+        if i < 0:
+            return None
+        _, _, offset, length, flags = (int(value) for value in self._table[i])
+        start = self._blob_start + offset
+        text = self._buffer[start:start + length].decode("utf-8")
+        if not flags & FLAG_LANGUAGES:
+            return text
+        translations = json.loads(text)
+        for choice in (language, DEFAULT_LANGUAGE):
+            if choice in translations:
+                return translations[choice]
+        return next(iter(translations.values()), None)
+
+    def __getitem__(self, term: str) -> str:
+        value = self.definition(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+    def __contains__(self, term) -> bool:
+        return isinstance(term, str) and self._find(term) >= 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.term_keys)
+
+    @property
+    def term_keys(self) -> List[str]:
+        if self._keys is None:
+            self._keys = [self._key_bytes(i).decode("utf-8") for i in range(len(self._table))]
+        return self._keys
+
+    @property
+    def index(self) -> TermIndex:
+        """Prefix and typo-tolerant index over this snapshot's terms"""
+        if self._index is None:
+            self._index = TermIndex(self.term_keys)
+        return self._index
+
+
+class TermsStore:
+    """The current glossary snapshot, compiled and reloaded in the background as the source changes"""
+
+    def __init__(self, source: Optional[Path] = None, reload_interval: float = RELOAD_CHECK_INTERVAL):
+        self.source = Path(source or os.getenv("FINMATE_TERMS_PATH") or DEFAULT_TERMS_PATH)
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[TermsSnapshot] = None
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._next_check = 0.0
+        self._listeners: List[Callable[[], None]] = []
+        self.reloads = 0
+
+    def add_reload_listener(self, listener: Callable[[], None]):
+        """Call `listener` after each hot reload, e.g. to invalidate caches built from the terms"""
+        self._listeners.append(listener)
+
+    def _compiled_path(self) -> Path:
+        target = self.source.with_suffix(".idx")
+        if os.access(target.parent, os.W_OK):
+            return target
+        digest = hashlib.sha1(str(self.source).encode("utf-8")).hexdigest()[:12]
+        return Path(tempfile.gettempdir()) / f"finmate-terms-{digest}.idx"
+
+    def _source_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.source.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> TermsSnapshot:
+        """Open the compiled file, compiling first if it is missing or stale"""
+        signature = self._source_signature()
+        if signature is None:
+            logger.warning("Financial terms file %s not found; serving an empty glossary", self.source)
+            return TermsSnapshot()
+        compiled = self._compiled_path()
+        if compiled.exists():
+            try:
+                snapshot = TermsSnapshot(compiled)
+                if (snapshot.source_mtime_ns, snapshot.source_size) == signature:
+                    return snapshot
+            except (OSError, ValueError, struct.error):
+                pass
+        compile_terms(self.source, compiled)
+        return TermsSnapshot(compiled)
+
+    @property
+    def snapshot(self) -> TermsSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                    self._next_check = time.monotonic() + self.reload_interval
+                return self._snapshot
+        if time.monotonic() >= self._next_check:
+            self._check_for_changes(snapshot)
+        return snapshot
+
+    def _check_for_changes(self, snapshot: TermsSnapshot):
+        with self._lock:
+            if self._reloading or time.monotonic() < self._next_check:
+                return
+            self._next_check = time.monotonic() + self.reload_interval
+            if self._source_signature() in (None, (snapshot.source_mtime_ns, snapshot.source_size)):
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name="terms-reload", daemon=True).start()
+
+    def _reload(self):
+        try:
+            snapshot = self._load()
+            snapshot.index  # Build the index here, not on a request thread
+            with self._lock:
+                self._snapshot = snapshot
+                self.reloads += 1
+            logger.info("Reloaded %d financial terms from %s", len(snapshot), self.source)
+            for listener in self._listeners:
+                listener()
+        except Exception:
+            logger.exception("Failed to reload financial terms from %s; keeping the previous version", self.source)
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def reload_now(self):
+        """Reload synchronously (used by tests and admin tooling)"""
+        with self._lock:
+            self._reloading = True
+        self._reload()
+
+
+# Global instance
+terms_store = TermsStore()
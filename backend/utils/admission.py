@@ -0,0 +1,169 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from starlette.requests import HTTPConnection
+from backend.utils.metrics import metrics
+from typing import AsyncIterator, Deque, Dict, Optional
+import asyncio
+import threading
+
+
+class AdmissionLimiter:
+    """
+    Admission control for a group of routes, used as a FastAPI dependency.
+
+    At most `max_concurrent` requests run at once. Up to `max_queue` more wait in
+    FIFO order for at most `queue_timeout` seconds. Requests beyond that are shed
+    with 503 and Retry-After. A single client may hold at most `max_per_client`
+    slots, and requests beyond that get 429.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int = 0,
+                 queue_timeout: float = 1.0, max_per_client: Optional[int] = None,
+                 retry_after: int = 1, applies_to_batch: bool = True):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_per_client = max_per_client
+        self.retry_after = retry_after
+        self.applies_to_batch = applies_to_batch
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._per_client: Dict[str, int] = {}
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_queue_timeout": 0,
+            "rejected_client_limit": 0,
+        }
+        admission_registry.register(self)
+
+    def _reject(self, status_code: int, reason: str, detail: str):
+        self._stats[reason] += 1
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+    def _wake(self, future: asyncio.Future):
+        """Hand a freed slot to a waiter, or pass it on if the waiter already gave up"""
+        if future.done():
+            self._release_slot()
+        else:
+            future.set_result(True)
+
+    def _release_slot(self):
+        with self._lock:
+            while self._waiters:
+                future = self._waiters.popleft()
+                try:
+                    # The slot is transferred, so the active count stays the same
+                    future.get_loop().call_soon_threadsafe(self._wake, future)
+                    return
+                except RuntimeError:
+                    # The waiter's event loop has already closed
+                    continue
+            self._active -= 1
+
+    async def acquire(self):
+        """Wait for a slot, raising HTTPException if the request is shed"""
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                self._stats["admitted"] += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                self._reject(503, "rejected_queue_full", f"Server busy ({self.name}), please retry")
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            self._stats["queued"] += 1
+
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+                self._reject(503, "rejected_queue_timeout", f"Server busy ({self.name}), please retry")
+        with self._lock:
+            self._stats["admitted"] += 1
+
+    def release(self):
+        """Give the slot back, waking the next queued request if there is one"""
+        self._release_slot()
+
+    def _client_key(self, request: HTTPConnection) -> str:
+        authorization = request.headers.get("authorization")
+        if authorization:
+            return authorization
+        return request.client.host if request.client else "unknown"
+
+    async def __call__(self, request: HTTPConnection):
+        if not self.applies_to_batch and getattr(request.state, "batch_sessions", None) is not None:
+            yield
+            return
+        async with self.hold(request):
+            yield
+
+    @asynccontextmanager
+    async def hold(self, connection: HTTPConnection) -> AsyncIterator[None]:
+        """
+        Hold a slot, and one of the client's shares, for the body of an `async with`;
+        for connections that outlive a request, such as WebSockets
+        """
+        client = None
+        if self.max_per_client is not None:
+            client = self._client_key(connection)
+            with self._lock:
+                if self._per_client.get(client, 0) >= self.max_per_client:
+                    self._reject(429, "rejected_client_limit", f"Too many concurrent {self.name} requests")
+                self._per_client[client] = self._per_client.get(client, 0) + 1
+
+        try:
+            await self.acquire()
+            try:
+                yield
+            finally:
+                self.release()
+        finally:
+            if client is not None:
+                with self._lock:
+                    remaining = self._per_client[client] - 1
+                    if remaining:
+                        self._per_client[client] = remaining
+                    else:
+                        del self._per_client[client]
+
+    def snapshot(self) -> Dict[str, int]:
+        """Current load and admission counters for this limiter"""
+        with self._lock:
+            return {
+                "active": self._active,
+                "queued_now": len(self._waiters),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                **self._stats
+            }
+
+
+class AdmissionRegistry:
+    """Keeps every limiter so their counters can be reported together"""
+
+    def __init__(self):
+        self._limiters: Dict[str, AdmissionLimiter] = {}
+
+    def register(self, limiter: AdmissionLimiter):
+        self._limiters[limiter.name] = limiter
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {name: limiter.snapshot() for name, limiter in self._limiters.items()}
+
+
+# Global instance
+admission_registry = AdmissionRegistry()
+metrics.register("admission", admission_registry.snapshot)
@@ -0,0 +1,271 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fastapi.encoders import jsonable_encoder
+from backend.utils.http_cache import data_versions
+from backend.utils.metrics import metrics
+from backend.utils.shared_state import KEY_PREFIX, STATE_URL_ENV, get_state_backend
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json
+import math
+import os
+import threading
+import time
+
+# memory:// (default) or redis://host:port/db
+CACHE_URL_ENV = "FINMATE_CACHE_URL"
+DEFAULT_MAX_BYTES = int(os.getenv("FINMATE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DEFAULT_TTL = 300
+
+_MISSING = object()
+
+
+def canonicalize(value: Any, digits: int = 9) -> Any:
+    """
+    Normalize a parameter structure so equivalent requests compare equal: floats are
+    rounded to `digits` decimal places (absorbing float noise such as
+    0.07000000000000001) and whole floats become ints, so 500 and 500.0 match.
+    """
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return value
+        rounded = round(value, digits)
+        return int(rounded) if rounded.is_integer() else rounded
+    if isinstance(value, dict):
+        return {str(key): canonicalize(item, digits) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item, digits) for item in value]
+    return value
+
+
+def canonical_key(value: Any, digits: int = 9) -> str:
+    """Cache key for a parameter structure, independent of dict order and float noise"""
+    return json.dumps(canonicalize(value, digits), sort_keys=True, separators=(",", ":"))
+
+
+class CacheBackend(ABC):
+    """Byte-oriented store behind the Cache facade"""
+
+    # Whether every worker process sees the same entries
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    def usage(self) -> dict:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL and a hard cap on stored bytes.
+    Values are stored serialized, so their exact size is known and callers
+    can never mutate a cached object.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_item_fraction: float = 0.125):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = int(max_bytes * max_item_fraction)
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value) + len(key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        size = len(value) + len(key)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_item_bytes:
+                self.rejected += 1
+                return
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._bytes += size
+            # Size-aware eviction: drop least recently used entries until back under the cap
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def usage(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "rejected_too_large": self.rejected
+            }
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by all workers; the memory cap is Redis' maxmemory with an LRU policy"""
+
+    shared = True
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(f"{CACHE_URL_ENV} points at Redis but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(KEY_PREFIX + "cache:" + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self._client.set(KEY_PREFIX + "cache:" + key, value, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key: str):
+        self._client.delete(KEY_PREFIX + "cache:" + key)
+
+    def usage(self) -> dict:
+        info = self._client.info("memory")
+        return {"bytes": info.get("used_memory"), "max_bytes": info.get("maxmemory")}
+
+
+def create_cache_backend(url: Optional[str] = None) -> CacheBackend:
+    """Create a cache backend from a URL: memory:// (default) or redis://..."""
+    url = url or os.getenv(CACHE_URL_ENV, "memory://")
+    if url.startswith("memory://"):
+        return MemoryCacheBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+class Cache:
+    """
+    Namespaced cache used by the services.
+
+    Every key lives in a namespace with a generation number, so a whole namespace
+    is invalidated in one call by bumping its generation; the orphaned entries age
+    out through LRU and TTL. A user's namespace is versioned by the same per-user
+    data version that drives the HTTP ETags, so one write invalidates both. Keys
+    also carry the state backend's epoch: if the counters are lost they restart
+    at 0, and entries written under the old counters must not match again.
+
+    Values are stored as JSON, so a shared cache never holds anything that runs
+    code when it is read back. Only JSON-shaped values (after FastAPI's
+    jsonable_encoder) round-trip; models come back as plain dicts.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # [hits, misses] per namespace family ("user" for every user namespace)
+        self._namespace_counts: Dict[str, List[int]] = {}
+
+    @property
+    def backend(self) -> CacheBackend:
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    backend = create_cache_backend()
+                    # Versions and generations live in the state backend; per-process
+                    # counters would let workers read each other's stale entries
+                    if backend.shared and not get_state_backend().shared:
+                        raise RuntimeError(
+                            f"{CACHE_URL_ENV} is shared between workers, so {STATE_URL_ENV} must be shared too"
+                        )
+                    self._backend = backend
+        return self._backend
+
+    def user_namespace(self, user_id: int) -> str:
+        """Namespace holding one user's derived data"""
+        return f"user:{user_id}:v{data_versions.get(user_id)}"
+
+    def invalidate_user(self, user_id: int):
+        """Invalidate everything cached for a user (and their ETags) after a write"""
+        data_versions.bump(user_id)
+
+    def invalidate_namespace(self, namespace: str):
+        """Invalidate every entry of a shared namespace"""
+        get_state_backend().incr(f"cache_generation:{namespace}")
+
+    def _full_key(self, namespace: str, key: str) -> str:
+        state = get_state_backend()
+        generation = state.get(f"cache_generation:{namespace}", 0)
+        return f"{state.epoch()}:{namespace}:g{generation}:{key}"
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        raw = self.backend.get(self._full_key(namespace, key))
+        with self._lock:
+            counts = self._namespace_counts.setdefault(namespace.split(":", 1)[0], [0, 0])
+            if raw is None:
+                self.misses += 1
+                counts[1] += 1
+            else:
+                self.hits += 1
+                counts[0] += 1
+        return default if raw is None else json.loads(raw)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = DEFAULT_TTL) -> bytes:
+        raw = json.dumps(jsonable_encoder(value), separators=(",", ":")).encode("utf-8")
+        self.backend.set(self._full_key(namespace, key), raw, ttl)
+        return raw
+
+    def get_or_compute(self, namespace: str, key: str, compute: Callable[[], Any],
+                       ttl: Optional[float] = DEFAULT_TTL) -> Any:
+        """Return the cached value, computing and storing it on a miss"""
+        value = self.get(namespace, key, _MISSING)
+        if value is _MISSING:
+            # Hand back what a hit would return, so callers see one shape either way
+            value = json.loads(self.set(namespace, key, compute(), ttl))
+        return value
+
+    def stats(self) -> dict:
+        """Hit/miss counters plus the backend's size and eviction figures"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            counters = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "namespaces": {
+                    name: {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 4)}
+                    for name, (hits, misses) in self._namespace_counts.items()
+                }
+            }
+        return {**counters, **self.backend.usage()}
+
+
+# Global instance
+cache = Cache()
+metrics.register("cache", cache.stats)
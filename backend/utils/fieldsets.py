@@ -0,0 +1,33 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """
+    Parse a comma-separated `fields=` parameter into an ordered list of columns.
+    Returns all allowed fields when the parameter is omitted.
+    """
+    if fields is None:
+        return list(allowed)
+
+    requested = []
+    for field in fields.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        if field not in allowed:
+            raise ValueError(f"Unknown field '{field}'. Allowed fields: {', '.join(allowed)}")
+        if field not in requested:
+            requested.append(field)
+
+    if not requested:
+        raise ValueError("At least one field must be requested")
+    return requested
+
+
+def serialize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Core result mapping into a JSON-ready dict"""
+    return {
+        key: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for key, value in row.items()
+    }
@@ -0,0 +1,126 @@
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from backend.utils.shared_state import StateBackend, get_state_backend
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import threading
+
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(payload: Any) -> str:
+    """Compute a strong ETag for a JSON-serialisable payload"""
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the given ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Build an empty 304 response carrying the validator headers"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+class DataVersionRegistry:
+    """
+    Per-user data version counters, bumped whenever a user's data is written.
+    Kept in the shared state backend so every worker sees the same versions.
+    """
+
+    def __init__(self, backend: Optional[StateBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> StateBackend:
+        return self._backend or get_state_backend()
+
+    def epoch(self) -> str:
+        """Changes when the counters are lost, so versions from before never validate"""
+        return self.backend.epoch()
+
+    def get(self, user_id: int) -> int:
+        """Get the current data version for a user"""
+        return int(self.backend.get(f"data_version:{user_id}", 0))
+
+    def bump(self, user_id: int) -> int:
+        """Increment a user's data version and return the new value"""
+        return self.backend.incr(f"data_version:{user_id}")
+
+
+class StaticResource:
+    """Constant JSON payload whose body and ETag are computed once on first use"""
+
+    def __init__(self, build: Callable[[], Any], cache_control: str = STATIC_CACHE_CONTROL):
+        self._build = build
+        self._cache_control = cache_control
+        self._content: Optional[Any] = None
+        self._etag: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _ensure_built(self):
+        if self._etag is None:
+            with self._lock:
+                if self._etag is None:
+                    content = jsonable_encoder(self._build())
+                    self._content = content
+                    self._etag = compute_etag(content)
+
+    def invalidate(self):
+        """Drop the precomputed payload so it is rebuilt on the next request"""
+        with self._lock:
+            self._content = None
+            self._etag = None
+
+    def respond(self, request: Request) -> Response:
+        """Serve the payload, or 304 if the client already has this version"""
+        self._ensure_built()
+        if etag_matches(request, self._etag):
+            return not_modified(self._etag, self._cache_control)
+        return JSONResponse(
+            self._content,
+            headers={"ETag": self._etag, "Cache-Control": self._cache_control}
+        )
+
+
+def user_resource_response(request: Request, user_id: int, resource: str,
+                           params: Dict[str, Any], build: Callable[[], Any],
+                           version: Optional[int] = None) -> Response:
+    """
+    Serve a per-user resource with an ETag derived from the user's data version.
+    The build callable only runs when the client's copy is stale. Pass `version`
+    when the caller has already read the data version and keyed work on it.
+    """
+    etag = compute_etag({
+        "epoch": data_versions.epoch(),
+        "resource": resource,
+        "user": user_id,
+        "version": data_versions.get(user_id) if version is None else version,
+        "params": params
+    })
+    if etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_CACHE_CONTROL)
+    return JSONResponse(
+        jsonable_encoder(build()),
+        headers={"ETag": etag, "Cache-Control": PRIVATE_CACHE_CONTROL}
+    )
+
+
+# Global instance
+data_versions = DataVersionRegistry()
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from backend.utils.metrics import metrics
+from backend.utils.shared_state import StateBackend, get_state_backend
+from typing import Any, Callable, Hashable, Optional
+import hashlib
+import json
+import threading
+import time
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyStore:
+    """
+    Remembers the responses of write requests sent with an Idempotency-Key header.
+
+    A retry with the same key gets the stored response without running the write
+    again. A duplicate that arrives while the first request is still running waits
+    for it. Keys are claimed and responses stored on the shared state backend, so
+    this holds across worker processes. A claim lapses after `claim_ttl` seconds,
+    so a worker that dies mid-request doesn't block the key; completed entries
+    expire after `ttl` seconds, and each worker drops its least recently stored
+    ones beyond `max_entries`. Failed requests are not stored, so they can be retried.
+    """
+
+    POLL_INTERVAL = 0.01
+    MAX_POLL_INTERVAL = 0.1
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 24 * 3600, wait_timeout: float = 10.0,
+                 claim_ttl: float = 60.0, state: Optional[StateBackend] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.claim_ttl = claim_ttl
+        self._state_backend = state
+        # Keys this worker stored responses under, least recently stored first
+        self._stored: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"executed": 0, "replayed": 0, "waited": 0, "conflicts": 0, "evicted": 0}
+
+    @property
+    def _state(self) -> StateBackend:
+        return self._state_backend or get_state_backend()
+
+    @staticmethod
+    def _store_key(scope: Hashable, key: str) -> str:
+        scoped = json.dumps([jsonable_encoder(scope), key], sort_keys=True)
+        return "idempotency:" + hashlib.sha256(scoped.encode("utf-8")).hexdigest()
+
+    def _remember(self, store_key: str):
+        """Track a stored response, evicting this worker's oldest ones over the cap"""
+        with self._lock:
+            self._stored[store_key] = None
+            self._stored.move_to_end(store_key)
+            evicted = []
+            while len(self._stored) > self.max_entries:
+                evicted.append(self._stored.popitem(last=False)[0])
+            self._stats["evicted"] += len(evicted)
+        for old_key in evicted:
+            self._state.delete(old_key)
+
+    def _wait(self, store_key: str):
+        """Wait until the request holding the key completes or releases it"""
+        with self._lock:
+            self._stats["waited"] += 1
+        deadline = time.monotonic() + self.wait_timeout
+        interval = self.POLL_INTERVAL
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+            entry = self._state.get(store_key)
+            if entry is None or entry["completed"]:
+                return
+        with self._lock:
+            self._stats["conflicts"] += 1
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed",
+            headers={"Retry-After": "1"}
+        )
+
+    def run(self, key: Optional[str], scope: Hashable, request_body: Any,
+            fn: Callable[[], Any], response: Optional[Response] = None) -> Any:
+        """Run a write once per (scope, key); without a key, just run it"""
+        if key is None:
+            return fn()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+        fingerprint = hashlib.sha256(
+            json.dumps(jsonable_encoder(request_body), sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        store_key = self._store_key(scope, key)
+
+        while True:
+            if self._state.add(store_key, {"fingerprint": fingerprint, "completed": False}, ttl=self.claim_ttl):
+                with self._lock:
+                    self._stats["executed"] += 1
+                try:
+                    result = jsonable_encoder(fn())
+                except BaseException:
+                    self._state.delete(store_key)
+                    raise
+                self._state.set(store_key, {"fingerprint": fingerprint, "completed": True, "result": result}, ttl=self.ttl)
+                self._remember(store_key)
+                return result
+
+            entry = self._state.get(store_key)
+            if entry is None:
+                # Released or expired between the claim and the read
+                continue
+            if entry["fingerprint"] != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            if not entry["completed"]:
+                # Then replay its response, or claim the key if it failed
+                self._wait(store_key)
+                continue
+            with self._lock:
+                self._stats["replayed"] += 1
+            if response is not None:
+                response.headers[REPLAY_HEADER] = "true"
+            return entry["result"]
+
+    def snapshot(self) -> dict:
+        """Entries stored by this worker and replay counters"""
+        with self._lock:
+            return {"entries": len(self._stored), **self._stats}
+
+
+# Global instance
+idempotency_store = IdempotencyStore()
+metrics.register("idempotency", idempotency_store.snapshot)
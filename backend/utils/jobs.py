@@ -0,0 +1,332 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from backend.utils.metrics import metrics
+from backend.utils.shared_state import StateBackend, get_state_backend
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobPlan:
+    """
+    How to run a job: independent tasks for the process pool, then an optional
+    combine step that runs in this process on the task results (in task order).
+    Task functions and arguments must be picklable.
+    """
+
+    def __init__(self, tasks: List[Tuple[Callable, tuple]], combine: Optional[Callable[[List[Any]], Any]] = None):
+        if not tasks:
+            raise ValueError("A job needs at least one task")
+        self.tasks = tasks
+        self.combine = combine or (lambda results: results[0] if len(results) == 1 else results)
+
+
+class Job:
+    def __init__(self, user_id: int, kind: str, plan: JobPlan):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.kind = kind
+        self.plan = plan
+        self.status = QUEUED
+        self.tasks_done = 0
+        self.results: List[Any] = [None] * len(plan.tasks)
+        self.futures: List[Future] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.expires: Optional[float] = None
+        # Serialises writes of this job's record to the state backend
+        self.publish_lock = threading.Lock()
+
+    @property
+    def progress(self) -> float:
+        if self.status == SUCCEEDED:
+            return 1.0
+        return round(self.tasks_done / len(self.plan.tasks), 4)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "created_at": self.created,
+            "started_at": self.started,
+            "finished_at": self.finished,
+            "error": self.error
+        }
+
+    def record(self) -> Dict[str, Any]:
+        """What other workers see: the description, the owner and, once succeeded, the result"""
+        return {**self.describe(), "user_id": self.user_id, "result": self.result}
+
+
+class JobRecord:
+    """A job as published on the state backend, read by whichever worker serves the request"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+
+    @property
+    def id(self) -> str:
+        return self._data["job_id"]
+
+    @property
+    def user_id(self) -> int:
+        return self._data["user_id"]
+
+    @property
+    def status(self) -> str:
+        return self._data["status"]
+
+    @property
+    def progress(self) -> float:
+        return self._data["progress"]
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._data["error"]
+
+    @property
+    def result(self) -> Any:
+        return self._data["result"]
+
+    def describe(self) -> Dict[str, Any]:
+        return {name: value for name, value in self._data.items() if name not in ("user_id", "result")}
+
+
+def _record_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _cancel_key(job_id: str) -> str:
+    return f"job_cancel:{job_id}"
+
+
+class JobManager:
+    """
+    In-process background jobs for heavy simulations and reports.
+
+    Jobs are planned when submitted, so bad specs fail fast, and their tasks run on
+    a bounded process pool, off the HTTP workers. Progress is the share of
+    finished tasks. Cancelling drops tasks that haven't started and discards the
+    rest. Finished jobs are kept for `result_ttl` seconds.
+
+    A job runs in the worker that accepted it, which publishes its status and
+    result to the shared state backend; status, result and cancel requests are
+    served from there by any worker. A cancel handled by another worker takes
+    effect in the owner when its next task finishes. The limits (`max_per_user`
+    unfinished jobs per user, `max_active` in all) apply per worker.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_per_user: int = 2,
+                 max_active: int = 32, result_ttl: float = 3600, state: Optional[StateBackend] = None):
+        self.max_workers = max_workers or int(os.getenv("FINMATE_JOB_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.max_per_user = max_per_user
+        self.max_active = max_active
+        self.result_ttl = result_ttl
+        self._state_backend = state
+        self._kinds: Dict[str, Callable[[Dict[str, Any]], JobPlan]] = {}
+        # Jobs running in this process
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Combine steps run here so they never block the pool's result thread
+        self._finisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-finisher")
+        self._stats = {"submitted": 0, "succeeded": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+
+    def register_kind(self, kind: str, planner: Callable[[Dict[str, Any]], JobPlan]):
+        """Register a job kind; the planner validates a spec (raising ValueError) and returns its plan"""
+        self._kinds[kind] = planner
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._kinds)
+
+    @property
+    def _state(self) -> StateBackend:
+        return self._state_backend or get_state_backend()
+
+    def _publish(self, job: Job):
+        """Write a job's record to the state backend, first honouring a cancel made by another worker"""
+        with job.publish_lock:
+            if job.status not in FINISHED_STATES and self._state.get(_cancel_key(job.id)):
+                self._cancel_local(job)
+            self._state.set(_record_key(job.id), jsonable_encoder(job.record()), ttl=self.result_ttl)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _prune(self, now: float):
+        expired = [job_id for job_id, job in self._jobs.items() if job.expires is not None and job.expires <= now]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, user_id: int, kind: str, spec: Dict[str, Any]) -> Job:
+        planner = self._kinds.get(kind)
+        if planner is None:
+            raise HTTPException(status_code=400, detail=f"Unknown job kind '{kind}', expected one of {', '.join(self.kinds)}")
+        try:
+            plan = planner(spec)
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        with self._lock:
+            self._prune(time.time())
+            active = [job for job in self._jobs.values() if job.status not in FINISHED_STATES]
+            if sum(1 for job in active if job.user_id == user_id) >= self.max_per_user:
+                self._stats["rejected"] += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"At most {self.max_per_user} jobs may run at once per user",
+                    headers={"Retry-After": "5"}
+                )
+            if len(active) >= self.max_active:
+                self._stats["rejected"] += 1
+                raise HTTPException(status_code=503, detail="Job queue is full, please retry", headers={"Retry-After": "5"})
+            job = Job(user_id, kind, plan)
+            self._jobs[job.id] = job
+            self._stats["submitted"] += 1
+            pool = self._get_pool()
+        self._publish(job)
+
+        # Outside the lock: a task that is already done runs its callback right away
+        try:
+            for index, (fn, args) in enumerate(plan.tasks):
+                future = pool.submit(fn, *args)
+                job.futures.append(future)
+                future.add_done_callback(lambda f, index=index: self._task_done(job, index, f))
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+                if job.status not in FINISHED_STATES:
+                    self._finish(job, FAILED, error="Worker pool failed, please retry")
+            self._publish(job)
+        return job
+
+    def _task_done(self, job: Job, index: int, future: Future):
+        if future.cancelled():
+            return
+        with self._lock:
+            if job.status in FINISHED_STATES:
+                return
+            complete = False
+            error = future.exception()
+            if error is not None:
+                self._finish(job, FAILED, error=f"{type(error).__name__}: {error}")
+                if isinstance(error, BrokenProcessPool):
+                    # Start a fresh pool for the next job
+                    self._pool = None
+            else:
+                if job.status == QUEUED:
+                    job.status = RUNNING
+                    job.started = time.time()
+                job.results[index] = future.result()
+                job.tasks_done += 1
+                complete = job.tasks_done == len(job.plan.tasks)
+        self._publish(job)
+        if complete and job.status not in FINISHED_STATES:
+            self._finisher.submit(self._combine, job)
+
+    def _combine(self, job: Job):
+        try:
+            result = job.plan.combine(job.results)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed while combining results", job.id, job.kind)
+            with self._lock:
+                if job.status not in FINISHED_STATES:
+                    self._finish(job, FAILED, error=f"{type(e).__name__}: {e}")
+            self._publish(job)
+            return
+        with self._lock:
+            if job.status not in FINISHED_STATES:
+                job.result = result
+                self._finish(job, SUCCEEDED)
+        self._publish(job)
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        """Mark a job finished; caller holds the lock"""
+        job.status = status
+        job.error = error
+        job.finished = time.time()
+        job.expires = job.finished + self.result_ttl
+        job.results = []
+        self._stats[status] += 1
+
+    def _cancel_local(self, job: Job):
+        with self._lock:
+            if job.status in FINISHED_STATES:
+                return
+            self._finish(job, CANCELLED)
+        for future in job.futures:
+            future.cancel()
+
+    def get(self, job_id: str, user_id: int) -> JobRecord:
+        """A user's job, from any worker; other users' jobs are reported as missing"""
+        with self._lock:
+            self._prune(time.time())
+            job = self._jobs.get(job_id)
+            started = job is not None and job.status == QUEUED and any(future.running() for future in job.futures)
+            if started:
+                job.status = RUNNING
+                job.started = time.time()
+        if started:
+            self._publish(job)
+        data = self._state.get(_record_key(job_id))
+        if data is None or data["user_id"] != user_id:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return JobRecord(data)
+
+    def cancel(self, job_id: str, user_id: int) -> JobRecord:
+        record = self.get(job_id, user_id)
+        if record.status in FINISHED_STATES:
+            return record
+        self._state.set(_cancel_key(job_id), True, ttl=self.result_ttl)
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            # Another worker runs it: record the cancel now, the owner stops at its next task
+            data = {**record.describe(), "user_id": user_id, "result": None,
+                    "status": CANCELLED, "finished_at": time.time()}
+            self._state.set(_record_key(job_id), data, ttl=self.result_ttl)
+            return JobRecord(data)
+        self._publish(job)
+        return self.get(job_id, user_id)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Job counts by status plus lifetime counters"""
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {"jobs": by_status, "max_workers": self.max_workers, **self._stats}
+
+
+# Global instance
+job_manager = JobManager()
+metrics.register("jobs", job_manager.snapshot)
@@ -0,0 +1,202 @@
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from backend.utils.metrics import metrics
+from typing import Optional
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+
+# Request ID of the request being handled, attached to every log record
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+ACCESS_LOGGER = "finmate.access"
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request ID before they leave the request thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of INFO-and-below records from high-volume loggers"""
+
+    def __init__(self, rate: float, loggers=(ACCESS_LOGGER,)):
+        super().__init__()
+        self.rate = rate
+        self.loggers = tuple(loggers)
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not record.name.startswith(self.loggers):
+            return True
+        if self.rate >= 1 or random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the background writer; drops them rather than wait when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _LoggingState:
+    listener: Optional[QueueListener] = None
+    handler: Optional[NonBlockingQueueHandler] = None
+    sampler: Optional[SamplingFilter] = None
+
+
+def setup_logging(level: Optional[str] = None, queue_size: Optional[int] = None,
+                  access_sample_rate: Optional[float] = None, log_file: Optional[str] = None):
+    """
+    Route all logging through a bounded queue drained by a background thread that
+    writes JSON lines, so request threads never wait on I/O. Safe to call again;
+    later calls are ignored.
+    """
+    if _LoggingState.listener is not None:
+        return
+
+    level = level or os.getenv("FINMATE_LOG_LEVEL", "INFO")
+    queue_size = queue_size or int(os.getenv("FINMATE_LOG_QUEUE_SIZE", "10000"))
+    if access_sample_rate is None:
+        access_sample_rate = float(os.getenv("FINMATE_ACCESS_LOG_SAMPLE_RATE", "1.0"))
+    log_file = log_file or os.getenv("FINMATE_LOG_FILE")
+
+    writer = logging.FileHandler(log_file) if log_file else logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    sampler = SamplingFilter(access_sample_rate)
+    handler.addFilter(sampler)
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, writer, respect_handler_level=True)
+    listener.start()
+    atexit.register(shutdown_logging)
+
+    _LoggingState.listener = listener
+    _LoggingState.handler = handler
+    _LoggingState.sampler = sampler
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer"""
+    listener = _LoggingState.listener
+    if listener is not None:
+        _LoggingState.listener = None
+        listener.stop()
+
+
+def logging_stats() -> dict:
+    """Queue depth plus dropped and sampled-out record counts"""
+    handler, sampler = _LoggingState.handler, _LoggingState.sampler
+    if handler is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "queued": handler.queue.qsize(),
+        "dropped": handler.dropped,
+        "sampled_out": sampler.sampled_out if sampler else 0
+    }
+
+
+metrics.register("logging", logging_stats)
+
+
+class RequestLoggingMiddleware:
+    """
+    ASGI middleware that assigns each request an ID (or keeps the caller's X-Request-ID),
+    times it, returns X-Request-ID and Server-Timing headers, and writes one access log line.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger(ACCESS_LOGGER)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_headers(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                duration_ms = (time.perf_counter() - start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                headers.append((b"server-timing", f"app;dur={duration_ms:.1f}".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.logger.info(
+                "%s %s %s", scope["method"], scope["path"], status,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(duration_ms, 2)
+                }
+            )
+            request_id_var.reset(token)
@@ -0,0 +1,29 @@
+from typing import Any, Callable, Dict
+import os
+import threading
+
+
+class MetricsRegistry:
+    """Collects named metric snapshots from the subsystems that register a collector"""
+
+    def __init__(self):
+        self._collectors: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, collect: Callable[[], Any]):
+        """Register (or replace) the collector reported under the given name"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def collect(self) -> Dict[str, Any]:
+        """Snapshot every registered collector; metrics are per worker process"""
+        with self._lock:
+            collectors = dict(self._collectors)
+        snapshot = {"pid": os.getpid()}
+        for name, collect in sorted(collectors.items()):
+            snapshot[name] = collect()
+        return snapshot
+
+
+# Global instance
+metrics = MetricsRegistry()
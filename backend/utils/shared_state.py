@@ -0,0 +1,178 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+import json
+import os
+import threading
+import time
+import uuid
+
+# Where state that must agree across worker processes lives, e.g. redis://localhost:6379/0
+STATE_URL_ENV = "FINMATE_STATE_URL"
+KEY_PREFIX = "finmate:"
+
+
+class StateBackend(ABC):
+    """
+    Key-value store for state shared by all request handlers: caches, counters, rate limits.
+    Values must be JSON-serialisable so every backend behaves the same.
+    """
+
+    # Whether every worker process sees the same state
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set the key only if it does not exist; returns True if it was set"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1) -> int:
+        ...
+
+    @abstractmethod
+    def epoch(self) -> str:
+        """Identifier that changes whenever the stored state is lost (restart, flush)"""
+
+
+class MemoryStateBackend(StateBackend):
+    """Per-process state; the default, and correct for a single worker"""
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._epoch = uuid.uuid4().hex
+        self._next_sweep = time.monotonic() + self.SWEEP_INTERVAL
+
+    def _live(self, key: str, now: float) -> bool:
+        entry = self._data.get(key)
+        if entry is None:
+            return False
+        if entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return False
+        return True
+
+    def _sweep(self, now: float):
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.SWEEP_INTERVAL
+        expired = [k for k, (_, expires) in self._data.items() if expires is not None and expires <= now]
+        for key in expired:
+            del self._data[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if not self._live(key, time.monotonic()):
+                return default
+            return self._data[key][0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            self._data[key] = (value, now + ttl if ttl else None)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._live(key, now):
+                return False
+            self._sweep(now)
+            self._data[key] = (value, now + ttl if ttl else None)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._live(key, now):
+                value, expires = self._data[key]
+            else:
+                value, expires = 0, None
+            value = int(value) + amount
+            self._data[key] = (value, expires)
+            return value
+
+    def epoch(self) -> str:
+        return self._epoch
+
+
+class RedisStateBackend(StateBackend):
+    """State shared by every worker through a Redis-compatible server (Redis, Valkey, KeyDB)"""
+
+    shared = True
+
+    EPOCH_RECHECK_INTERVAL = 5
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(f"{STATE_URL_ENV} points at Redis but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(url)
+        self._epoch: Optional[str] = None
+        self._epoch_checked = 0.0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self._client.get(KEY_PREFIX + key)
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._client.set(KEY_PREFIX + key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(self._client.set(KEY_PREFIX + key, json.dumps(value), px=int(ttl * 1000) if ttl else None, nx=True))
+
+    def delete(self, key: str):
+        self._client.delete(KEY_PREFIX + key)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        return int(self._client.incrby(KEY_PREFIX + key, amount))
+
+    def epoch(self) -> str:
+        now = time.monotonic()
+        if self._epoch is None or now - self._epoch_checked > self.EPOCH_RECHECK_INTERVAL:
+            self.add("epoch", uuid.uuid4().hex)
+            self._epoch = self.get("epoch")
+            self._epoch_checked = now
+        return self._epoch
+
+
+def create_state_backend(url: Optional[str] = None) -> StateBackend:
+    """Create a state backend from a URL: memory:// (default) or redis://..."""
+    url = url or os.getenv(STATE_URL_ENV, "memory://")
+    if url.startswith("memory://"):
+        return MemoryStateBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStateBackend(url)
+    raise ValueError(f"Unsupported state backend URL: {url}")
+
+
+_state_backend: Optional[StateBackend] = None
+_state_backend_lock = threading.Lock()
+
+
+def get_state_backend() -> StateBackend:
+    """Get the process-wide state backend, creating it on first use"""
+    global _state_backend
+    if _state_backend is None:
+        with _state_backend_lock:
+            if _state_backend is None:
+                _state_backend = create_state_backend()
+    return _state_backend
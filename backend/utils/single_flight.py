@@ -0,0 +1,84 @@
+from fastapi.encoders import jsonable_encoder
+from backend.utils.metrics import metrics
+from typing import Any, Callable, Dict, Hashable, Optional
+import json
+import threading
+
+
+def flight_key(user_id: Optional[int], endpoint: str, params: Dict[str, Any]) -> str:
+    """Normalize (user, endpoint, params) so equivalent requests share one key"""
+    return json.dumps(
+        {"user": user_id, "endpoint": endpoint, "params": jsonable_encoder(params)},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical computations: the first caller for a key runs
+    the function, and callers arriving while it is in flight wait for its result.
+    Nothing is kept once the computation finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executed = 0
+        self._coalesced = 0
+        single_flight_registry[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for this key, or wait for the identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def snapshot(self) -> Dict[str, int]:
+        """Executed vs coalesced call counts for this group"""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls)
+            }
+
+
+single_flight_registry: Dict[str, SingleFlight] = {}
+metrics.register("single_flight", lambda: {
+    name: group.snapshot() for name, group in single_flight_registry.items()
+})
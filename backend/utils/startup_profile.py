@@ -0,0 +1,81 @@
+"""
+Startup profiler for the backend.
+
+Imports a module in a fresh interpreter with `-X importtime` and reports how long
+each module took, so slow imports show up before they reach production workers.
+
+Usage:
+    python -m backend.utils.startup_profile [module] [--top N]
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Wall-clock budget for `import backend.main` in a fresh interpreter, checked in tests
+COLD_START_BUDGET_SECONDS = float(os.getenv("FINMATE_COLD_START_BUDGET", "3.0"))
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, float]]:
+    """Parse `-X importtime` output into per-module timings in milliseconds"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+    return modules
+
+
+def profile_imports(module: str = "backend.main", cwd: Optional[str] = None) -> Dict[str, object]:
+    """
+    Import a module in a fresh interpreter and report per-module import times.
+    The total is the cumulative time of the requested module itself.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd or str(PROJECT_ROOT),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = _parse_importtime(result.stderr)
+    target = next((m for m in reversed(modules) if m["module"] == module), None)
+    total_ms = target["cumulative_ms"] if target else sum(m["self_ms"] for m in modules)
+    return {
+        "module": module,
+        "total_seconds": round(total_ms / 1000, 4),
+        "budget_seconds": COLD_START_BUDGET_SECONDS,
+        "modules": sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-module import times")
+    parser.add_argument("module", nargs="?", default="backend.main")
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to list")
+    args = parser.parse_args()
+
+    report = profile_imports(args.module)
+    print(f"{report['module']}: {report['total_seconds']:.3f}s (budget {report['budget_seconds']:.1f}s)")
+    print(f"{'cumulative ms':>14} {'self ms':>10}  module")
+    for entry in report["modules"][:args.top]:
+        print(f"{entry['cumulative_ms']:>14.1f} {entry['self_ms']:>10.1f}  {entry['module']}")
+
+
+if __name__ == "__main__":
+    main()
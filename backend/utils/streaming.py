@@ -0,0 +1,96 @@
+"""
+Helpers for streaming responses chunk by chunk over SSE and WebSocket.
+
+Chunks come from an ordinary (blocking) iterator, which is advanced on the thread
+pool so a slow generator never stalls the event loop. The next chunk is produced
+while the current one is being sent, but never more than one ahead, so a slow
+client slows the producer down instead of piling chunks up in memory. While
+waiting for a chunk, a heartbeat is emitted every FINMATE_STREAM_HEARTBEAT seconds
+(default 15) so proxies and clients don't time out idle streams.
+"""
+from starlette.concurrency import run_in_threadpool
+from backend.utils.metrics import metrics
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+import asyncio
+import json
+import os
+import threading
+
+HEARTBEAT_INTERVAL = float(os.getenv("FINMATE_STREAM_HEARTBEAT", "15"))
+
+# Yielded by stream_chunks when no chunk arrived within the heartbeat interval
+HEARTBEAT = object()
+
+_DONE = object()
+
+
+class StreamStats:
+    """Counters for streamed responses, reported under metrics["streaming"]"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"active": 0, "started": 0, "completed": 0, "aborted": 0, "chunks": 0, "heartbeats": 0}
+
+    def add(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+stream_stats = StreamStats()
+metrics.register("streaming", stream_stats.snapshot)
+
+
+async def stream_chunks(chunks: Iterable[Any],
+                        heartbeat_interval: Optional[float] = None) -> AsyncIterator[Any]:
+    """
+    Yield the items of a blocking iterable, or HEARTBEAT while waiting longer than
+    `heartbeat_interval` (default HEARTBEAT_INTERVAL) seconds for the next one.
+    The next item is produced while the current one is being sent, but never more
+    than one ahead.
+    """
+    heartbeat_interval = heartbeat_interval or HEARTBEAT_INTERVAL
+    iterator = iter(chunks)
+    pending = asyncio.ensure_future(run_in_threadpool(next, iterator, _DONE))
+    stream_stats.add("active")
+    stream_stats.add("started")
+    completed = False
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=heartbeat_interval)
+            if not done:
+                stream_stats.add("heartbeats")
+                yield HEARTBEAT
+                continue
+            chunk = pending.result()
+            if chunk is _DONE:
+                completed = True
+                return
+            pending = asyncio.ensure_future(run_in_threadpool(next, iterator, _DONE))
+            stream_stats.add("chunks")
+            yield chunk
+    finally:
+        # The client went away (or the producer failed). Stop waiting for the next
+        # chunk; a producer thread already running finishes that one chunk and
+        # stops there, since nothing advances the iterator again
+        pending.cancel()
+        stream_stats.add("active", -1)
+        stream_stats.add("completed" if completed else "aborted")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """One server-sent event; the data is JSON so newlines inside it are escaped"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# An SSE comment line; clients ignore it but it keeps the connection alive
+SSE_HEARTBEAT = ": ping\n\n"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop reverse proxies (nginx) from buffering the stream
+    "X-Accel-Buffering": "no",
+}
@@ -0,0 +1,4 @@
+@echo off
+echo Starting FinMate backend with multiple workers...
+python -m backend.serve --workers 4 --port 8000
+pause
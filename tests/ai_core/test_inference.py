@@ -0,0 +1,123 @@
+import threading
+import time
+import pytest
+from ai_core import llm_pipeline
+from ai_core.inference import (
+    CircuitBreaker, InferenceBackend, InferenceScheduler, InferenceTimeout, InferenceUnavailable, StubBackend,
+    create_backend
+)
+
+class ScriptedBackend(InferenceBackend):
+    """Emits 'Model advice.' then waits for `release`, then finishes or fails"""
+
+    name = "scripted"
+
+    def __init__(self, fail=False):
+        self.release = threading.Event()
+        self.fail = fail
+
+    def generate_batch(self, prompts):
+        return self.generate_batch_stream(prompts, lambda index, text: None)
+
+    def generate_batch_stream(self, prompts, emit):
+        emit(0, "Model advice.")
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("model crashed")
+        emit(0, " More.")
+        return ["Model advice. More."]
+
+def test_backends_must_implement_generate_batch():
+    class Incomplete(InferenceBackend):
+        pass
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_stub_backend_is_deterministic():
+    backend = StubBackend()
+    assert backend.generate_batch(["a", "b"]) == backend.generate_batch(["a", "b"])
+    assert backend.generate_batch(["a"]) != backend.generate_batch(["b"])
+    with pytest.raises(RuntimeError):
+        create_backend("llama_cpp")
+
+def test_concurrent_prompts_are_micro_batched():
+    backend = StubBackend(respond=str.upper, latency=0.05)
+    scheduler = InferenceScheduler(backend, max_batch_size=4, max_wait=0.02)
+    results = {}
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, scheduler.generate(f"q{i}"))) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {i: f"Q{i}" for i in range(10)}
+    assert max(backend.batch_sizes) <= 4 and len(backend.batch_sizes) < 10
+    assert scheduler.stats()["batched_prompts"] == 10
+    scheduler.close()
+
+def test_slow_backend_times_out_and_errors_propagate():
+    scheduler = InferenceScheduler(StubBackend(latency=0.3), timeout=0.05)
+    with pytest.raises(InferenceTimeout):
+        scheduler.generate("slow")
+    assert scheduler.stats()["timeouts"] == 1
+
+    def broken(prompt):
+        raise ValueError("model crashed")
+    broken_scheduler = InferenceScheduler(StubBackend(respond=broken))
+    with pytest.raises(ValueError):
+        broken_scheduler.generate("anything")
+    scheduler.close()
+    broken_scheduler.close()
+
+def test_pipeline_renders_the_prompt_template_and_falls_back_on_timeout():
+    prompts = []
+    backend = StubBackend(respond=lambda prompt: prompts.append(prompt) or "Model advice.\nSecond line.")
+    try:
+        llm_pipeline.set_backend(backend)
+        assert llm_pipeline.generate_ai_response("How do I budget?") == "Model advice.\nSecond line."
+        assert prompts == [llm_pipeline.build_prompt("How do I budget?")]
+        assert 'A user asked: "How do I budget?"' in prompts[0]
+
+        llm_pipeline.set_backend(StubBackend(latency=10)).timeout = 0.05
+        assert llm_pipeline.generate_ai_response("How do I budget?") == llm_pipeline.template_answer("How do I budget?")
+    finally:
+        llm_pipeline.set_backend(create_backend(respond=llm_pipeline._answer_prompt))
+
+def test_streamed_pieces_arrive_before_the_completion_finishes():
+    backend = ScriptedBackend()
+    scheduler = InferenceScheduler(backend, timeout=2)
+    pieces = scheduler.stream("q")
+    assert next(pieces) == "Model advice."
+    backend.release.set()
+    assert list(pieces) == [" More."]
+    scheduler.close()
+
+def test_failure_partway_through_a_stream_falls_back_uncached():
+    backend = ScriptedBackend(fail=True)
+    try:
+        llm_pipeline.set_backend(backend)
+        answer = llm_pipeline.stream_ai_response("How do I budget?")
+        assert next(answer) == "Model advice."
+        backend.release.set()
+        rest = "".join(answer)
+        assert answer.fell_back
+        assert rest == "\n\n" + llm_pipeline.template_answer("How do I budget?")
+    finally:
+        llm_pipeline.set_backend(create_backend(respond=llm_pipeline._answer_prompt))
+
+def test_circuit_opens_after_repeated_failures_then_probes():
+    def broken(prompt):
+        raise ValueError("model crashed")
+    backend = StubBackend(respond=broken)
+    scheduler = InferenceScheduler(backend, breaker=CircuitBreaker(failure_threshold=2, cooldown=0.1))
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            scheduler.generate("q")
+    with pytest.raises(InferenceUnavailable):
+        scheduler.generate("q")
+    assert scheduler.stats()["circuit"] == "open" and scheduler.stats()["rejected"] == 1
+
+    time.sleep(0.15)
+    backend.respond = str.upper
+    assert scheduler.generate("q") == "Q"
+    assert scheduler.stats()["circuit"] == "closed"
+    scheduler.close()
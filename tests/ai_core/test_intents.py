@@ -0,0 +1,35 @@
+from ai_core.intents import IntentClassifier, benchmark, intent_classifier
+from ai_core.llm_pipeline import INTENT_RESPONSES, generate_ai_response
+from backend.services.ai_service import get_ai_response
+
+def test_messages_get_every_intent_they_mention():
+    assert [intent for intent, _ in intent_classifier.classify("Budget for retirement")] == ["budget", "retirement"]
+    assert intent_classifier.classify("How do I pay   off my credit card?") == [("debt", 2.7)]
+    assert intent_classifier.classify("Should I open a Roth IRA or a 401(k)?")[0][0] == "retirement"
+    assert intent_classifier.classify("hello there") == []
+
+def test_matches_whole_words_only():
+    assert intent_classifier.classify("a pirate's irate parrot") == []
+    assert intent_classifier.classify("savings") == [("savings", 1.0)]
+
+def test_batch_matches_single_classification():
+    messages = ["budget for retirement", "hi", "emergency\nfund", "", "Budget for retirement", "stocks vs bonds"]
+    assert intent_classifier.classify_batch(messages) == [intent_classifier.classify(text) for text in messages]
+    assert intent_classifier.classify_batch([]) == []
+
+def test_custom_keywords_and_top_intents():
+    classifier = IntentClassifier({"tax": {"tax": 1.0, "capital gains": 2.0}, "housing": {"mortgage": 1.0, "rent": 0.4}})
+    assert classifier.classify("Capital  gains tax on my rent") == [("tax", 3.0), ("housing", 0.4)]
+    assert classifier.top_intents("Capital gains tax on my rent") == ["tax"]
+
+def test_responses_cover_every_matched_topic():
+    response = generate_ai_response("How should I budget for retirement?")
+    assert INTENT_RESPONSES["budget"] in response and INTENT_RESPONSES["retirement"] in response
+    assert "50/30/20" in get_ai_response("budget for retirement") and "401(k)" in get_ai_response("budget for retirement")
+    assert "more specific" in generate_ai_response("hello")
+
+def test_benchmark_times_every_mode():
+    # Throughput is checked against TARGET_PER_SECOND by the benchmark itself; unit tests don't time anything
+    result = benchmark(messages=200, batch_size=50)
+    assert set(result) == {"single", "batch", "batch_repeated"}
+    assert all(mode["per_second"] > 0 for mode in result.values())
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.main import app
+from backend.database import Base, get_db
+from backend.auth import get_current_active_user
+
+@pytest.fixture(scope="module")
+def session_factory():
+    """Sessions on an in-memory database of the module's own"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture(scope="module")
+def test_user():
+    """The signed-in user; modules override this to get an id of their own"""
+    return SimpleNamespace(id=4242, is_active=True)
+
+@pytest.fixture(scope="module")
+def client(session_factory, test_user):
+    """A test client whose requests use the module's database, signed in as `test_user`"""
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: test_user
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.utils.admission import AdmissionLimiter
+
+def test_limiter_queues_then_sheds_with_retry_after():
+    limiter = AdmissionLimiter("test_queue", max_concurrent=1, max_queue=1, queue_timeout=0.05, retry_after=3)
+
+    async def scenario():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as shed:
+            await limiter.acquire()
+        assert shed.value.status_code == 503
+        assert shed.value.headers["Retry-After"] == "3"
+
+        limiter.release()
+        await waiter
+        limiter.release()
+
+    asyncio.run(scenario())
+    snapshot = limiter.snapshot()
+    assert snapshot["active"] == 0
+    assert snapshot["admitted"] == 2
+    assert snapshot["rejected_queue_full"] == 1
+
+def test_queued_request_times_out():
+    limiter = AdmissionLimiter("test_timeout", max_concurrent=1, max_queue=4, queue_timeout=0.01)
+
+    async def scenario():
+        await limiter.acquire()
+        with pytest.raises(HTTPException) as shed:
+            await limiter.acquire()
+        assert shed.value.status_code == 503
+        limiter.release()
+
+    asyncio.run(scenario())
+    assert limiter.snapshot()["rejected_queue_timeout"] == 1
+    assert limiter.snapshot()["active"] == 0
+
+def test_rejections_are_reported_in_metrics():
+    client = TestClient(app)
+    client.get("/api/budget/categories")
+    admission = client.get("/api/metrics").json()["admission"]
+    assert admission["global"]["admitted"] >= 1
+    assert "rejected_queue_full" in admission["smart_analysis"]
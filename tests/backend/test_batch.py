@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+
+client = TestClient(app)
+
+def test_batch_runs_sub_requests_and_reports_failures_individually():
+    response = client.post("/api/batch", json={
+        "requests": [
+            {"id": "metrics", "path": "/api/dashboard/metrics"},
+            {"id": "trends", "path": "/api/dashboard/trends", "params": {"months": 3}},
+            {"id": "goals", "path": "/api/savings/goals"},
+            {"id": "missing", "path": "/api/does-not-exist"}
+        ]
+    })
+    assert response.status_code == 200
+    results = {r["id"]: r for r in response.json()["responses"]}
+
+    assert results["metrics"]["status"] == 200
+    assert "net_worth" in results["metrics"]["body"]
+    assert len(results["trends"]["body"]["trends"]) == 3
+    assert results["goals"]["status"] == 401
+    assert results["missing"]["status"] == 404
+    assert response.json()["failed"] == 2
+
+def test_batch_rejects_nested_batches():
+    response = client.post("/api/batch", json={"requests": [{"path": "/api/batch", "method": "POST"}]})
+    assert response.json()["responses"][0]["status"] == 400
@@ -0,0 +1,86 @@
+import json
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from backend.utils import cache as cache_module, shared_state
+from backend.utils.cache import Cache, MemoryCacheBackend, cache, canonical_key
+from backend.services.ai_smart_service import ai_smart_service
+from backend.services.investment_service import InvestmentService
+
+def test_memory_backend_evicts_least_recently_used_to_stay_under_cap():
+    backend = MemoryCacheBackend(max_bytes=1000, max_item_fraction=0.5)
+    backend.set("a", b"x" * 300)
+    backend.set("b", b"x" * 300)
+    backend.get("a")
+    backend.set("c", b"x" * 300)
+    backend.set("d", b"x" * 300)
+
+    usage = backend.usage()
+    assert usage["bytes"] <= 1000
+    assert backend.get("a") is not None
+    assert backend.get("b") is None
+    assert usage["evictions"] >= 1
+
+def test_oversized_values_are_not_cached():
+    backend = MemoryCacheBackend(max_bytes=1000, max_item_fraction=0.1)
+    backend.set("big", b"x" * 500)
+    assert backend.get("big") is None
+    assert backend.usage()["rejected_too_large"] == 1
+
+def test_user_namespace_is_invalidated_in_one_call():
+    cache = Cache(MemoryCacheBackend())
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"total": len(calls)}
+
+    assert cache.get_or_compute(cache.user_namespace(7), "summary", compute) == {"total": 1}
+    assert cache.get_or_compute(cache.user_namespace(7), "summary", compute) == {"total": 1}
+    cache.invalidate_user(7)
+    assert cache.get_or_compute(cache.user_namespace(7), "summary", compute) == {"total": 2}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+def test_shared_namespace_invalidation():
+    cache = Cache(MemoryCacheBackend())
+    cache.set("terms", "apr", "annual percentage rate")
+    cache.invalidate_namespace("terms")
+    assert cache.get("terms", "apr") is None
+
+def test_canonical_keys_ignore_order_and_float_noise():
+    assert canonical_key({"rate": 0.07000000000000001, "years": 10.0}) == canonical_key({"years": 10, "rate": 0.07})
+    assert canonical_key({"rate": 0.07}) != canonical_key({"rate": 0.08})
+
+def test_scenarios_and_projections_are_memoized():
+    before = cache.stats()["namespaces"].get("scenarios", {"hits": 0})["hits"]
+    first = ai_smart_service.simulate_scenario("savings_rate", {"savings_rate": 0.15, "years": 12})
+    first["future_value"] = -1
+    again = ai_smart_service.simulate_scenario("savings_rate", {"years": 12.0, "savings_rate": 0.15000000000000002})
+    assert again["future_value"] > 0
+    assert cache.stats()["namespaces"]["scenarios"]["hits"] == before + 1
+
+    assert InvestmentService.calculate_retirement_savings(30, 65, 1000, 300, 7) == \
+        InvestmentService.calculate_retirement_savings(30, 65, 1000.0, 300.0, 7.0)
+    assert cache.stats()["namespaces"]["retirement_projections"]["hits"] >= 1
+
+def test_values_are_stored_as_json():
+    backend = MemoryCacheBackend()
+    cache = Cache(backend)
+    assert cache.get_or_compute("test", "value", lambda: {"when": date(2030, 1, 1), "pair": (1, 2)}) == \
+        {"when": "2030-01-01", "pair": [1, 2]}
+    (raw, _), = backend._entries.values()
+    assert json.loads(raw) == {"when": "2030-01-01", "pair": [1, 2]}
+
+def test_keys_change_when_the_state_epoch_does(monkeypatch):
+    cache = Cache(MemoryCacheBackend())
+    cache.set(cache.user_namespace(8), "summary", "before")
+    monkeypatch.setattr(shared_state, "_state_backend", shared_state.MemoryStateBackend())
+    # Versions restart at 0 in the new state, but the old entry must not match
+    assert cache.get(cache.user_namespace(8), "summary") is None
+
+def test_shared_cache_needs_shared_state(monkeypatch):
+    monkeypatch.setattr(cache_module, "create_cache_backend", lambda: SimpleNamespace(shared=True))
+    with pytest.raises(RuntimeError):
+        Cache().backend
@@ -0,0 +1,66 @@
+import time
+from ai_core import llm_pipeline
+from ai_core.inference import StubBackend, create_backend
+from backend.services import ai_service
+from backend.services.chat_cache import ChatResponseCache, normalize_message
+from backend.utils.cache import cache
+
+def _counting(answer):
+    calls = []
+    def generate(message):
+        calls.append(message)
+        return answer
+    return generate, calls
+
+def test_normalized_messages_share_an_answer():
+    assert normalize_message("  How do I BUDGET?? ") == normalize_message("how do i budget") == "how do i budget"
+    assert normalize_message("Is 4.5% good for a 401(k)?") == "is 4.5% good for a 401(k)"
+    chat = ChatResponseCache()
+    generate, calls = _counting("Make a budget.")
+    for message in ["How do I budget?", "how do i   budget", "HOW DO I BUDGET!"]:
+        assert chat.get_or_generate("test", "v1", message, generate) == "Make a budget."
+    assert len(calls) == 1
+    stats = chat.snapshot()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["hit_rate"] == round(2 / 3, 4)
+
+def test_personalized_answers_are_per_user_and_invalidated_by_writes():
+    chat = ChatResponseCache()
+    generate, calls = _counting("You have $500 left this month.")
+    chat.get_or_generate("test", "v1", "how is my budget", generate, user_id=7001)
+    chat.get_or_generate("test", "v1", "how is my budget", generate, user_id=7002)
+    chat.get_or_generate("test", "v1", "how is my budget", generate, user_id=7001)
+    assert len(calls) == 2
+    cache.invalidate_user(7001)
+    chat.get_or_generate("test", "v1", "how is my budget", generate, user_id=7001)
+    assert len(calls) == 3
+
+def test_template_changes_invalidate_streamed_answers(monkeypatch):
+    message = "How should I start investing?"
+    first = "".join(ai_service.stream_ai_response(message))
+    generated = []
+    monkeypatch.setattr(ai_service, "stream_pipeline_response", lambda text: generated.append(text) or iter(["x"]))
+    assert "".join(ai_service.stream_ai_response(message)) == first and not generated
+    monkeypatch.setattr(llm_pipeline, "TEMPLATE_VERSION", "changed")
+    assert "".join(ai_service.stream_ai_response(message)) == "x" and generated == [message]
+
+def test_hits_report_latency_savings():
+    chat = ChatResponseCache()
+    def slow(message):
+        time.sleep(0.02)
+        return "answer"
+    for _ in range(3):
+        chat.get_or_generate("test", "v1", "how do i save money", slow)
+    stats = chat.snapshot()
+    assert stats["mean_miss_ms"] > 15 and stats["mean_hit_ms"] < stats["mean_miss_ms"]
+    assert stats["saved_seconds"] > 0.02
+
+def test_fallback_answers_are_not_cached():
+    message = "Should I refinance my mortgage at 6.1%?"
+    try:
+        llm_pipeline.set_backend(StubBackend(latency=10)).timeout = 0.05
+        fallback = "".join(ai_service.stream_ai_response(message))
+        assert fallback == llm_pipeline.template_answer(message)
+        llm_pipeline.set_backend(StubBackend(respond=lambda prompt: "Healthy answer."))
+        assert "".join(ai_service.stream_ai_response(message)) == "Healthy answer."
+    finally:
+        llm_pipeline.set_backend(create_backend(respond=llm_pipeline._answer_prompt))
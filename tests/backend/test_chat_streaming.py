@@ -0,0 +1,61 @@
+import json
+import time
+from fastapi.testclient import TestClient
+from ai_core.llm_pipeline import generate_ai_response
+from backend.main import app
+from backend.routers import ai_chat
+from backend.utils import streaming
+from backend.utils.admission import AdmissionLimiter
+
+client = TestClient(app)
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append(lines.get("event", "comment"))
+    return events
+
+def test_sse_streams_the_full_answer_in_chunks():
+    message = "How should I budget for retirement?"
+    with client.stream("POST", "/api/ai/chat/stream", json={"message": message}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+    events = _events(body)
+    assert events[:2] == ["start", "sources"] and events[-1] == "done" and events.count("chunk") > 10
+    text = "".join(json.loads(line[len("data: "):])["text"]
+                   for line in body.splitlines() if line.startswith('data: {"text"'))
+    assert text == generate_ai_response(message)
+
+def test_sse_sends_heartbeats_while_the_answer_is_slow(monkeypatch):
+    def slow_answer(message):
+        time.sleep(0.3)
+        yield "done thinking"
+    monkeypatch.setattr(ai_chat, "stream_ai_response", slow_answer)
+    monkeypatch.setattr(streaming, "HEARTBEAT_INTERVAL", 0.05)
+    body = client.get("/api/ai/chat/stream", params={"message": "hi"}).text
+    assert ": ping" in body and _events(body)[-1] == "done"
+
+def test_websocket_streams_chunks_and_rejects_bad_messages():
+    with client.websocket_connect("/api/ai/chat/ws") as websocket:
+        websocket.send_json({"text": "wrong field"})
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_json({"message": "How do I pay off debt?"})
+        assert websocket.receive_json()["type"] == "start"
+        assert websocket.receive_json()["sources"][0]["source"] in ("advice", "term")
+        chunks = []
+        while (event := websocket.receive_json())["type"] != "done":
+            chunks.append(event["text"])
+        assert "".join(chunks) == generate_ai_response("How do I pay off debt?")
+
+def test_websocket_answers_take_a_stream_slot(monkeypatch):
+    monkeypatch.setattr(ai_chat, "chat_stream_limiter", AdmissionLimiter("chat_stream_test", max_concurrent=0))
+    with client.websocket_connect("/api/ai/chat/ws") as websocket:
+        websocket.send_json({"message": "How do I pay off debt?"})
+        event = websocket.receive_json()
+        assert event["type"] == "error" and event["retry_after"] == 1
+
+def test_messages_are_length_checked():
+    assert client.post("/api/ai/chat/stream", json={"message": ""}).status_code == 422
+    assert client.post("/api/ai/chat", json={"message": "x" * (ai_chat.MAX_MESSAGE_LENGTH + 1)}).status_code == 422
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+import pytest
+from backend.main import app
+from backend.auth import get_optional_current_user
+from backend.services import conversation_store as conversation_module
+from backend.services.conversation_store import ASSISTANT, USER, ConversationStore
+
+@pytest.fixture(scope="module")
+def test_user():
+    return SimpleNamespace(id=6161, is_active=True)
+
+def test_old_turns_are_compacted_into_a_bounded_summary(tmp_path):
+    store = ConversationStore(tmp_path / "conversations.db", max_chars=300, flush_interval=60)
+    for i in range(200):
+        store.append_many(1, "c", [(USER, f"Question {i}: how should I budget my salary?"), (ASSISTANT, "x" * 100)])
+
+    conversation = store.get(1, "c")
+    assert conversation.chars <= 300
+    assert conversation.turns[-1] == (ASSISTANT, "x" * 100)
+    assert len(conversation.summary) <= conversation_module.MAX_SUMMARY_CHARS
+    assert conversation.summary.splitlines()[-1].startswith("[budget] Question 197")
+    store.close()
+
+def test_writes_are_batched_and_survive_hot_tier_eviction(tmp_path):
+    store = ConversationStore(tmp_path / "conversations.db", hot_limit=2, flush_interval=60)
+    for user_id in range(5):
+        store.append(user_id, "c", USER, f"How do I save for retirement, user {user_id}?")
+        store.append(user_id, "c", ASSISTANT, "Start early.")
+    assert store.stats()["hot_conversations"] == 2
+    # Evicted but not yet written: read back from the write queue
+    assert store.get(0, "c").last_question() == "How do I save for retirement, user 0?"
+
+    store.flush()
+    stats = store.stats()
+    assert stats["flushes"] == 1 and stats["rows_written"] == 10 and stats["pending_writes"] == 0
+    store.close()
+
+    reopened = ConversationStore(tmp_path / "conversations.db")
+    assert [text for _, text in reopened.get(3, "c").turns] == ["How do I save for retirement, user 3?", "Start early."]
+    reopened.delete(3, "c")
+    reopened.close()
+    assert not ConversationStore(tmp_path / "conversations.db").get(3, "c").turns
+
+def test_workers_sharing_the_cold_tier_keep_each_others_turns(tmp_path):
+    # Two stores on one file stand in for two worker processes
+    first = ConversationStore(tmp_path / "conversations.db", max_chars=200, flush_interval=60)
+    second = ConversationStore(tmp_path / "conversations.db", max_chars=200, flush_interval=60)
+    first.append(1, "c", USER, "Q1")
+    first.flush()
+    assert [text for _, text in second.get(1, "c").turns] == ["Q1"]
+    first.append(1, "c", USER, "Q2")
+    second.append(1, "c", USER, "Q3")
+    first.flush()
+    second.flush()
+    # Each hot copy picks up the other's turns
+    assert sorted(text for _, text in first.get(1, "c").turns) == ["Q1", "Q2", "Q3"]
+    assert sorted(text for _, text in second.get(1, "c").turns) == ["Q1", "Q2", "Q3"]
+
+    # Compaction merges against what is in the database, so nothing is dropped unsummarized
+    for i in range(20):
+        (first if i % 2 else second).append(1, "c", USER, f"How much should I budget for item {i}?")
+        first.flush()
+        second.flush()
+    cold = ConversationStore(tmp_path / "conversations.db").get(1, "c")
+    assert cold.chars <= 200
+    assert len(cold.summary.splitlines()) + len(cold.turns) == 23
+    for store in (first, second):
+        store.close()
+
+def test_chat_answers_follow_ups_in_context(tmp_path, monkeypatch, client, test_user):
+    store = ConversationStore(tmp_path / "conversations.db", flush_interval=60)
+    monkeypatch.setattr("backend.routers.ai_chat.conversation_store", store)
+    app.dependency_overrides[get_optional_current_user] = lambda: test_user
+    try:
+        client.post("/api/ai/chat", json={"message": "How much should I save for retirement?", "conversation_id": "plan"})
+        follow_up = client.post("/api/ai/chat", json={"message": "And when should I start?", "conversation_id": "plan"})
+        assert follow_up.status_code == 200
+        assert follow_up.json()["conversation_id"] == "plan"
+        assert "retirement" in follow_up.json()["response"]
+
+        history = client.get("/api/ai/chat/history/plan").json()
+        assert [turn["role"] for turn in history["turns"]] == [USER, ASSISTANT, USER, ASSISTANT]
+    finally:
+        del app.dependency_overrides[get_optional_current_user]
+        store.close()
@@ -0,0 +1,43 @@
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from backend.models.finance_models import Expense, BudgetCategory
+from backend.services.expense_service import expense_service
+
+@pytest.fixture(scope="module")
+def test_user():
+    return SimpleNamespace(id=5151, is_active=True)
+
+@pytest.fixture(scope="module", autouse=True)
+def expenses(session_factory, test_user):
+    db = session_factory()
+    try:
+        for description, amount, category in [("Lunch", 12.0, BudgetCategory.FOOD),
+                                              ("Dinner", 30.0, BudgetCategory.FOOD),
+                                              ("Bus", 2.5, BudgetCategory.TRANSPORTATION)]:
+            expense_service.add_expense(
+                Expense(description=description, amount=amount, category=category, date=date.today()),
+                test_user.id,
+                db
+            )
+    finally:
+        db.close()
+
+def test_expenses_return_only_requested_fields(client):
+    response = client.get("/api/expenses/expenses", params={"fields": "amount,category"})
+    assert response.status_code == 200
+    assert response.json()[0] == {"amount": 12.0, "category": "food"}
+
+def test_unknown_field_is_rejected(client):
+    response = client.get("/api/expenses/expenses", params={"fields": "amount,password"})
+    assert response.status_code == 400
+
+def test_breakdown_totals_without_transactions(client):
+    response = client.get("/api/expenses/expenses/breakdown", params={"fields": "total_amount,transaction_count"})
+    assert response.status_code == 200
+    assert response.json()["food"] == {"total_amount": 42.0, "transaction_count": 2}
+
+def test_breakdown_defaults_to_all_fields(client):
+    food = client.get("/api/expenses/expenses/breakdown").json()["food"]
+    assert food["average_transaction"] == 21.0
+    assert food["transactions"][0] == {"description": "Lunch", "amount": 12.0, "date": date.today().isoformat()}
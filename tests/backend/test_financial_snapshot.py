@@ -0,0 +1,75 @@
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from backend.main import app
+from backend.auth import get_optional_current_user
+from backend.models.database_models import Expense as DBExpense
+from backend.models.finance_models import BudgetCategory, Expense, SavingsGoal
+from backend.services.expense_service import expense_service
+from backend.services.financial_snapshot import financial_snapshots
+from backend.services.savings_service import savings_service
+from backend.utils.cache import cache
+
+@pytest.fixture(scope="module")
+def test_user():
+    return SimpleNamespace(id=5353, is_active=True)
+
+def _expense(amount, category, day=None):
+    return Expense(description="Test", amount=amount, category=category, date=day or date.today())
+
+def test_snapshot_follows_writes(session_factory, test_user):
+    db = session_factory()
+    try:
+        expense_service.add_expense(_expense(40.0, BudgetCategory.FOOD), test_user.id, db)
+        expense_service.add_expense(_expense(100.0, BudgetCategory.TRANSPORTATION, date(2020, 1, 5)), test_user.id, db)
+        snapshot = financial_snapshots.get_snapshot(test_user.id, db)
+        assert snapshot["spend_by_category"] == {"transportation": 100.0, "food": 40.0}
+        assert snapshot["month_spend"] == 40.0
+
+        lunch = expense_service.add_expense(_expense(20.0, BudgetCategory.FOOD), test_user.id, db)
+        goal = savings_service.create_savings_goal(
+            SavingsGoal(name="Emergency Fund", target_amount=1000.0, current_amount=250.0, target_date=date(2030, 1, 1), priority=5),
+            test_user.id, db
+        )
+        updated = financial_snapshots.get_snapshot(test_user.id, db)
+        assert updated["spend_by_category"]["food"] == 60.0
+        assert updated["month_spend"] == 60.0
+        assert updated["goal_progress"]["progress"] == 0.25
+        assert updated["savings_rate"] == round(250 / (250 + 160), 4)
+
+        expense_service.delete_expense(lunch.id, test_user.id, db)
+        savings_service.update_savings_goal(goal.id, 500.0, test_user.id, db)
+        updated = financial_snapshots.get_snapshot(test_user.id, db)
+        assert updated["spend_by_category"]["food"] == 40.0
+        assert updated["goal_progress"]["goals"] == [{"name": "Emergency Fund", "progress": 0.5}]
+
+        # A write handled by another worker only bumps the shared data version
+        db.add(DBExpense(description="Bus", amount=5.0, category="transportation", date=date.today(), user_id=test_user.id))
+        db.commit()
+        cache.invalidate_user(test_user.id)
+        assert financial_snapshots.get_snapshot(test_user.id, db)["spend_by_category"]["transportation"] == 105.0
+    finally:
+        db.close()
+
+def test_chat_personalizes_only_signed_in_users(client, session_factory):
+    user = SimpleNamespace(id=5252, is_active=True)
+    db = session_factory()
+    try:
+        expense_service.add_expense(_expense(25.0, BudgetCategory.FOOD), user.id, db)
+    finally:
+        db.close()
+
+    anonymous = client.post("/api/ai/chat", json={"message": "How should I budget?"})
+    assert anonymous.status_code == 200
+    assert "snapshot" not in anonymous.json()
+
+    app.dependency_overrides[get_optional_current_user] = lambda: user
+    try:
+        personal = client.post("/api/ai/chat", json={"message": "How should I budget?"})
+    finally:
+        del app.dependency_overrides[get_optional_current_user]
+    assert personal.status_code == 200
+    body = personal.json()
+    assert body["snapshot"]["spend_by_category"] == {"food": 25.0}
+    assert body["response"].startswith(anonymous.json()["response"])
+    assert "this month" in body["response"]
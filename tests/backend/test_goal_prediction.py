@@ -0,0 +1,47 @@
+from datetime import date
+import numpy as np
+from backend.models.finance_models import SavingsGoal
+from backend.services.ai_smart_service import ai_smart_service
+from backend.services.projection_engine import months_to_target
+
+def months_by_stepping(target, current, contribution, rate, limit=2000):
+    balance, monthly_rate = current, rate / 12
+    for month in range(limit + 1):
+        if balance >= target - 1e-6:
+            return month
+        balance = balance * (1 + monthly_rate) + contribution
+    return np.inf
+
+def make_goal(target, current):
+    return SavingsGoal(name="Goal", target_amount=target, current_amount=current,
+                       target_date=date(2035, 1, 1), priority=1)
+
+def test_closed_form_matches_month_by_month_balance():
+    cases = [(10000, 1000, 200, 0.05), (10000, 0, 100, 0.0), (50000, 5000, 300, 0.12),
+             (10000, 1000, 200, -0.05), (10000, 1000, 1, -0.5), (10000, 5000, 0, 0.06), (500, 1000, 100, 0.05)]
+    for target, current, contribution, rate in cases:
+        assert months_to_target(target, current, contribution, rate) == months_by_stepping(target, current, contribution, rate)
+
+def test_reached_goals_and_edge_rates():
+    reached = months_to_target([100, 100], [100, 250], 10, [0.05, 0.0])
+    assert list(reached) == [0.0, 0.0] and not np.signbit(reached).any()
+    # Near-zero rates and a balance that a negative return caps just above the target
+    for target, current, contribution, rate in [(10000, 1000, 200, 1e-12), (10000, 1000, 200, -1e-12),
+                                                (2990, 1000, 100, -0.4)]:
+        assert months_to_target(target, current, contribution, rate) == months_by_stepping(target, current, contribution, rate)
+
+def test_expected_return_shortens_the_prediction():
+    goal = make_goal(10000, 1000)
+    flat = ai_smart_service.predict_goal_achievement(goal, 200, 0.0)
+    growing = ai_smart_service.predict_goal_achievement(goal, 200, 0.08)
+    assert growing["months_to_goal"] < flat["months_to_goal"] == 45
+
+def test_grid_matches_single_predictions():
+    goals = [make_goal(10000, 1000), make_goal(2000, 2500), make_goal(250000, 0)]
+    contributions = [0, 100, 500]
+    rates = [0.0, 0.05]
+    grid = ai_smart_service.predict_goal_achievement_grid(goals, contributions, rates)
+    for g, goal in enumerate(goals):
+        for c, contribution in enumerate(contributions):
+            for r, rate in enumerate(rates):
+                assert grid[g][c][r] == ai_smart_service.predict_goal_achievement(goal, contribution, rate)
@@ -0,0 +1,36 @@
+from datetime import date
+from backend.models.finance_models import Expense, BudgetCategory
+from backend.services.expense_service import expense_service
+
+def test_static_resource_returns_304_for_matching_etag(client):
+    first = client.get("/api/budget/categories")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert "max-age" in first.headers["cache-control"]
+
+    second = client.get("/api/budget/categories", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+def test_user_resource_etag_changes_after_write(client, session_factory, test_user):
+    first = client.get("/api/expenses/expenses/summary")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get("/api/expenses/expenses/summary", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    db = session_factory()
+    try:
+        expense_service.add_expense(
+            Expense(description="Lunch", amount=12.5, category=BudgetCategory.FOOD, date=date.today()),
+            test_user.id,
+            db
+        )
+    finally:
+        db.close()
+
+    refreshed = client.get("/api/expenses/expenses/summary", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert refreshed.json()["total_expenses"] == 12.5
@@ -0,0 +1,80 @@
+import threading
+import time
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.utils.idempotency import IdempotencyStore
+from backend.utils.shared_state import MemoryStateBackend
+
+client = TestClient(app)
+
+application = {
+    "first_name": "Ana",
+    "last_name": "Lopez",
+    "email": "ana@example.com",
+    "phone": "555-0100",
+    "support_type": "Rent Support",
+    "amount_requested": 800,
+    "urgency": "High",
+    "description": "Monthly rent assistance"
+}
+
+def test_retry_with_same_key_replays_original_response():
+    headers = {"Idempotency-Key": "apply-123"}
+    first = client.post("/api/mobile/support/apply", json=application, headers=headers)
+    retry = client.post("/api/mobile/support/apply", json=application, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["application_id"] == first.json()["application_id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+def test_key_reused_for_different_request_is_rejected():
+    headers = {"Idempotency-Key": "apply-456"}
+    client.post("/api/mobile/support/apply", json=application, headers=headers)
+    changed = client.post("/api/mobile/support/apply", json={**application, "amount_requested": 900}, headers=headers)
+    assert changed.status_code == 422
+
+def test_keys_are_scoped_to_the_client():
+    headers = {"Idempotency-Key": "apply-789"}
+    client.post("/api/mobile/support/apply", json=application, headers=headers)
+    other = client.post("/api/mobile/support/apply", json={**application, "email": "bo@example.com"}, headers=headers)
+    assert other.status_code == 200
+    assert "Idempotent-Replayed" not in other.headers
+
+def test_workers_sharing_state_replay_each_others_responses():
+    # Two stores on one state backend stand in for two worker processes
+    state = MemoryStateBackend()
+    first, second = IdempotencyStore(state=state), IdempotencyStore(state=state)
+    calls = []
+    write = lambda: calls.append(1) or {"id": len(calls)}
+    assert first.run("key", "scope", {"amount": 5}, write) == {"id": 1}
+    assert second.run("key", "scope", {"amount": 5}, write) == {"id": 1}
+    assert len(calls) == 1
+
+def test_concurrent_duplicates_wait_for_first_request():
+    store = IdempotencyStore()
+    calls = []
+    results = []
+
+    def write():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"id": len(calls)}
+
+    threads = [
+        threading.Thread(target=lambda: results.append(store.run("key", "scope", {"amount": 5}, write)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"id": 1}] * 4
+
+def test_store_is_bounded():
+    store = IdempotencyStore(max_entries=2)
+    for i in range(5):
+        store.run(f"key-{i}", "scope", {}, lambda: {"ok": True})
+    assert store.snapshot()["entries"] == 2
+    assert store.snapshot()["evicted"] == 3
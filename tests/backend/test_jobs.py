@@ -0,0 +1,99 @@
+import time
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from backend.auth import get_current_active_user
+from backend.main import app
+from backend.services import scenario_sweep
+from backend.services.simulation_jobs import plan_sweep, register_simulation_jobs
+from backend.utils.jobs import JobManager
+from backend.utils.shared_state import MemoryStateBackend
+
+def wait_for(manager, job, user_id, timeout=20):
+    deadline = time.time() + timeout
+    while manager.get(job.id, user_id).describe()["status"] in ("queued", "running"):
+        assert time.time() < deadline
+        time.sleep(0.05)
+    return manager.get(job.id, user_id)
+
+def test_monte_carlo_job_reports_progress_and_matches_direct_run():
+    manager = JobManager(max_workers=2)
+    register_simulation_jobs(manager)
+    params = {"current_age": 40, "retirement_age": 65, "paths": 60000, "seed": 3}
+    job = wait_for(manager, manager.submit(1, "scenario", {"scenario_type": "retirement_monte_carlo", "parameters": params}), 1)
+    manager.shutdown()
+
+    assert job.status == "succeeded" and job.progress == 1.0
+    from backend.services.ai_smart_service import ai_smart_service
+    assert job.result == ai_smart_service.simulate_scenario("retirement_monte_carlo", params)
+
+def test_per_user_limit_cancellation_and_isolation():
+    manager = JobManager(max_workers=1, max_per_user=1)
+    register_simulation_jobs(manager)
+    spec = {"scenario_type": "retirement_monte_carlo", "parameters": {"paths": 250000, "seed": 1}}
+    job = manager.submit(1, "scenario", spec)
+    try:
+        manager.submit(1, "scenario", spec)
+        assert False, "second job should be rejected"
+    except Exception as e:
+        assert e.status_code == 429
+    other = manager.submit(2, "sweep", {"scenario_type": "savings_rate", "ranges": {"years": [5, 10]}})
+
+    assert manager.cancel(job.id, 1).status == "cancelled"
+    try:
+        manager.get(job.id, 2)
+        assert False, "other users must not see the job"
+    except Exception as e:
+        assert e.status_code == 404
+    assert len(wait_for(manager, other, 2).result["rows"]) == 2
+    manager.shutdown()
+
+def test_sweep_jobs_are_validated_without_evaluating_the_grid(monkeypatch):
+    def evaluate(*args):
+        raise AssertionError("the grid was evaluated at submission")
+    monkeypatch.setattr(scenario_sweep, "_evaluate", evaluate)
+    plan_sweep({"scenario_type": "savings_rate", "ranges": {"years": {"start": 1, "stop": 40, "num": 40}}})
+    try:
+        plan_sweep({"scenario_type": "savings_rate", "ranges": {"years": {"start": 1, "stop": 40, "num": 10 ** 9}}})
+        assert False, "an oversized axis should be rejected"
+    except ValueError:
+        pass
+
+def test_any_worker_serves_status_results_and_cancels():
+    # Two managers on one state backend stand in for two worker processes
+    state = MemoryStateBackend()
+    owner, other = JobManager(max_workers=1, state=state), JobManager(max_workers=1, state=state)
+    register_simulation_jobs(owner)
+    register_simulation_jobs(other)
+    done = wait_for(other, owner.submit(1, "sweep", {"scenario_type": "savings_rate", "ranges": {"years": [5, 10]}}), 1)
+    assert done.status == "succeeded" and len(done.result["rows"]) == 2
+
+    spec = {"scenario_type": "retirement_monte_carlo", "parameters": {"paths": 250000, "seed": 1}}
+    job = owner.submit(1, "scenario", spec)
+    assert other.cancel(job.id, 1).status == "cancelled"
+    assert wait_for(owner, job, 1).status == "cancelled"
+    owner.shutdown()
+    other.shutdown()
+
+def test_job_endpoints():
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id=4242)
+    try:
+        client = TestClient(app)
+        bad = client.post("/api/jobs", json={"kind": "scenario", "spec": {"scenario_type": "retirement_monte_carlo",
+                                                                       "parameters": {"paths": 10 ** 7}}})
+        assert bad.status_code == 400
+
+        submitted = client.post("/api/jobs", json={"kind": "retirement_report",
+                                                   "spec": {"current_age": 50, "paths": 5000, "seed": 9}})
+        assert submitted.status_code == 202
+        result_url = submitted.json()["result_url"]
+        deadline = time.time() + 20
+        response = client.get(result_url)
+        while response.status_code == 202 and time.time() < deadline:
+            time.sleep(0.05)
+            response = client.get(result_url)
+        assert response.status_code == 200
+        report = response.json()["result"]
+        assert report["yearly"][0]["age"] == 50
+        assert 0 <= report["summary"]["success_probability"] <= 1
+    finally:
+        app.dependency_overrides.pop(get_current_active_user, None)
@@ -0,0 +1,40 @@
+import json
+import logging
+import queue
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.utils.logging_setup import JsonFormatter, NonBlockingQueueHandler, SamplingFilter, request_id_var
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello", (), None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.dropped == 1
+
+def test_json_formatter_includes_request_id_and_extras():
+    record = logging.LogRecord("finmate.access", logging.INFO, __file__, 1, "GET %s", ("/x",), None)
+    record.request_id = "abc"
+    record.duration_ms = 1.5
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "GET /x"
+    assert entry["request_id"] == "abc"
+    assert entry["duration_ms"] == 1.5
+
+def test_sampling_only_applies_to_high_volume_info_logs():
+    sampler = SamplingFilter(rate=0.0)
+    access = logging.LogRecord("finmate.access", logging.INFO, __file__, 1, "GET /", (), None)
+    warning = logging.LogRecord("finmate.access", logging.WARNING, __file__, 1, "slow", (), None)
+    other = logging.LogRecord("backend.services", logging.INFO, __file__, 1, "hi", (), None)
+    assert not sampler.filter(access)
+    assert sampler.filter(warning)
+    assert sampler.filter(other)
+    assert sampler.sampled_out == 1
+
+def test_responses_carry_request_id_and_timing():
+    client = TestClient(app)
+    response = client.get("/", headers={"X-Request-ID": "req-123"})
+    assert response.headers["x-request-id"] == "req-123"
+    assert response.headers["server-timing"].startswith("app;dur=")
+    assert client.get("/").headers["x-request-id"] != "req-123"
+    assert request_id_var.get() == "-"
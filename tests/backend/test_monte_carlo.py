@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.services.monte_carlo import ReturnDistribution, simulate_retirement
+
+def test_seeded_runs_are_reproducible_across_process_pool():
+    kwargs = dict(current_savings=50000, monthly_contribution=500, years_to_retirement=20,
+                  years_in_retirement=20, paths=60000, seed=42)
+    local = simulate_retirement(**kwargs)
+    pooled = simulate_retirement(workers=2, **kwargs)
+    assert local == pooled
+    assert local["seed"] == 42
+    assert 0 <= local["success_probability"] <= 1
+    assert len(local["bands"]["p50"]) == 41
+
+def test_zero_volatility_matches_deterministic_outcome():
+    result = simulate_retirement(100000, 0, 0, 10, ReturnDistribution(mean=0.0, stdev=0.0),
+                                 paths=100, annual_withdrawal=20000, seed=1)
+    assert result["success_probability"] == 0.0
+    assert result["bands"]["p50"][5] == 0.0
+
+@pytest.mark.parametrize("kind", ["lognormal", "student_t"])
+def test_other_distributions_keep_the_mean(kind):
+    import numpy as np
+    returns = ReturnDistribution(kind, mean=0.07, stdev=0.15).draw(np.random.default_rng(0), (200000,))
+    assert abs(returns.mean() - 0.07) < 0.005
+
+def test_scenario_endpoint_returns_success_probability():
+    client = TestClient(app)
+    response = client.post("/api/smart/scenario-simulation", json={
+        "scenario_type": "retirement_monte_carlo",
+        "parameters": {"current_age": 40, "retirement_age": 65, "paths": 2000, "seed": 7,
+                       "return_distribution": {"type": "lognormal", "mean": 0.06, "stdev": 0.12}}
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ages"][0] == 40 and len(body["ages"]) == len(body["bands"]["p5"])
+    assert "success_probability" in body
+
+    bad = client.post("/api/smart/scenario-simulation", json={
+        "scenario_type": "retirement_monte_carlo", "parameters": {"return_distribution": {"type": "cauchy"}}
+    })
+    assert bad.status_code == 400
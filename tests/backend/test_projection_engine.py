@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.services.projection_engine import MAX_PROJECTION_SCENARIOS, benchmark, project
+from backend.services.simulation_jobs import plan_scenario
+
+def scalar_future_value(initial, contribution, rate, months):
+    monthly_rate = rate / 12
+    fv_initial = initial * (1 + rate) ** (months / 12)
+    if monthly_rate:
+        return fv_initial + contribution * (((1 + monthly_rate) ** months - 1) / monthly_rate)
+    return fv_initial + contribution * months
+
+def test_matches_scalar_formula_for_every_scenario():
+    initial = [0, 10000, 5000, 2500]
+    contribution = [500, 0, 250, 100]
+    rates = [0.07, 0.05, 0.0, 0.12]
+    months = [120, 360, 24, 0]
+    projection = project(initial, contribution, rates, months)
+
+    expected = [scalar_future_value(*args) for args in zip(initial, contribution, rates, months)]
+    assert np.allclose(projection.final_values, expected)
+    assert projection.balances.shape == (4, 361)
+    # Trajectories stay flat after a scenario's own horizon
+    assert projection.balances[0, 200] == projection.final_values[0]
+
+def test_scalar_inputs_broadcast_against_a_rate_list():
+    projection = project(10000, 500, [0.05, 0.07, 0.10], 120)
+    assert len(projection) == 3
+    assert projection.final_values[0] < projection.final_values[1] < projection.final_values[2]
+    assert projection.yearly_balances(1)[0] == 10000
+    assert len(projection.yearly_balances(1)) == 11
+
+def test_benchmark_projects_every_scenario():
+    # Speed is checked against TARGET_SECONDS by the benchmark itself; unit tests don't time anything
+    result = benchmark(scenarios=100, years=5)
+    assert result["scenarios"] == 100 and result["months"] <= 60
+
+def test_oversized_horizons_and_rate_lists_are_rejected():
+    with pytest.raises(ValueError):
+        project(0, 500, 0.07, 10 ** 9)
+    client = TestClient(app)
+    for parameters in ({"years": 1e9}, {"years": 10, "return_rates": [0.05] * (MAX_PROJECTION_SCENARIOS + 1)}):
+        response = client.post("/api/smart/scenario-simulation",
+                               json={"scenario_type": "investment_return", "parameters": parameters})
+        assert response.status_code == 400
+        assert "at most" in response.json()["detail"].lower()
+    with pytest.raises(ValueError):
+        plan_scenario({"scenario_type": "retirement", "parameters": {"current_age": 30, "retirement_age": 10 ** 6}})
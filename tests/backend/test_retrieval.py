@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.services.retrieval import RetrievalIndex, RetrievalStore, benchmark, build_index, tokenize
+
+DOCUMENTS = [
+    ("term", "compound interest", "Interest earned on both the principal and previously earned interest."),
+    ("term", "bond", "A loan to a government or company that pays interest."),
+    ("advice", "Budgeting", "Use the 50/30/20 rule to split needs, wants and savings."),
+]
+
+def test_tokenizer_drops_stopwords_and_folds_plurals():
+    assert tokenize("What are the best Index_Funds for a 401(k)?") == ["best", "index", "fund", "401(k)"]
+
+def test_bm25_ranks_the_most_specific_snippet_first(tmp_path):
+    build_index(DOCUMENTS, tmp_path / "test.idx", "v1")
+    index = RetrievalIndex(tmp_path / "test.idx")
+    assert index.fingerprint == "v1" and index.documents == 3
+    results = index.search("how does compound interest work", k=2)
+    assert [result["title"] for result in results] == ["compound interest", "bond"]
+    assert results[0]["score"] > results[1]["score"] > 0
+    assert index.search("quantum entanglement") == []
+
+def test_articles_are_indexed_and_rebuilt_when_they_change(tmp_path):
+    articles = tmp_path / "articles"
+    articles.mkdir()
+    (articles / "hsa.md").write_text("# Health Savings Accounts\n\nAn HSA is triple tax-advantaged.\n\nIt needs a high-deductible plan.")
+    store = RetrievalStore(tmp_path / "retrieval.idx", articles)
+    best = store.search("hsa tax")[0]
+    assert (best["source"], best["title"], best["snippet"]) == (
+        "article:hsa.md", "Health Savings Accounts", "An HSA is triple tax-advantaged."
+    )
+    (articles / "fsa.txt").write_text("Flexible Spending Accounts\n\nAn FSA is use-it-or-lose-it.")
+    store.rebuild()
+    assert store.search("fsa")[0]["title"] == "Flexible Spending Accounts"
+
+def test_chat_cites_sources():
+    body = TestClient(app).post("/api/ai/chat", json={"message": "What is compound interest?"}).json()
+    assert body["sources"][0]["title"] == "compound interest"
+
+def test_benchmark_reports_build_and_query_costs():
+    # Latency is checked against TARGET_P95_MS by the benchmark itself; unit tests don't time anything
+    result = benchmark(docs=500, queries=20)
+    assert set(result) == {"build_seconds", "index_mb", "mean_ms", "p95_ms"}
+    assert result["mean_ms"] > 0
@@ -0,0 +1,59 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.services.ai_smart_service import ai_smart_service
+from backend.services.scenario_sweep import expand_range, sweep
+
+def test_grid_points_match_single_simulations():
+    result = sweep("savings_rate", {"annual_income": 80000, "current_savings": 5000},
+                   {"savings_rate": {"start": 0.05, "stop": 0.40, "step": 0.05},
+                    "return_rate": [0.03, 0.07, 0.10], "years": {"start": 5, "stop": 40, "step": 5}})
+    assert result.points == 8 * 3 * 8
+    lines = [json.loads(line) for line in b"".join(result.iter_ndjson(chunk_points=50)).splitlines()]
+    assert lines[0]["points"] == result.points and len(lines) == result.points + 1
+
+    point = lines[1 + 37]
+    single = ai_smart_service.simulate_scenario("savings_rate", {
+        "annual_income": 80000, "current_savings": 5000, "savings_rate": point["savings_rate"],
+        "return_rate": point["return_rate"], "years": point["years"]
+    })
+    assert point["future_value"] == pytest.approx(single["future_value"], abs=0.01)
+
+def test_ranges_and_grid_size_are_validated():
+    assert expand_range("years", {"start": 5, "stop": 40, "num": 8}).tolist() == [5, 10, 15, 20, 25, 30, 35, 40]
+    with pytest.raises(ValueError):
+        sweep("savings_rate", {}, {"savings_rate": {"start": 0, "stop": 1, "num": 1000},
+                                   "return_rate": {"start": 0, "stop": 1, "num": 1000}})
+    with pytest.raises(ValueError):
+        sweep("retirement_monte_carlo", {}, {"return_rate": [0.05]})
+    with pytest.raises(ValueError):
+        sweep("retirement", {"salary": 1}, {"return_rate": [0.05]})
+    # Rejected before anything is allocated
+    for spec in ({"start": 0, "stop": 1, "num": 1e12}, {"start": 0, "stop": 1, "num": float("inf")},
+                 {"start": 0, "stop": float("inf"), "step": 1}, {"start": 0, "stop": 1, "step": float("nan")}):
+        with pytest.raises(ValueError):
+            expand_range("return_rate", spec)
+
+def test_sweep_endpoint_streams_ndjson():
+    client = TestClient(app)
+    response = client.post("/api/smart/scenario-sweep", json={
+        "scenario_type": "retirement",
+        "parameters": {"current_age": 35},
+        "ranges": {"monthly_contribution": [250, 500, 1000], "return_rate": {"start": 0.03, "stop": 0.10, "num": 8}}
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert len(response.text.splitlines()) == 1 + 24
+    assert client.post("/api/smart/scenario-sweep", json={"scenario_type": "retirement", "ranges": {}}).status_code == 400
+
+def test_non_numeric_input_is_a_bad_request():
+    client = TestClient(app)
+    for parameters, ranges in [({"current_age": [1]}, {"return_rate": [0.05]}),
+                               ({}, {"return_rate": {"start": 0, "stop": 1, "num": None}}),
+                               ({}, {"return_rate": [0.05, {"value": 0.07}]}),
+                               ({}, {"return_rate": [[0.05]]}),
+                               ({}, {"return_rate": ["0.05"]})]:
+        response = client.post("/api/smart/scenario-sweep",
+                               json={"scenario_type": "retirement", "parameters": parameters, "ranges": ranges})
+        assert response.status_code == 400, (parameters, ranges)
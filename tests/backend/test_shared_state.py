@@ -0,0 +1,27 @@
+import time
+import pytest
+from backend.utils.cache import CacheBackend
+from backend.utils.shared_state import MemoryStateBackend, StateBackend, create_state_backend
+
+def test_memory_backend_counters_and_ttl():
+    state = MemoryStateBackend()
+    assert state.incr("counter") == 1
+    assert state.incr("counter", 4) == 5
+
+    assert state.add("lock", "owner", ttl=0.05)
+    assert not state.add("lock", "other")
+    time.sleep(0.06)
+    assert state.get("lock") is None
+    assert state.add("lock", "other")
+
+def test_default_backend_is_in_memory():
+    assert isinstance(create_state_backend(), MemoryStateBackend)
+
+def test_backends_must_implement_every_operation():
+    class GetOnly(StateBackend):
+        def get(self, key, default=None):
+            return default
+    with pytest.raises(TypeError):
+        GetOnly()
+    with pytest.raises(TypeError):
+        CacheBackend()
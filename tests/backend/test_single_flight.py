@@ -0,0 +1,66 @@
+import threading
+import time
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.auth import get_current_active_user
+from backend.database import get_db
+from backend.routers import expense_router
+from backend.utils.http_cache import data_versions
+from backend.utils.single_flight import SingleFlight, flight_key
+
+def test_concurrent_identical_calls_share_one_computation():
+    flight = SingleFlight("test_coalesce")
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"total": 42}
+
+    key = flight_key(1, "expenses/summary", {"start_date": None})
+    threads = [threading.Thread(target=lambda: results.append(flight.do(key, compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"total": 42}] * 5
+    assert flight.snapshot() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+def test_keys_normalize_parameter_order():
+    assert flight_key(1, "summary", {"a": 1, "b": 2}) == flight_key(1, "summary", {"b": 2, "a": 1})
+    assert flight_key(1, "summary", {"a": 1}) != flight_key(2, "summary", {"a": 1})
+
+def test_summary_requests_after_a_write_do_not_join_an_older_flight(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def summary(user_id, start_date, end_date, db):
+        calls.append(data_versions.get(user_id))
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+        return {"version_seen": calls[-1]}
+
+    monkeypatch.setattr(expense_router.expense_service, "get_expense_summary", summary)
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id=7373, is_active=True)
+    app.dependency_overrides[get_db] = lambda: None
+    client = TestClient(app)
+    try:
+        first = []
+        thread = threading.Thread(target=lambda: first.append(client.get("/api/expenses/expenses/summary")))
+        thread.start()
+        assert started.wait(5)
+        data_versions.bump(7373)
+        second = client.get("/api/expenses/expenses/summary")
+        release.set()
+        thread.join()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert len(calls) == 2
+    assert second.json() == {"version_seen": calls[1]}
+    assert first[0].headers["etag"] != second.headers["etag"]
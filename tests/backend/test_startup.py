@@ -0,0 +1,10 @@
+import os
+from backend.utils.startup_profile import COLD_START_BUDGET_SECONDS, profile_imports
+
+def test_cold_start_within_budget():
+    report = profile_imports("backend.main")
+    assert report["total_seconds"] < COLD_START_BUDGET_SECONDS, report["modules"][:10]
+
+def test_importing_app_has_no_side_effects(tmp_path):
+    profile_imports("backend.main", cwd=str(tmp_path))
+    assert not os.path.exists(tmp_path / "finmate.db")
@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.services.term_index import TermIndex, benchmark, bounded_edit_distance
+
+index = TermIndex(["compound_interest", "interest_rate", "dividend", "dividend_yield", "diversification", "bond"])
+
+def test_prefix_and_exact_lookups():
+    assert "Compound Interest" in index
+    assert index.with_prefix("div") == ["diversification", "dividend", "dividend_yield"]
+    assert index.with_prefix("divi", limit=1) == ["dividend"]
+
+def test_typos_rank_by_containment_then_edit_distance():
+    assert index.similar("dividnd")[0] == "dividend"
+    assert index.similar("interest")[:2] == ["compound_interest", "interest_rate"]
+    assert index.similar("zzzz") == []
+    assert bounded_edit_distance("kitten", "sitting", 3) == 3
+    assert bounded_edit_distance("kitten", "sitting", 2) == 3
+
+def test_autocomplete_endpoint_tolerates_typos():
+    client = TestClient(app)
+    response = client.get("/api/smart/terms/autocomplete", params={"q": "dividnd"})
+    assert response.status_code == 200
+    assert response.json()["suggestions"][0] == "dividend"
+    assert client.get("/api/smart/terms/autocomplete", params={"q": "comp", "limit": 100}).status_code == 422
+
+def test_benchmark_times_every_lookup():
+    # Latency is checked against TARGET_MS by the benchmark itself; unit tests don't time anything
+    timings = benchmark(terms=2000, queries=20)
+    assert set(timings) == {"build_seconds", "exact_ms", "prefix_ms", "autocomplete_ms", "typo_ms"}
@@ -0,0 +1,71 @@
+import json
+import os
+import time
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.services.terms_store import DEFAULT_TERMS_PATH, TermsStore
+
+def test_default_path_is_relative_to_the_package(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    store = TermsStore(DEFAULT_TERMS_PATH)
+    assert "compound_interest" in store.snapshot
+    assert len(store.snapshot) > 10
+
+def test_compiles_multilingual_glossary_and_hot_reloads(tmp_path):
+    source = tmp_path / "terms.json"
+    source.write_text(json.dumps({
+        "Bond": "A loan to a borrower.",
+        "dividend": {"en": "A share of profits.", "es": "Una parte de las ganancias."}
+    }), encoding="utf-8")
+    store = TermsStore(source, reload_interval=0)
+    snapshot = store.snapshot
+    assert (tmp_path / "terms.idx").exists()
+    assert list(snapshot) == ["bond", "dividend"]
+    assert snapshot["bond"] == "A loan to a borrower."
+    assert snapshot.definition("Dividend", "es") == "Una parte de las ganancias."
+    assert snapshot.definition("dividend", "fr") == "A share of profits."
+    assert "missing" not in snapshot
+
+    reloaded = []
+    store.add_reload_listener(lambda: reloaded.append(True))
+    source.write_text(json.dumps({"bond": "Updated.", "dividend_yield": "Dividend over price."}), encoding="utf-8")
+    os.utime(source, ns=(snapshot.source_mtime_ns + 10**9, snapshot.source_mtime_ns + 10**9))
+    store.reload_now()
+    assert reloaded and store.snapshot["bond"] == "Updated."
+    assert store.snapshot.index.with_prefix("div") == ["dividend_yield"]
+    # The old snapshot stays readable for requests that already hold it
+    assert snapshot["bond"] == "A loan to a borrower."
+
+def test_missing_source_serves_an_empty_glossary(tmp_path):
+    store = TermsStore(tmp_path / "absent.json")
+    assert len(store.snapshot) == 0 and store.snapshot.definition("bond") is None
+
+def test_explain_term_endpoint_uses_the_store():
+    client = TestClient(app)
+    body = client.get("/api/smart/explain-term/Compound Interest").json()
+    assert body["found"] is True and body["definition"]
+
+def test_financial_terms_endpoint_picks_up_edits(monkeypatch, tmp_path):
+    from backend.services.terms_store import terms_store
+    source = tmp_path / "terms.json"
+    source.write_text(json.dumps({"bond": "A loan to a borrower."}), encoding="utf-8")
+    monkeypatch.setattr(terms_store, "source", source)
+    monkeypatch.setattr(terms_store, "reload_interval", 0)
+    terms_store.reload_now()
+    try:
+        client = TestClient(app)
+        assert client.get("/api/smart/financial-terms").json()["terms"] == ["bond"]
+
+        snapshot = terms_store.snapshot
+        source.write_text(json.dumps({"bond": "Updated.", "dividend": "A share of profits."}), encoding="utf-8")
+        os.utime(source, ns=(snapshot.source_mtime_ns + 10**9, snapshot.source_mtime_ns + 10**9))
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            body = client.get("/api/smart/financial-terms").json()
+            if body["terms"] == ["bond", "dividend"]:
+                break
+            time.sleep(0.05)
+        assert body == {"terms": ["bond", "dividend"], "total_count": 2}
+    finally:
+        monkeypatch.undo()
+        terms_store.reload_now()